@@ -16,7 +16,9 @@ def save_profile_picture(backend, user, response, *args, **kwargs):
 def save_google_tokens(backend, user, response, *args, **kwargs):
     """Save Google OAuth tokens for Drive API access."""
     if backend.name == 'google-oauth2':
-        from datetime import datetime, timedelta
+        from datetime import timedelta
+        from django.utils import timezone
+        from google_drive.credentials import remember
         
         access_token = response.get('access_token')
         refresh_token = response.get('refresh_token')
@@ -29,9 +31,11 @@ def save_google_tokens(backend, user, response, *args, **kwargs):
             user.google_refresh_token = refresh_token
         
         if expires_in:
-            user.google_token_expiry = datetime.now() + timedelta(seconds=expires_in)
+            user.google_token_expiry = timezone.now() + timedelta(seconds=expires_in)
         
         user.save()
+        # Replace any token cached from before the user signed in again.
+        remember(user)
         
         # Ensure student profile exists for new users
         if user.is_student and not hasattr(user, 'student_profile'):
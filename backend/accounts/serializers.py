@@ -68,11 +68,11 @@ class UserCreateSerializer(serializers.ModelSerializer):
         """Create a new user with encrypted password."""
         user = User.objects.create_user(**validated_data)
         
-        # Create appropriate profile
+        # Create appropriate profile (the post_save signal may already have)
         if user.role == User.Role.STUDENT:
-            StudentProfile.objects.create(user=user)
+            StudentProfile.objects.get_or_create(user=user)
         elif user.role == User.Role.ADMIN:
-            AdminProfile.objects.create(user=user)
+            AdminProfile.objects.get_or_create(user=user)
         
         return user
 
@@ -131,13 +131,15 @@ class StudentListSerializer(serializers.ModelSerializer):
     
     def get_courses_enrolled(self, obj):
         """Get the number of courses the student is enrolled in."""
-        return obj.enrollments.count() if hasattr(obj, 'enrollments') else 0
+        if hasattr(obj, 'enrollment_count'):
+            return obj.enrollment_count
+        return obj.enrollments.count()
     
     def get_overall_progress(self, obj):
         """Calculate overall progress across all courses."""
-        from progress.models import CourseProgress
-        progress_records = CourseProgress.objects.filter(user=obj)
-        if not progress_records.exists():
+        # Served from prefetch_related('course_progress') where the view has it
+        progress_records = list(obj.course_progress.all())
+        if not progress_records:
             return 0
         total_progress = sum(p.progress_percentage for p in progress_records)
-        return round(total_progress / progress_records.count(), 2)
+        return round(total_progress / len(progress_records), 2)
@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 from django.conf import settings
@@ -17,6 +19,8 @@ from .serializers import (
     ChangePasswordSerializer, GoogleAuthSerializer, StudentListSerializer
 )
 from .permissions import IsAdmin, IsAdminOrSelf
+from courses.models import Enrollment
+from lms_project.pagination import PageNumberOrKeysetPagination
 
 User = get_user_model()
 
@@ -104,8 +108,8 @@ class GoogleAuthView(APIView):
             )
             
             if created:
-                # Create student profile for new users
-                StudentProfile.objects.create(user=user)
+                # Create student profile for new users (if the signal hasn't)
+                StudentProfile.objects.get_or_create(user=user)
             else:
                 # Update profile picture if changed
                 if idinfo.get('picture'):
@@ -151,16 +155,26 @@ class LogoutView(APIView):
 
 # Admin Views
 class StudentListView(generics.ListAPIView):
-    """View for listing all students (admin only)."""
+    """View for listing all students (admin only); ``?pagination=cursor`` for keyset pages."""
     
     serializer_class = StudentListSerializer
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     filterset_fields = ['is_active']
     search_fields = ['email', 'first_name', 'last_name']
     ordering_fields = ['created_at', 'email', 'first_name']
     
     def get_queryset(self):
-        return User.objects.filter(role=User.Role.STUDENT).select_related('student_profile')
+        # Enrollment counts and progress records are loaded per page, not per student.
+        enrollment_count = (
+            Enrollment.objects.filter(user=OuterRef('pk'))
+            .order_by().values('user').annotate(count=Count('pk')).values('count')
+        )
+        return User.objects.filter(role=User.Role.STUDENT).select_related(
+            'student_profile'
+        ).prefetch_related('course_progress').annotate(
+            enrollment_count=Coalesce(Subquery(enrollment_count), 0)
+        )
 
 
 class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -0,0 +1,145 @@
+"""
+Shared pytest configuration for the backend test suite.
+"""
+import json
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+
+BUDGETS_PATH = Path(__file__).resolve().parent / 'tests' / 'query_budgets.json'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('lms')
+    group.addoption(
+        '--dataset-scale',
+        default='ci',
+        choices=['ci', 'medium', 'large'],
+        help='Size of the generated dataset (query budgets are recorded at "ci").'
+    )
+    group.addoption(
+        '--benchmark',
+        action='store_true',
+        help='Run the endpoint latency/memory and query plan benchmarks.'
+    )
+    group.addoption(
+        '--benchmark-iterations',
+        type=int,
+        default=20,
+        help='Requests per endpoint when benchmarking.'
+    )
+    group.addoption(
+        '--benchmark-report',
+        default=None,
+        help='Write the benchmark results as JSON to this path.'
+    )
+    group.addoption(
+        '--record-query-budgets',
+        action='store_true',
+        help='Rewrite tests/query_budgets.json with the measured query counts.'
+    )
+
+
+def pytest_configure(config):
+    # Tests must not need a running Redis server or broker, or pay for real password hashing.
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+    config.addinivalue_line('markers', 'benchmark: endpoint latency/memory benchmark')
+    config.measured_query_counts = {}
+    config.benchmark_results = {}
+    config.query_plans = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason='needs --benchmark')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if config.getoption('--record-query-budgets') and config.measured_query_counts:
+        budgets = json.loads(BUDGETS_PATH.read_text()) if BUDGETS_PATH.exists() else {}
+        budgets.update(config.measured_query_counts)
+        BUDGETS_PATH.write_text(json.dumps(dict(sorted(budgets.items())), indent=2) + '\n')
+
+    report = config.getoption('--benchmark-report')
+    if report and (config.benchmark_results or config.query_plans):
+        results = dict(config.benchmark_results)
+        if config.query_plans:
+            results['query_plans'] = config.query_plans
+        Path(report).write_text(json.dumps(results, indent=2) + '\n')
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if config.query_plans:
+        terminalreporter.section('query plans')
+        for name, row in sorted(config.query_plans.items()):
+            terminalreporter.write_line(
+                f"{name}: {row['index']} {'used' if row['uses_index'] else 'NOT used'}, "
+                f"p50 {row['before']['p50_ms']:.2f} ms without -> {row['after']['p50_ms']:.2f} ms with"
+            )
+            for label in ('before', 'after'):
+                terminalreporter.write_line(f'  {label}:')
+                for line in row[label]['plan'].splitlines():
+                    terminalreporter.write_line(f'    {line}')
+
+    results = config.benchmark_results
+    if not results:
+        return
+    terminalreporter.section('endpoint benchmarks')
+    terminalreporter.write_line(
+        f"{'endpoint':<40} {'queries':>8} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>9}"
+    )
+    for name, row in sorted(results.items()):
+        terminalreporter.write_line(
+            f"{name:<40} {row['queries']:>8} {row['p50_ms']:>9.2f} "
+            f"{row['p99_ms']:>9.2f} {row['peak_memory_kib']:>9.1f}"
+        )
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, request):
+    """Build the shared dataset once; each test runs in a rolled-back transaction."""
+    from tests.dataset import build_dataset
+
+    with django_db_blocker.unblock():
+        request.config.dataset = build_dataset(request.config.getoption('--dataset-scale'))
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Database rows roll back between tests, so cached copies must go too."""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def dataset(request, db):
+    return request.config.dataset
+
+
+@pytest.fixture
+def api_client():
+    from rest_framework.test import APIClient
+    return APIClient()
+
+
+@pytest.fixture
+def fake_drive(monkeypatch):
+    """Answer every thread's Drive API requests from one in-memory FakeDrive."""
+    from google_drive import client
+    from tests.fake_drive import FakeDrive
+
+    drive = FakeDrive()
+    monkeypatch.setattr(client, 'pooled_http', lambda: drive)
+    return drive
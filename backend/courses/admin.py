@@ -70,16 +70,21 @@ class ModuleAdmin(admin.ModelAdmin):
 
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
-    list_display = ('title', 'module', 'duration_minutes', 'order', 'is_preview', 'is_published')
-    list_filter = ('is_published', 'is_preview', 'module__course')
+    list_display = (
+        'title', 'module', 'duration_minutes', 'order', 'is_preview', 'is_published',
+        'drive_file_missing'
+    )
+    list_filter = ('is_published', 'is_preview', 'drive_file_missing', 'module__course')
     search_fields = ('title', 'module__title', 'module__course__title')
     ordering = ('module', 'order')
 
 
 @admin.register(Resource)
 class ResourceAdmin(admin.ModelAdmin):
-    list_display = ('title', 'resource_type', 'course', 'module', 'order', 'is_published')
-    list_filter = ('resource_type', 'is_published')
+    list_display = (
+        'title', 'resource_type', 'course', 'module', 'order', 'is_published', 'drive_file_missing'
+    )
+    list_filter = ('resource_type', 'is_published', 'drive_file_missing')
     search_fields = ('title', 'course__title', 'module__title')
 
 
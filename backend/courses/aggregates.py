@@ -0,0 +1,74 @@
+"""
+Maintenance of the denormalized aggregate columns on Course and Module.
+
+Each refresh is a single set-based UPDATE, so it costs the same whether it
+touches one row or every course in the catalog.
+"""
+from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Course, Module, Video, Enrollment
+
+
+def _subquery_total(queryset, group_field, aggregate):
+    """Build a correlated subquery returning a single aggregate per parent row."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{group_field: OuterRef('pk')})
+            .order_by()
+            .values(group_field)
+            .annotate(total=aggregate)
+            .values('total')
+        ),
+        0,
+        output_field=models.IntegerField()
+    )
+
+
+def refresh_module_aggregates(module_ids=None):
+    """Recompute Module.total_duration_minutes for the given modules (or all)."""
+    modules = Module.objects.all()
+    if module_ids is not None:
+        modules = modules.filter(pk__in=module_ids)
+    return modules.update(
+        total_duration_minutes=_subquery_total(Video.objects, 'module', Sum('duration_minutes'))
+    )
+
+
+def refresh_course_aggregates(course_ids=None, structure_changed=False):
+    """
+    Recompute every aggregate column on the given courses (or all).
+
+    Pass ``structure_changed`` when videos were added, moved or removed so
+    stored student progress for the course is recomputed on next use.
+    """
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+    extra = {'structure_version': F('structure_version') + 1} if structure_changed else {}
+    return courses.update(
+        total_videos=_subquery_total(Video.objects, 'module__course', Count('pk')),
+        total_duration_minutes=_subquery_total(
+            Video.objects, 'module__course', Sum('duration_minutes')
+        ),
+        enrolled_students_count=_subquery_total(Enrollment.objects, 'course', Count('pk')),
+        **extra
+    )
+
+
+def bump_structure_version(course_ids):
+    """Mark stored student progress for the given courses as needing a recompute."""
+    return Course.objects.filter(pk__in=course_ids).update(
+        structure_version=F('structure_version') + 1
+    )
+
+
+def refresh_enrollment_counts(course_ids=None):
+    """Recompute only Course.enrolled_students_count, e.g. after bulk enrollment."""
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+    return courses.update(
+        enrolled_students_count=_subquery_total(Enrollment.objects, 'course', Count('pk'))
+    )
@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses'
     verbose_name = 'Course Management'
+    
+    def ready(self):
+        import courses.signals  # noqa
+        from .search import create_search_index
+        post_migrate.connect(create_search_index, sender=self)
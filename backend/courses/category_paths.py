@@ -0,0 +1,66 @@
+"""
+Materialized paths for the category hierarchy.
+
+Every category stores the ids of its ancestors and itself as a path such as
+``"3/17/42/"``. A category's descendants are then every row whose path starts
+with its own, which is a single indexed prefix query no matter how deep or
+wide the taxonomy grows. Moving a category rewrites its whole subtree with
+one UPDATE.
+"""
+from django.db.models import CharField, Value
+from django.db.models.functions import Concat, Substr
+
+from .models import Category
+
+
+def build_path(parent_path, pk):
+    return f'{parent_path or ""}{pk}/'
+
+
+def stored_path(category_id):
+    return Category.objects.filter(pk=category_id).values_list('path', flat=True).first()
+
+
+def update_category_path(category, previous_path=None):
+    """
+    Bring ``category``'s path, and its descendants' if it moved, up to date.
+
+    ``previous_path`` is the path stored before the save. Returns the new path.
+    """
+    parent_path = stored_path(category.parent_id) if category.parent_id else ''
+    path = build_path(parent_path, category.pk)
+    if path == previous_path:
+        return path
+
+    Category.objects.filter(pk=category.pk).update(path=path)
+    if previous_path:
+        Category.objects.filter(path__startswith=previous_path).exclude(pk=category.pk).update(
+            path=Concat(
+                Value(path), Substr('path', len(previous_path) + 1),
+                output_field=CharField()
+            )
+        )
+    category.path = path
+    return path
+
+
+def rebuild_category_paths():
+    """Recompute every category's path from the parent links. Returns the row count."""
+    parents = dict(Category.objects.values_list('pk', 'parent_id'))
+    paths = {}
+
+    def path_of(pk):
+        # Walk up to the nearest ancestor with a known path, then back down.
+        chain = []
+        while pk is not None and pk not in paths and pk not in chain:
+            chain.append(pk)
+            pk = parents.get(pk)
+        prefix = paths.get(pk, '')
+        for node in reversed(chain):
+            prefix = paths[node] = build_path(prefix, node)
+        return prefix
+
+    categories = [Category(pk=pk, path=path_of(pk)) for pk in parents]
+    Category.objects.bulk_update(categories, ['path'], batch_size=500)
+    return len(categories)
+
@@ -0,0 +1,91 @@
+"""
+Cached snapshot of the category tree.
+
+The whole tree, with each category's published-course count, is built from
+two queries and stored in the default cache under a version token. Saving or
+deleting a category or course replaces the token once the transaction
+commits, so readers move to a fresh snapshot and stale ones simply expire.
+The snapshot carries an ETag derived from its content.
+"""
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Category, Course
+
+# Bump when the snapshot layout changes so old pickles are never read.
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+VERSION_KEY = 'courses:category-tree-version'
+
+NODE_FIELDS = ('id', 'name', 'slug', 'description', 'icon', 'parent', 'order', 'is_active')
+
+
+@dataclass(frozen=True)
+class CategoryTree:
+    """Active root categories, nested, plus an index of every category by id."""
+
+    etag: str
+    roots: list
+    nodes: dict
+
+
+def build_category_tree():
+    """Build the tree from one query for categories and one for course counts."""
+    course_counts = dict(
+        Course.objects.filter(status=Course.Status.PUBLISHED, category__isnull=False)
+        .order_by()
+        .values_list('category')
+        .annotate(count=Count('pk'))
+    )
+
+    nodes = {}
+    for row in Category.objects.order_by('order', 'name').values(*NODE_FIELDS):
+        nodes[row['id']] = {**row, 'subcategories': [], 'course_count': course_counts.get(row['id'], 0)}
+
+    roots = []
+    # Rows arrive in display order, so children are appended in order too.
+    for node in nodes.values():
+        if node['parent'] is None:
+            if node['is_active']:
+                roots.append(node)
+        elif node['is_active'] and node['parent'] in nodes:
+            nodes[node['parent']]['subcategories'].append(node)
+
+    content = json.dumps(roots, cls=DjangoJSONEncoder, sort_keys=True)
+    etag = '"%s"' % hashlib.sha256(content.encode()).hexdigest()[:32]
+    return CategoryTree(etag=etag, roots=roots, nodes=nodes)
+
+
+def _snapshot_key(version):
+    return f'courses:category-tree:{SNAPSHOT_FORMAT}:{version}'
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A missing token must not resurrect an older snapshot; start a new one.
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_category_tree():
+    """Return the category tree, building and caching it on a miss."""
+    snapshot_key = _snapshot_key(current_version())
+    tree = cache.get(snapshot_key)
+    if tree is None:
+        tree = build_category_tree()
+        cache.set(snapshot_key, tree, SNAPSHOT_TIMEOUT)
+    return tree
+
+
+def invalidate_category_tree():
+    """Retire the current snapshot once the surrounding transaction commits."""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None))
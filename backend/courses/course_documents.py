@@ -0,0 +1,147 @@
+"""
+Cached, versioned course detail documents.
+
+The user-independent part of a course page (the course, its category,
+modules, videos and resources) is serialized once and stored in the default
+cache under the course's version token. Changing the course or anything on
+its page replaces the token once the transaction commits, and readers then
+build a fresh document while stale ones expire. Per-user fields are merged in
+by the view.
+
+A page shows its category's subtree with published-course counts, so a
+change to a category, or to which published courses it holds, retires the
+pages of courses filed under that category or any of its ancestors.
+
+Retiring any course's document also replaces the catalog version, which
+validates the course listing as a whole.
+"""
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Course
+
+# Bump when the document layout changes so old pickles are never read.
+DOCUMENT_FORMAT = 3
+DOCUMENT_TIMEOUT = 60 * 60 * 24
+CATALOG_VERSION_KEY = 'courses:catalog-version'
+
+
+@dataclass(frozen=True)
+class CourseDocument:
+    """
+    A serialized course page and its ETag.
+
+    There's deliberately no Last-Modified: a build time only has one-second
+    resolution, so two rebuilds within a second would look the same to an
+    If-Modified-Since check.
+    """
+
+    etag: str
+    data: dict
+
+
+def _version_key(course_id):
+    return f'courses:course-document-version:{course_id}'
+
+
+def _slug_key(slug):
+    return f'courses:course-slug:{slug}'
+
+
+def _document_key(course_id, version):
+    return f'courses:course-document:{DOCUMENT_FORMAT}:{course_id}:{version}'
+
+
+def _current_version(key):
+    version = cache.get(key)
+    if version is None:
+        # A missing token must not resurrect an older document; start a new one.
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def course_version(course_id):
+    """The token that changes whenever the course's page does."""
+    return _current_version(_version_key(course_id))
+
+
+def catalog_version():
+    """The token that changes whenever any course's page does."""
+    return _current_version(CATALOG_VERSION_KEY)
+
+
+def build_course_document(course_id):
+    """Serialize a course page without per-user fields, or None if it's gone."""
+    from .serializers import CourseDetailSerializer
+
+    course = Course.objects.select_related('category', 'instructor').prefetch_related(
+        'modules__videos', 'modules__resources', 'resources'
+    ).filter(pk=course_id).first()
+    if course is None:
+        return None
+    data = dict(CourseDetailSerializer(course).data)
+    del data['is_enrolled']
+    content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    etag = '"%s"' % hashlib.sha256(content.encode()).hexdigest()[:32]
+    return CourseDocument(etag=etag, data=data)
+
+
+def course_id_for_slug(slug):
+    """Resolve a course slug to its id through the cache, or None."""
+    course_id = cache.get(_slug_key(slug))
+    if course_id is None:
+        course_id = Course.objects.filter(slug=slug).values_list('pk', flat=True).first()
+        if course_id is not None:
+            cache.set(_slug_key(slug), course_id, DOCUMENT_TIMEOUT)
+    return course_id
+
+
+def forget_course_slug(slug):
+    """Forget which course ``slug`` belonged to once the transaction commits."""
+    transaction.on_commit(lambda: cache.delete(_slug_key(slug)))
+
+
+def get_course_document(slug, retry=True):
+    """Return the document for the course at ``slug``, building it on a miss."""
+    course_id = course_id_for_slug(slug)
+    if course_id is None:
+        return None
+
+    key = _document_key(course_id, course_version(course_id))
+    document = cache.get(key)
+    if document is None:
+        document = build_course_document(course_id)
+        if document is not None:
+            cache.set(key, document, DOCUMENT_TIMEOUT)
+
+    if document is None or document.data['slug'] != slug:
+        # The course was deleted or renamed since the slug was looked up.
+        cache.delete(_slug_key(slug))
+        return get_course_document(slug, retry=False) if retry else None
+    return document
+
+
+def invalidate_course_documents(course_ids):
+    """Retire the courses' documents, and the catalog, once the transaction commits."""
+    course_ids = {course_id for course_id in course_ids if course_id is not None}
+    if course_ids:
+        transaction.on_commit(lambda: cache.set_many({
+            CATALOG_VERSION_KEY: uuid.uuid4().hex,
+            **{_version_key(course_id): uuid.uuid4().hex for course_id in course_ids},
+        }, None))
+
+
+def invalidate_category_documents(paths):
+    """Retire the documents of courses filed under any category on the category ``paths``."""
+    category_ids = {int(pk) for path in paths if path for pk in path.split('/') if pk}
+    if category_ids:
+        invalidate_course_documents(
+            Course.objects.filter(category_id__in=category_ids).order_by().values_list('pk', flat=True)
+        )
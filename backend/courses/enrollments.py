@@ -0,0 +1,194 @@
+"""
+Enrollment queries and set-based bulk enrollment shared by the API views and
+background tasks.
+
+Rosters are processed in chunks: each chunk resolves its users in one query,
+finds existing enrollments in another and inserts the rest with a single
+``bulk_create(ignore_conflicts=True)``, so a roster of any size costs a few
+queries per thousand students and never has to be held in memory at once.
+The whole roster is enrolled in one transaction: a roster that turns out to
+be malformed part way through enrolls nobody.
+"""
+import codecs
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from progress.models import CourseProgress
+from .aggregates import refresh_enrollment_counts
+from .course_documents import invalidate_course_documents
+from .models import Enrollment
+
+User = get_user_model()
+
+ENROLL_BATCH_SIZE = 1000
+ROSTER_FORMATS = ('csv', 'json')
+
+
+def with_progress(queryset):
+    """
+    Prepare enrollments for EnrollmentSerializer in a single query.
+
+    Joins the user and course (with its category and instructor) and
+    annotates the student's CourseProgress counters, so serializing a page
+    of enrollments costs no per-row queries.
+    """
+    progress = CourseProgress.objects.filter(
+        user_id=OuterRef('user_id'), course_id=OuterRef('course_id')
+    )
+    return queryset.select_related(
+        'user', 'course', 'course__category', 'course__instructor'
+    ).annotate(
+        progress_videos_completed=Subquery(progress.values('videos_completed')[:1]),
+        progress_total_videos=Subquery(progress.values('total_videos')[:1]),
+    )
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _resolve_users(identifiers):
+    """
+    Map a chunk of user ids and/or emails to existing user ids in one query.
+
+    Returns the user ids and how many identifiers matched no user. One user
+    listed by both id and email resolves to a single id, so the unmatched
+    count can't be derived from the number of ids.
+    """
+    ids = {i for i in identifiers if isinstance(i, int)}
+    emails = {i for i in identifiers if isinstance(i, str)}
+    users = User.objects.filter(Q(id__in=ids) | Q(email__in=emails)).values_list('id', 'email')
+    found_ids, found_emails = set(), set()
+    for user_id, email in users:
+        found_ids.add(user_id)
+        found_emails.add(email)
+    return found_ids, len(ids - found_ids) + len(emails - found_emails)
+
+
+def enroll_users(course, identifiers, assigned_by=None, expires_at=None,
+                 batch_size=ENROLL_BATCH_SIZE):
+    """
+    Enroll every user in ``identifiers`` (ids or emails, any iterable) in ``course``.
+
+    Returns a summary dict with the number of enrollments ``created``, users
+    already ``existing`` in the course and identifiers ``not_found``. A
+    ValueError from ``identifiers`` (a malformed roster) rolls back every
+    enrollment made so far.
+    """
+    summary = {'created': 0, 'existing': 0, 'not_found': 0}
+
+    with transaction.atomic():
+        for chunk in _chunks(identifiers, batch_size):
+            chunk = set(chunk)
+            user_ids, not_found = _resolve_users(chunk)
+            enrolled = Enrollment.objects.filter(course=course, user_id__in=user_ids)
+            existing = set(enrolled.values_list('user_id', flat=True))
+            new = [
+                Enrollment(
+                    user_id=user_id,
+                    course=course,
+                    status=Enrollment.Status.ACTIVE,
+                    assigned_by=assigned_by,
+                    expires_at=expires_at
+                )
+                for user_id in user_ids - existing
+            ]
+            if new:
+                # A concurrent enrollment of the same student is silently
+                # skipped, so count what was actually inserted.
+                Enrollment.objects.bulk_create(new, ignore_conflicts=True)
+                summary['created'] += enrolled.count() - len(existing)
+
+            summary['existing'] += len(existing)
+            summary['not_found'] += not_found
+
+        # bulk_create bypasses the signals that maintain the enrollment
+        # counter and retire the course page.
+        refresh_enrollment_counts([course.pk])
+        invalidate_course_documents([course.pk])
+    return summary
+
+
+def _roster_identifier(value):
+    """Normalize one roster entry to a user id or an email, or None."""
+    if isinstance(value, dict):
+        value = value.get('user_id') or value.get('email')
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+        return value or None
+    return None
+
+
+def iter_csv_roster(file):
+    """Yield identifiers from a CSV with a ``user_id`` and/or ``email`` column."""
+    reader = csv.DictReader(codecs.iterdecode(file, 'utf-8-sig'))
+    if not reader.fieldnames or not {'user_id', 'email'} & set(reader.fieldnames):
+        raise ValueError('The roster needs a "user_id" or "email" column.')
+    for row in reader:
+        identifier = _roster_identifier(row.get('user_id') or row.get('email'))
+        if identifier is not None:
+            yield identifier
+
+
+def iter_json_roster(file, read_size=64 * 1024):
+    """
+    Yield identifiers from a top-level JSON array without loading it whole.
+
+    Items may be user ids, emails or objects with ``user_id``/``email``.
+    """
+    decoder = json.JSONDecoder()
+    reader = codecs.getreader('utf-8-sig')(file)
+    buffer, started = '', False
+
+    while True:
+        data = reader.read(read_size)
+        buffer += data
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    break
+                if buffer[0] != '[':
+                    raise ValueError('The roster must be a JSON array.')
+                buffer, started = buffer[1:], True
+                continue
+            if buffer.startswith(','):
+                buffer = buffer[1:]
+                continue
+            if buffer.startswith(']'):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break  # the item continues in the next read
+            if end == len(buffer) and data:
+                break  # a number may continue in the next read
+            buffer = buffer[end:]
+            identifier = _roster_identifier(item)
+            if identifier is not None:
+                yield identifier
+        if not data:
+            raise ValueError('The roster is not a valid JSON array.')
+
+
+def iter_roster(file, roster_format):
+    if roster_format == 'csv':
+        return iter_csv_roster(file)
+    return iter_json_roster(file)
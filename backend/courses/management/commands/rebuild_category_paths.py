@@ -0,0 +1,17 @@
+"""
+Management command to rebuild the materialized category paths.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.category_paths import rebuild_category_paths
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the materialized path of every category from its parent links'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            categories = rebuild_category_paths()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt paths for {categories} categories.'))
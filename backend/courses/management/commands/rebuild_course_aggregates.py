@@ -0,0 +1,44 @@
+"""
+Management command to rebuild the denormalized course aggregate columns.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.aggregates import refresh_module_aggregates, refresh_course_aggregates
+from courses.course_documents import invalidate_course_documents
+from courses.models import Course, Module
+from courses.search import refresh_search_vectors
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes video counts, durations, enrollment counts and search vectors '
+        'on courses and modules'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            action='append',
+            dest='course_ids',
+            type=int,
+            help='Only rebuild the given course id (may be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        course_ids = options.get('course_ids')
+
+        with transaction.atomic():
+            if course_ids:
+                modules = refresh_module_aggregates(
+                    Module.objects.filter(course_id__in=course_ids).values('pk')
+                )
+            else:
+                modules = refresh_module_aggregates()
+            courses = refresh_course_aggregates(course_ids)
+            refresh_search_vectors(course_ids)
+            invalidate_course_documents(course_ids or Course.objects.values_list('pk', flat=True))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt aggregates for {courses} courses and {modules} modules.')
+        )
@@ -1,6 +1,7 @@
 """
 Models for courses and course content.
 """
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
 
@@ -19,6 +20,8 @@ class Category(models.Model):
         blank=True,
         related_name='subcategories'
     )
+    # Ancestor ids and own id, e.g. "3/17/42/"; maintained by signals
+    path = models.CharField(max_length=255, blank=True, default='', db_index=True, editable=False)
     order = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -31,6 +34,10 @@ class Category(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def is_ancestor_of(self, other):
+        """Whether ``other`` is this category or one of its descendants."""
+        return bool(self.path) and other.path.startswith(self.path)
 
 
 class Course(models.Model):
@@ -84,6 +91,17 @@ class Course(models.Model):
     prerequisites = models.TextField(blank=True, help_text="Prerequisites for this course")
     learning_objectives = models.TextField(blank=True, help_text="What students will learn")
     
+    # Denormalized aggregates, maintained by courses.signals
+    total_videos = models.PositiveIntegerField(default=0, editable=False)
+    total_duration_minutes = models.PositiveIntegerField(default=0, editable=False)
+    enrolled_students_count = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped whenever stored student progress needs a recount (videos or
+    # required quizzes added, moved or removed, or a required quiz regraded)
+    structure_version = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted full-text document, maintained by courses.signals (PostgreSQL
+    # only). Its GIN index is added after migrate (see courses.search).
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
@@ -92,28 +110,18 @@ class Course(models.Model):
         verbose_name = 'course'
         verbose_name_plural = 'courses'
         ordering = ['-created_at']
+        indexes = [
+            # Catalog listing: published courses, newest first.
+            models.Index(fields=['status', '-created_at'], name='course_catalog_idx'),
+            # Featured listing: the same, over the few featured courses only.
+            models.Index(
+                fields=['status', '-created_at'], condition=models.Q(is_featured=True),
+                name='course_featured_idx'
+            ),
+        ]
     
     def __str__(self):
         return self.title
-    
-    @property
-    def total_videos(self):
-        """Get total number of videos in the course."""
-        return self.modules.aggregate(
-            total=models.Count('videos')
-        )['total'] or 0
-    
-    @property
-    def total_duration_minutes(self):
-        """Get total duration of all videos in minutes."""
-        return self.modules.aggregate(
-            total=models.Sum('videos__duration_minutes')
-        )['total'] or 0
-    
-    @property
-    def enrolled_students_count(self):
-        """Get the number of enrolled students."""
-        return self.enrollments.count()
 
 
 class Module(models.Model):
@@ -128,6 +136,10 @@ class Module(models.Model):
     description = models.TextField(blank=True)
     order = models.PositiveIntegerField(default=0)
     is_published = models.BooleanField(default=True)
+    
+    # Denormalized aggregate, maintained by courses.signals
+    total_duration_minutes = models.PositiveIntegerField(default=0, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -139,13 +151,6 @@ class Module(models.Model):
     
     def __str__(self):
         return f"{self.course.title} - {self.title}"
-    
-    @property
-    def total_duration_minutes(self):
-        """Get total duration of videos in this module."""
-        return self.videos.aggregate(
-            total=models.Sum('duration_minutes')
-        )['total'] or 0
 
 
 class Video(models.Model):
@@ -163,6 +168,9 @@ class Video(models.Model):
     google_drive_file_id = models.CharField(max_length=100)
     google_drive_url = models.URLField(max_length=500)
     thumbnail_url = models.URLField(max_length=500, blank=True, null=True)
+    drive_file_missing = models.BooleanField(
+        default=False, help_text="The Drive file was trashed, deleted or unshared"
+    )
     
     duration_minutes = models.PositiveIntegerField(default=0)
     order = models.PositiveIntegerField(default=0)
@@ -221,6 +229,9 @@ class Resource(models.Model):
     google_drive_file_id = models.CharField(max_length=100)
     google_drive_url = models.URLField(max_length=500)
     file_size_bytes = models.BigIntegerField(default=0)
+    drive_file_missing = models.BooleanField(
+        default=False, help_text="The Drive file was trashed, deleted or unshared"
+    )
     
     order = models.PositiveIntegerField(default=0)
     is_published = models.BooleanField(default=True)
@@ -281,6 +292,11 @@ class Enrollment(models.Model):
         verbose_name_plural = 'enrollments'
         unique_together = ['user', 'course']
         ordering = ['-enrolled_at']
+        indexes = [
+            models.Index(fields=['course', 'status'], name='enrollment_course_status_idx'),
+            # Keyset pagination of the enrollment list
+            models.Index(fields=['-enrolled_at', '-id'], name='enrollment_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.course.title}"
@@ -0,0 +1,125 @@
+"""
+Full-text course search.
+
+On PostgreSQL every course keeps a weighted ``search_vector`` (title first,
+then the short description, then the description and its module and video
+titles) behind a GIN index, so catalog searches are an index lookup ranked by
+relevance. The index isn't declared on the model, which would put a GIN index
+in every database's schema; ``create_search_index`` adds it after migrate on
+PostgreSQL only. Other databases, such as the default SQLite development
+setup, fall back to DRF's ``icontains`` search over the same text columns.
+"""
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from rest_framework.filters import SearchFilter
+
+from .models import Course, Module, Video
+
+SEARCH_CONFIG = 'english'
+SEARCH_INDEX = 'course_search_vector_gin'
+AUTOCOMPLETE_LIMIT = 10
+# The columns the search vector is built from (see course_search_vector).
+SEARCH_FIELDS = ('title', 'short_description', 'description')
+
+
+def full_text_enabled(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def create_search_index(using='default', **kwargs):
+    """post_migrate handler: add the GIN index behind search_vector on PostgreSQL."""
+    if not full_text_enabled(using):
+        return
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(SEARCH_INDEX)} '
+            f'ON {quote(Course._meta.db_table)} USING gin ({quote("search_vector")})'
+        )
+
+
+def _titles(queryset, course_field):
+    """Space-separated titles of a course's modules or videos, as a subquery."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{course_field: OuterRef('pk')})
+            .order_by()
+            .values(course_field)
+            .annotate(titles=StringAgg('title', ' '))
+            .values('titles')
+        ),
+        Value(''),
+        output_field=TextField()
+    )
+
+
+def course_search_vector():
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('short_description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(
+            'description', _titles(Module.objects, 'course'),
+            _titles(Video.objects, 'module__course'),
+            weight='C', config=SEARCH_CONFIG
+        )
+    )
+
+
+def refresh_search_vectors(course_ids=None):
+    """Recompute Course.search_vector for the given courses (or all) in one UPDATE."""
+    if not full_text_enabled():
+        return 0
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+    return courses.update(search_vector=course_search_vector())
+
+
+def prefix_query(text):
+    """A query matching documents with words starting with every word in ``text``."""
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{word}:*' for word in words), search_type='raw', config=SEARCH_CONFIG
+    )
+
+
+def autocomplete(queryset, text, limit=AUTOCOMPLETE_LIMIT):
+    """Best matches for a partially typed search, as ``id``/``title``/``slug`` dicts."""
+    if full_text_enabled(queryset.db):
+        query = prefix_query(text)
+        if query is None:
+            return []
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', 'title')
+    else:
+        words = re.findall(r'\w+', text)
+        if not words:
+            return []
+        match = Q()
+        for word in words:
+            match &= Q(title__icontains=word)
+        queryset = queryset.filter(match).order_by('title')
+    return list(queryset.values('id', 'title', 'slug')[:limit])
+
+
+class CourseSearchFilter(SearchFilter):
+    """SearchFilter that uses the ranked full-text index when it's available."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text or not full_text_enabled(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', '-created_at')
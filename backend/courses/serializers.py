@@ -3,10 +3,12 @@ Serializers for courses.
 """
 from rest_framework import serializers
 from .models import Category, Course, Module, Video, Resource, Enrollment
+from .category_tree import get_category_tree
+from .enrollments import ROSTER_FORMATS
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    """Serializer for categories."""
+    """Serializer for categories; subcategories and counts come from the cached tree."""
     
     subcategories = serializers.SerializerMethodField()
     course_count = serializers.SerializerMethodField()
@@ -18,11 +20,26 @@ class CategorySerializer(serializers.ModelSerializer):
             'parent', 'order', 'is_active', 'subcategories', 'course_count'
         ]
     
+    def validate_parent(self, parent):
+        if parent is not None and self.instance is not None and self.instance.is_ancestor_of(parent):
+            raise serializers.ValidationError('A category cannot be moved below itself.')
+        return parent
+    
+    def _tree_node(self, obj):
+        return get_category_tree().nodes.get(obj.id)
+    
     def get_subcategories(self, obj):
-        return CategorySerializer(obj.subcategories.filter(is_active=True), many=True).data
+        node = self._tree_node(obj)
+        if node is None:
+            # Created in a transaction that hasn't committed yet.
+            return CategorySerializer(obj.subcategories.filter(is_active=True), many=True).data
+        return node['subcategories']
     
     def get_course_count(self, obj):
-        return obj.courses.filter(status=Course.Status.PUBLISHED).count()
+        node = self._tree_node(obj)
+        if node is None:
+            return obj.courses.filter(status=Course.Status.PUBLISHED).count()
+        return node['course_count']
 
 
 class VideoSerializer(serializers.ModelSerializer):
@@ -181,12 +198,18 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['enrolled_at']
     
     def get_progress(self, obj):
+        # Enrollments come from enrollments.with_progress(), which annotates
+        # the CourseProgress counters instead of querying per row.
         from progress.models import CourseProgress
-        try:
-            progress = CourseProgress.objects.get(user=obj.user, course=obj.course)
-            return progress.progress_percentage
-        except CourseProgress.DoesNotExist:
-            return 0
+        if not hasattr(obj, 'progress_total_videos'):
+            try:
+                return CourseProgress.objects.get(user=obj.user, course=obj.course).progress_percentage
+            except CourseProgress.DoesNotExist:
+                return 0
+        return CourseProgress(
+            videos_completed=obj.progress_videos_completed or 0,
+            total_videos=obj.progress_total_videos or 0
+        ).progress_percentage
 
 
 class EnrollmentCreateSerializer(serializers.ModelSerializer):
@@ -219,3 +242,27 @@ class BulkEnrollmentSerializer(serializers.Serializer):
         except Course.DoesNotExist:
             raise serializers.ValidationError("Course not found.")
         return value
+
+
+class BulkEnrollmentUploadSerializer(serializers.Serializer):
+    """Serializer for bulk enrolling a roster file (CSV or JSON array)."""
+    
+    file = serializers.FileField()
+    course_id = serializers.IntegerField()
+    expires_at = serializers.DateTimeField(required=False, allow_null=True)
+    format = serializers.ChoiceField(choices=ROSTER_FORMATS, required=False)
+    
+    def validate_course_id(self, value):
+        if not Course.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Course not found.")
+        return value
+    
+    def validate(self, attrs):
+        if not attrs.get('format'):
+            extension = attrs['file'].name.rsplit('.', 1)[-1].lower()
+            if extension not in ROSTER_FORMATS:
+                raise serializers.ValidationError(
+                    {'format': 'Give the roster a .csv or .json name, or pass format.'}
+                )
+            attrs['format'] = extension
+        return attrs
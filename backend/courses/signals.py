@@ -0,0 +1,251 @@
+"""
+Signals for courses app.
+
+Keep the denormalized aggregate columns on Course and Module current as
+videos, modules and enrollments change, keep category paths in step with the
+hierarchy and course search vectors in step with course content, and retire
+the cached category tree and course detail documents when what they show
+changes.
+"""
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from lms_project.signals_utils import is_cascade
+
+from .aggregates import refresh_module_aggregates, refresh_course_aggregates, refresh_enrollment_counts
+from .category_paths import stored_path, update_category_path
+from .category_tree import invalidate_category_tree
+from .course_documents import (
+    forget_course_slug, invalidate_category_documents, invalidate_course_documents
+)
+from .models import Category, Course, Module, Video, Resource, Enrollment
+from .search import SEARCH_FIELDS, full_text_enabled, refresh_search_vectors
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_path(sender, instance, **kwargs):
+    """Record the path stored before a category is saved, if any."""
+    instance._previous_path = stored_path(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=Category)
+def update_category_paths(sender, instance, **kwargs):
+    """Set the category's path and rewrite its subtree if it moved."""
+    update_category_path(instance, getattr(instance, '_previous_path', None))
+
+
+@receiver(pre_save, sender=Course)
+def remember_previous_values(sender, instance, **kwargs):
+    """Record the stored values the course's post_save handlers compare against, if any."""
+    instance._previous_values = None
+    if instance.pk:
+        instance._previous_values = (
+            Course.objects.filter(pk=instance.pk)
+            .values('status', 'category_id', *SEARCH_FIELDS).first()
+        )
+
+
+def _listed_category(status, category_id):
+    """The category whose published-course count includes a course, if any."""
+    return category_id if status == Course.Status.PUBLISHED else None
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def retire_category_tree(sender, instance, **kwargs):
+    invalidate_category_tree()
+    if kwargs['signal'] is post_save:
+        invalidate_category_documents([instance.path, getattr(instance, '_previous_path', None)])
+
+
+@receiver(pre_delete, sender=Category)
+def retire_deleted_category_documents(sender, instance, **kwargs):
+    """Courses lose their category once it's deleted, so find them first."""
+    invalidate_category_documents([instance.path])
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def retire_category_counts(sender, instance, **kwargs):
+    """Retire the tree and category pages when a category gains or loses a published course."""
+    if kwargs['signal'] is post_delete:
+        # What was stored is what the instance last saved or was loaded with.
+        before, after = _listed_category(instance.status, instance.category_id), None
+    else:
+        previous = getattr(instance, '_previous_values', None)
+        before = previous and _listed_category(previous['status'], previous['category_id'])
+        after = _listed_category(instance.status, instance.category_id)
+    if before == after:
+        return
+    invalidate_category_tree()
+    invalidate_category_documents(
+        Category.objects.filter(pk__in={before, after} - {None}).values_list('path', flat=True)
+    )
+
+
+@receiver(pre_save, sender=Video)
+def remember_previous_module(sender, instance, **kwargs):
+    """Record the module a video is being moved out of, if any."""
+    instance._previous_module_id = None
+    if instance.pk:
+        instance._previous_module_id = (
+            Video.objects.filter(pk=instance.pk).values_list('module_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def update_video_aggregates(sender, instance, created=False, **kwargs):
+    """Refresh module and course totals after a video changes."""
+    module_ids = {instance.module_id}
+    previous_module_id = getattr(instance, '_previous_module_id', None)
+    if previous_module_id:
+        module_ids.add(previous_module_id)
+
+    structure_changed = (
+        created or kwargs['signal'] is post_delete or len(module_ids) > 1
+    )
+    refresh_module_aggregates(module_ids)
+    refresh_course_aggregates(
+        Module.objects.filter(pk__in=module_ids).values('course_id'),
+        structure_changed=structure_changed
+    )
+
+
+@receiver(pre_save, sender=Module)
+def remember_previous_course(sender, instance, **kwargs):
+    """Record the course a module is being moved out of, if any."""
+    instance._previous_course_id = None
+    if instance.pk:
+        instance._previous_course_id = (
+            Module.objects.filter(pk=instance.pk).values_list('course_id', flat=True).first()
+        )
+
+
+@receiver(pre_save, sender=Resource)
+def remember_previous_resource_course(sender, instance, **kwargs):
+    """Record the course whose page showed a resource before this save, if any."""
+    instance._previous_course_id = None
+    if instance.pk:
+        instance._previous_course_id = (
+            Resource.objects.filter(pk=instance.pk)
+            .values_list(Coalesce('course_id', 'module__course_id'), flat=True).first()
+        )
+
+
+def _resource_course_id(resource):
+    """The course a resource is attached to, directly or through its module."""
+    if resource.course_id:
+        return resource.course_id
+    return resource.module.course_id if resource.module_id else None
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def update_module_aggregates(sender, instance, **kwargs):
+    """Refresh course totals after a module is added, moved or removed."""
+    course_ids = {instance.course_id}
+    previous_course_id = getattr(instance, '_previous_course_id', None)
+    if previous_course_id:
+        course_ids.add(previous_course_id)
+
+    refresh_course_aggregates(
+        course_ids,
+        structure_changed=kwargs['signal'] is post_delete or len(course_ids) > 1
+    )
+
+
+@receiver(post_save, sender=Course)
+def update_course_search_vector(sender, instance, **kwargs):
+    """Re-index a new course, or one whose searchable text changed."""
+    previous = getattr(instance, '_previous_values', None)
+    if previous is None or any(getattr(instance, name) != previous[name] for name in SEARCH_FIELDS):
+        refresh_search_vectors([instance.pk])
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def update_outline_search_vector(sender, instance, origin=None, **kwargs):
+    """Re-index the courses whose module or video titles changed."""
+    if not full_text_enabled() or is_cascade(origin, sender):
+        # Cascades are covered by the parent's own signal.
+        return
+    if sender is Video:
+        module_ids = {instance.module_id, getattr(instance, '_previous_module_id', None)}
+        course_ids = Module.objects.filter(pk__in=module_ids).values('course_id')
+    else:
+        course_ids = {instance.course_id, getattr(instance, '_previous_course_id', None)}
+    refresh_search_vectors(course_ids)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def retire_course_document(sender, instance, **kwargs):
+    invalidate_course_documents([instance.pk])
+    forget_course_slug(instance.slug)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Resource)
+def retire_outline_course_document(sender, instance, origin=None, **kwargs):
+    """Retire the document of every course whose page shows the changed row."""
+    if is_cascade(origin, sender):
+        # Cascades are covered by the parent's own signal.
+        return
+    if sender is Module:
+        course_ids = {instance.course_id, getattr(instance, '_previous_course_id', None)}
+    elif sender is Video:
+        course_ids = {instance.module.course_id}
+        previous_module_id = getattr(instance, '_previous_module_id', None)
+        if previous_module_id and previous_module_id != instance.module_id:
+            course_ids.update(
+                Module.objects.filter(pk=previous_module_id).values_list('course_id', flat=True)
+            )
+    else:
+        course_ids = {_resource_course_id(instance), getattr(instance, '_previous_course_id', None)}
+    invalidate_course_documents(course_ids)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def retire_instructor_course_documents(sender, instance, created, update_fields=None, **kwargs):
+    """Course pages and listings show the instructor's name."""
+    if created or (
+        # e.g. the last_login update on every sign-in
+        update_fields is not None and not {'first_name', 'last_name', 'email'} & set(update_fields)
+    ):
+        return
+    invalidate_course_documents(
+        Course.objects.filter(instructor=instance).order_by().values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def retire_enrolled_course_document(sender, instance, created=True, **kwargs):
+    """The course page shows the enrolled student count."""
+    if created:
+        invalidate_course_documents([instance.course_id])
+
+
+@receiver(post_save, sender=Enrollment)
+def increment_enrollment_count(sender, instance, created, **kwargs):
+    """Bump the enrolled student counter on a new enrollment."""
+    if created:
+        Course.objects.filter(pk=instance.course_id).update(
+            enrolled_students_count=F('enrolled_students_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Enrollment)
+def recount_enrollments(sender, instance, **kwargs):
+    """Recount enrollments after one is removed."""
+    refresh_enrollment_counts([instance.course_id])
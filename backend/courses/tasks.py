@@ -0,0 +1,39 @@
+"""
+Background tasks for courses.
+"""
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.utils.dateparse import parse_datetime
+
+from lms_project.jobs import TrackedTask
+from .enrollments import enroll_users, iter_roster
+from .models import Course
+
+User = get_user_model()
+
+
+def _enroll(course_id, identifiers, assigned_by_id, expires_at):
+    course = Course.objects.get(pk=course_id)
+    assigned_by = User.objects.filter(pk=assigned_by_id).first() if assigned_by_id else None
+    summary = enroll_users(
+        course, identifiers, assigned_by=assigned_by,
+        expires_at=parse_datetime(expires_at) if expires_at else None
+    )
+    return {'course_id': course_id, **summary}
+
+
+@shared_task(base=TrackedTask, name='courses.bulk_enroll')
+def bulk_enroll(course_id, user_ids, assigned_by_id=None, expires_at=None):
+    """Enroll many users in a course; safe to re-run."""
+    return _enroll(course_id, user_ids, assigned_by_id, expires_at)
+
+
+@shared_task(base=TrackedTask, name='courses.bulk_enroll_roster')
+def bulk_enroll_roster(course_id, path, roster_format, assigned_by_id=None, expires_at=None):
+    """Enroll an uploaded roster file from storage, then delete the file."""
+    try:
+        with default_storage.open(path, 'rb') as roster:
+            return _enroll(course_id, iter_roster(roster, roster_format), assigned_by_id, expires_at)
+    finally:
+        default_storage.delete(path)
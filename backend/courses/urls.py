@@ -4,12 +4,12 @@ URL patterns for courses.
 from django.urls import path
 from .views import (
     CategoryListView, CategoryDetailView,
-    CourseListView, CourseDetailView, FeaturedCoursesView,
+    CourseListView, CourseDetailView, FeaturedCoursesView, CourseAutocompleteView,
     ModuleListCreateView, ModuleDetailView,
     VideoListCreateView, VideoDetailView,
     ResourceListCreateView, ResourceDetailView,
     EnrollmentListView, EnrollmentCreateView, EnrollmentDetailView,
-    SelfEnrollView, BulkEnrollView, MarkCourseCompleteView,
+    SelfEnrollView, BulkEnrollView, BulkEnrollUploadView, MarkCourseCompleteView,
     MyCoursesView
 )
 
@@ -23,7 +23,7 @@ urlpatterns = [
     # Courses
     path('', CourseListView.as_view(), name='course_list'),
     path('featured/', FeaturedCoursesView.as_view(), name='featured_courses'),
-    path('<slug:slug>/', CourseDetailView.as_view(), name='course_detail'),
+    path('autocomplete/', CourseAutocompleteView.as_view(), name='course_autocomplete'),
     
     # Modules
     path('<slug:course_slug>/modules/', ModuleListCreateView.as_view(), name='module_list'),
@@ -42,9 +42,13 @@ urlpatterns = [
     path('enrollments/create/', EnrollmentCreateView.as_view(), name='enrollment_create'),
     path('enrollments/<int:pk>/', EnrollmentDetailView.as_view(), name='enrollment_detail'),
     path('enrollments/bulk/', BulkEnrollView.as_view(), name='bulk_enroll'),
+    path('enrollments/bulk/upload/', BulkEnrollUploadView.as_view(), name='bulk_enroll_upload'),
     path('enrollments/<int:enrollment_id>/complete/', MarkCourseCompleteView.as_view(), name='mark_complete'),
     
     # Student specific
     path('<slug:course_slug>/enroll/', SelfEnrollView.as_view(), name='self_enroll'),
     path('my-courses/', MyCoursesView.as_view(), name='my_courses'),
+    
+    # Course detail last, so its slug pattern doesn't shadow the routes above
+    path('<slug:slug>/', CourseDetailView.as_view(), name='course_detail'),
 ]
@@ -1,12 +1,19 @@
 """
 Views for courses.
 """
+import uuid
+
 from rest_framework import generics, status, permissions
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.core.files.storage import default_storage
+from django.http import Http404
 from django.utils import timezone
 from django.db.models import Q
 from django.contrib.auth import get_user_model
+from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import Category, Course, Module, Video, Resource, Enrollment
 from .serializers import (
@@ -14,21 +21,49 @@ from .serializers import (
     CourseCreateSerializer, ModuleSerializer, ModuleCreateSerializer,
     VideoSerializer, VideoCreateSerializer, ResourceSerializer,
     ResourceCreateSerializer, EnrollmentSerializer, EnrollmentCreateSerializer,
-    BulkEnrollmentSerializer
+    BulkEnrollmentSerializer, BulkEnrollmentUploadSerializer
+)
+from .category_tree import current_version as category_tree_version, get_category_tree
+from .course_documents import (
+    catalog_version, course_id_for_slug, course_version, get_course_document
 )
+from .enrollments import enroll_users, iter_roster, with_progress
+from .search import CourseSearchFilter, autocomplete
+from .tasks import bulk_enroll, bulk_enroll_roster
 from accounts.permissions import IsAdmin, IsAdminOrReadOnly, IsEnrolledOrAdmin
+from lms_project.conditional import (
+    ConditionalGetMixin, is_not_modified, make_etag, validator_headers
+)
+from lms_project.jobs import enqueue, job_key, job_response, wants_async
+from lms_project.pagination import PageNumberOrKeysetPagination
 
 User = get_user_model()
 
 
 # Category Views
 class CategoryListView(generics.ListCreateAPIView):
-    """List and create categories."""
+    """
+    List and create categories.
+    
+    The listing is the whole active tree, served from the cached snapshot
+    with an ETag; a matching If-None-Match gets a 304. Searching falls back
+    to a paginated database query.
+    """
     
     queryset = Category.objects.filter(is_active=True, parent__isnull=True)
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
     search_fields = ['name', 'description']
+    
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('search'):
+            return super().list(request, *args, **kwargs)
+        
+        tree = get_category_tree()
+        headers = validator_headers(tree.etag, public=True)
+        if is_not_modified(request, tree.etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(tree.roots, headers=headers)
 
 
 class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -41,22 +76,47 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 # Course Views
-class CourseListView(generics.ListCreateAPIView):
-    """List and create courses."""
+class CourseListView(ConditionalGetMixin, generics.ListCreateAPIView):
+    """
+    List and create courses.
+    
+    ``?category_tree=<slug>`` limits the listing to courses in that category
+    or any category below it, matched by category path prefix. ``?search=``
+    is ranked full-text search on PostgreSQL (see courses.search).
+    
+    The ETag names the catalog and category tree versions plus the query, so
+    revalidating an unchanged listing costs no queries.
+    """
     
     permission_classes = [IsAdminOrReadOnly]
+    filter_backends = [DjangoFilterBackend, CourseSearchFilter, OrderingFilter]
     filterset_fields = ['category', 'level', 'status', 'is_featured']
     search_fields = ['title', 'description', 'short_description']
     ordering_fields = ['created_at', 'title', 'enrolled_students_count']
     
+    def get_validators(self, request, *args, **kwargs):
+        user = request.user
+        etag = make_etag(
+            'courses', catalog_version(), category_tree_version(),
+            user.is_authenticated and user.is_admin, request.get_full_path()
+        )
+        return etag, None
+    
     def get_queryset(self):
-        queryset = Course.objects.select_related('category', 'instructor')
+        queryset = Course.objects.select_related('category', 'instructor').defer('search_vector')
         user = self.request.user
         
         # Non-admin users only see published courses
         if not user.is_authenticated or not user.is_admin:
             queryset = queryset.filter(status=Course.Status.PUBLISHED)
         
+        category_tree = self.request.query_params.get('category_tree')
+        if category_tree:
+            path = Category.objects.filter(slug=category_tree).values_list('path', flat=True).first()
+            if not path:
+                return queryset.none()
+            queryset = queryset.filter(category__path__startswith=path)
+        
         return queryset
     
     def get_serializer_class(self):
@@ -65,12 +125,43 @@ class CourseListView(generics.ListCreateAPIView):
         return CourseListSerializer
 
 
-class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
-    """Retrieve, update, delete course."""
+class CourseDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    Retrieve, update, delete course.
+    
+    Reads are served from the cached course document, with ``is_enrolled``
+    merged in per request. The validators are the document's, qualified by
+    ``is_enrolled``.
+    """
     
     permission_classes = [IsAdminOrReadOnly]
     lookup_field = 'slug'
     
+    def get_document(self):
+        """The course document and whether this user is enrolled, or a 404."""
+        if not hasattr(self, '_document'):
+            document = get_course_document(self.kwargs['slug'])
+            user = self.request.user
+            is_admin = user.is_authenticated and user.is_admin
+            if document is None or (
+                document.data['status'] != Course.Status.PUBLISHED and not is_admin
+            ):
+                raise Http404
+            
+            is_enrolled = user.is_authenticated and Enrollment.objects.filter(
+                user=user, course_id=document.data['id']
+            ).exists()
+            self._document = document, is_enrolled
+        return self._document
+    
+    def get_validators(self, request, *args, **kwargs):
+        document, is_enrolled = self.get_document()
+        return make_etag(document.etag, is_enrolled), None
+    
+    def retrieve(self, request, *args, **kwargs):
+        document, is_enrolled = self.get_document()
+        return Response({**document.data, 'is_enrolled': is_enrolled})
+    
     def get_queryset(self):
         queryset = Course.objects.select_related('category', 'instructor').prefetch_related('modules__videos', 'resources')
         user = self.request.user
@@ -86,6 +177,20 @@ class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CourseDetailSerializer
 
 
+class CourseAutocompleteView(APIView):
+    """Suggest published courses for a partially typed search (``?q=``)."""
+    
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response([])
+        return Response(
+            autocomplete(Course.objects.filter(status=Course.Status.PUBLISHED), text)
+        )
+
+
 class FeaturedCoursesView(generics.ListAPIView):
     """List featured courses."""
     
@@ -100,11 +205,23 @@ class FeaturedCoursesView(generics.ListAPIView):
 
 
 # Module Views
-class ModuleListCreateView(generics.ListCreateAPIView):
-    """List and create modules for a course."""
+class ModuleListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
+    """
+    List and create modules for a course.
+    
+    The modules are part of the course page, so the listing's ETag names the
+    course document's version.
+    """
     
     permission_classes = [IsAdminOrReadOnly]
     
+    def get_validators(self, request, *args, **kwargs):
+        course_id = course_id_for_slug(kwargs['course_slug'])
+        if course_id is None:
+            return None, None
+        etag = make_etag('modules', course_id, course_version(course_id), request.get_full_path())
+        return etag, None
+    
     def get_queryset(self):
         course_slug = self.kwargs.get('course_slug')
         return Module.objects.filter(course__slug=course_slug).prefetch_related('videos', 'resources')
@@ -191,17 +308,22 @@ class ResourceDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # Enrollment Views
 class EnrollmentListView(generics.ListAPIView):
-    """List enrollments (admin sees all, students see their own)."""
+    """
+    List enrollments (admin sees all, students see their own).
+    
+    ``?pagination=cursor`` switches to keyset pages for walking the whole table.
+    """
     
     serializer_class = EnrollmentSerializer
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = [permissions.IsAuthenticated]
     filterset_fields = ['status', 'course']
     
     def get_queryset(self):
         user = self.request.user
         if user.is_admin:
-            return Enrollment.objects.select_related('user', 'course').all()
-        return Enrollment.objects.filter(user=user).select_related('course')
+            return with_progress(Enrollment.objects.all())
+        return with_progress(Enrollment.objects.filter(user=user))
 
 
 class EnrollmentCreateView(generics.CreateAPIView):
@@ -244,6 +366,7 @@ class SelfEnrollView(APIView):
                 status=status.HTTP_200_OK
             )
         
+        enrollment = with_progress(Enrollment.objects.filter(pk=enrollment.pk)).get()
         return Response(
             EnrollmentSerializer(enrollment).data,
             status=status.HTTP_201_CREATED
@@ -251,7 +374,13 @@ class SelfEnrollView(APIView):
 
 
 class BulkEnrollView(APIView):
-    """Bulk enroll students in a course (admin only)."""
+    """
+    Bulk enroll students in a course (admin only).
+    
+    Responds with counts of enrollments created, students already enrolled
+    and ids not found. With ?async=1 the enrollment runs as a background job
+    and the response is 202 with the job's status URL.
+    """
     
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     
@@ -259,37 +388,71 @@ class BulkEnrollView(APIView):
         serializer = BulkEnrollmentSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        course = Course.objects.get(id=serializer.validated_data['course_id'])
+        course_id = serializer.validated_data['course_id']
         user_ids = serializer.validated_data['user_ids']
         expires_at = serializer.validated_data.get('expires_at')
         
-        created_enrollments = []
-        existing_enrollments = []
+        if wants_async(request):
+            job = enqueue(
+                bulk_enroll, course_id, user_ids,
+                assigned_by_id=request.user.id,
+                expires_at=expires_at.isoformat() if expires_at else None,
+                key=job_key(request, 'bulk-enroll', course_id, sorted(set(user_ids)), expires_at),
+                owner=request.user
+            )
+            return job_response(request, job)
         
-        for user_id in user_ids:
-            try:
-                user = User.objects.get(id=user_id)
-                enrollment, created = Enrollment.objects.get_or_create(
-                    user=user,
-                    course=course,
-                    defaults={
-                        'status': Enrollment.Status.ACTIVE,
-                        'assigned_by': request.user,
-                        'expires_at': expires_at
-                    }
-                )
-                if created:
-                    created_enrollments.append(enrollment)
-                else:
-                    existing_enrollments.append(enrollment)
-            except User.DoesNotExist:
-                continue
+        summary = enroll_users(
+            Course.objects.get(id=course_id), user_ids,
+            assigned_by=request.user, expires_at=expires_at
+        )
+        return Response({'course_id': course_id, **summary})
+
+
+class BulkEnrollUploadView(APIView):
+    """
+    Bulk enroll a roster file in a course (admin only).
+    
+    Accepts a CSV with a ``user_id`` and/or ``email`` column, or a JSON array
+    of ids, emails or ``{"user_id"|"email": ...}`` objects, and works through
+    it in chunks. With ?async=1 the file is stored and enrolled by a
+    background job.
+    """
+    
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    def post(self, request):
+        serializer = BulkEnrollmentUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        roster = serializer.validated_data['file']
+        roster_format = serializer.validated_data['format']
+        course_id = serializer.validated_data['course_id']
+        expires_at = serializer.validated_data.get('expires_at')
+        
+        if wants_async(request):
+            path = default_storage.save(f'rosters/{uuid.uuid4().hex}.{roster_format}', roster)
+            job = enqueue(
+                bulk_enroll_roster, course_id, path, roster_format,
+                assigned_by_id=request.user.id,
+                expires_at=expires_at.isoformat() if expires_at else None,
+                key=job_key(request, 'bulk-enroll-roster'),
+                owner=request.user
+            )
+            return job_response(request, job)
         
-        return Response({
-            'created': len(created_enrollments),
-            'existing': len(existing_enrollments),
-            'enrollments': EnrollmentSerializer(created_enrollments, many=True).data
-        })
+        try:
+            summary = enroll_users(
+                Course.objects.get(id=course_id), iter_roster(roster, roster_format),
+                assigned_by=request.user, expires_at=expires_at
+            )
+        except ValueError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'course_id': course_id, **summary})
 
 
 class EnrollmentDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -297,7 +460,7 @@ class EnrollmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     serializer_class = EnrollmentSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
-    queryset = Enrollment.objects.all()
+    queryset = with_progress(Enrollment.objects.all())
 
 
 class MarkCourseCompleteView(APIView):
@@ -307,7 +470,7 @@ class MarkCourseCompleteView(APIView):
     
     def post(self, request, enrollment_id):
         try:
-            enrollment = Enrollment.objects.get(id=enrollment_id)
+            enrollment = with_progress(Enrollment.objects.all()).get(id=enrollment_id)
         except Enrollment.DoesNotExist:
             return Response(
                 {'error': 'Enrollment not found.'},
@@ -329,6 +492,4 @@ class MyCoursesView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Enrollment.objects.filter(
-            user=self.request.user
-        ).select_related('course', 'course__category', 'course__instructor')
+        return with_progress(Enrollment.objects.filter(user=self.request.user))
@@ -0,0 +1,81 @@
+"""
+Process-wide Drive API client pieces shared by every GoogleDriveService.
+
+``googleapiclient.discovery.build()`` reads and parses the Drive discovery
+document and generates every method of the resources it's asked for, then
+opens a new HTTP connection, on each call. Here that work is done once:
+
+* the discovery document is the static copy bundled with
+  google-api-python-client, parsed once per process, so no network is needed;
+* the ``files`` and ``changes`` resources are generated once per process and
+  shared, since their methods only build requests;
+* each thread keeps one ``httplib2.Http``, whose keep-alive connections to
+  the Drive API are reused across requests (``httplib2.Http`` isn't
+  thread-safe, so it can't be shared more widely).
+
+Per-user credentials are layered on top: each request is executed through an
+``AuthorizedHttp`` wrapping the thread's pooled ``Http``.
+"""
+import functools
+import json
+import threading
+
+import google_auth_httplib2
+import httplib2
+from django.conf import settings
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+API_NAME = 'drive'
+API_VERSION = 'v3'
+
+_local = threading.local()
+
+
+@functools.lru_cache(maxsize=None)
+def discovery_document():
+    """The parsed Drive discovery document bundled with the client library."""
+    document = get_static_doc(API_NAME, API_VERSION)
+    if document is None:
+        raise RuntimeError(
+            f'google-api-python-client has no bundled {API_NAME} {API_VERSION} discovery document.'
+        )
+    return json.loads(document)
+
+
+@functools.lru_cache(maxsize=None)
+def drive_resource():
+    """
+    The Drive API resource, built once per process without credentials.
+
+    Requests made from it must be executed with an authorized ``http``.
+    """
+    return build_from_document(discovery_document(), http=httplib2.Http())
+
+
+@functools.lru_cache(maxsize=None)
+def files_resource():
+    return drive_resource().files()
+
+
+@functools.lru_cache(maxsize=None)
+def changes_resource():
+    return drive_resource().changes()
+
+
+def pooled_http():
+    """This thread's ``httplib2.Http``, whose connections outlive a request."""
+    http = getattr(_local, 'http', None)
+    if http is None:
+        http = _local.http = httplib2.Http(timeout=settings.GOOGLE_DRIVE_TIMEOUT)
+    return http
+
+
+def authorized_http(credentials):
+    """Sign requests with ``credentials`` over this thread's pooled connections."""
+    return google_auth_httplib2.AuthorizedHttp(credentials, http=pooled_http())
+
+
+def refresh_request():
+    """A google-auth transport for refreshing tokens over the pooled connections."""
+    return google_auth_httplib2.Request(pooled_http())
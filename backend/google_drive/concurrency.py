@@ -0,0 +1,89 @@
+"""
+Running Drive calls from async views without tying up the server.
+
+GoogleDriveService is synchronous (googleapiclient over pooled httplib2
+connections), so async views hand each call to a dedicated thread pool and
+await it; the event loop keeps serving other requests meanwhile. Two limits
+keep a slow Drive from backing work up:
+
+* at most ``GOOGLE_DRIVE_CONCURRENCY`` calls per event loop are in flight,
+  and a call that can't start in time fails with 503 instead of queueing;
+* a call gets ``GOOGLE_DRIVE_REQUEST_TIMEOUT`` seconds in all, after which
+  the view answers 504. The call's thread finishes on its own, and keeps its
+  slot until it does, so timed-out calls can't pile up past the limit.
+"""
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+_limits = weakref.WeakKeyDictionary()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class DriveBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many Google Drive requests are in progress; try again shortly.'
+    default_code = 'drive_busy'
+
+
+class DriveTimeout(APIException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = 'Google Drive took too long to respond.'
+    default_code = 'drive_timeout'
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.GOOGLE_DRIVE_CONCURRENCY, thread_name_prefix='drive'
+            )
+        return _executor
+
+
+def _run(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        # A token refresh saves the user from this thread; don't keep its connection.
+        close_old_connections()
+
+
+def _limit(loop):
+    limit = _limits.get(loop)
+    if limit is None:
+        limit = _limits[loop] = asyncio.Semaphore(settings.GOOGLE_DRIVE_CONCURRENCY)
+    return limit
+
+
+async def drive_call(fn, *args, **kwargs):
+    """Run the blocking Drive call ``fn(*args, **kwargs)`` on the Drive thread pool."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.GOOGLE_DRIVE_REQUEST_TIMEOUT
+    limit = _limit(loop)
+    try:
+        await asyncio.wait_for(limit.acquire(), deadline - loop.time())
+    except asyncio.TimeoutError:
+        raise DriveBusy()
+
+    def finished(future):
+        limit.release()
+        if not future.cancelled():
+            # Retrieved, so an error after a timeout isn't logged as unhandled.
+            future.exception()
+
+    future = loop.run_in_executor(_pool(), functools.partial(_run, fn, *args, **kwargs))
+    future.add_done_callback(finished)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+    except asyncio.TimeoutError:
+        raise DriveTimeout()
@@ -0,0 +1,103 @@
+"""
+Concurrent crawl of a Google Drive folder tree.
+
+Every folder's listing is one task on a thread pool of
+``GOOGLE_DRIVE_CRAWL_WORKERS`` threads; a task follows ``next_page_token``
+to the end and queues each subfolder it finds as another task, so wide trees
+are listed in parallel while no more than that many Drive calls are in flight.
+Each worker thread has its own GoogleDriveService, since the pooled HTTP
+connection behind one isn't thread-safe.
+"""
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from .services import GoogleDriveService
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+# The largest page Drive serves.
+PAGE_SIZE = 1000
+
+
+class DriveCrawlError(Exception):
+    """Drive refused a listing, so the tree can't be read completely."""
+
+
+@dataclass
+class DriveFolder:
+    id: str
+    name: str
+    files: list = field(default_factory=list)
+    subfolders: list = field(default_factory=list)
+
+    def walk(self):
+        """Yield this folder and every folder below it, depth first."""
+        yield self
+        for subfolder in self.subfolders:
+            yield from subfolder.walk()
+
+
+def natural_key(name):
+    """Sort "2 - Setup" before "10 - Deploy"."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def crawl_folder(user, folder_id, max_workers=None):
+    """
+    Read the whole tree below ``folder_id`` as the user sees it.
+
+    Listings are fetched live, not from the metadata cache, but they still
+    refresh it. Files and subfolders come back in natural name order.
+    """
+    service = GoogleDriveService(user=user, live=True)
+    root = service.get_file(folder_id)
+    if 'error' in root:
+        raise DriveCrawlError(root['error'])
+    if root['mime_type'] != FOLDER_MIME_TYPE:
+        raise DriveCrawlError(f'{root["name"]} is not a folder.')
+
+    # The first service has refreshed and saved the user's token if it had
+    # expired, so the workers' services won't touch the database.
+    local = threading.local()
+
+    def list_folder(folder):
+        if not hasattr(local, 'service'):
+            local.service = GoogleDriveService(user=user, live=True)
+        items, page_token = [], None
+        while True:
+            result = local.service.list_files(
+                folder_id=folder.id, file_type='any', page_size=PAGE_SIZE, page_token=page_token
+            )
+            if 'error' in result:
+                raise DriveCrawlError(result['error'])
+            items.extend(result['files'])
+            page_token = result.get('next_page_token')
+            if not page_token:
+                return folder, items
+
+    root = DriveFolder(id=folder_id, name=root['name'])
+    seen = {folder_id}
+    with ThreadPoolExecutor(max_workers or settings.GOOGLE_DRIVE_CRAWL_WORKERS) as pool:
+        pending = {pool.submit(list_folder, root)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder, items = future.result()
+                    for item in sorted(items, key=lambda item: natural_key(item['name'])):
+                        if item['mime_type'] != FOLDER_MIME_TYPE:
+                            folder.files.append(item)
+                        elif item['id'] not in seen:
+                            # A folder can have several parents; list it once.
+                            seen.add(item['id'])
+                            subfolder = DriveFolder(id=item['id'], name=item['name'])
+                            folder.subfolders.append(subfolder)
+                            pending.add(pool.submit(list_folder, subfolder))
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return root
@@ -0,0 +1,124 @@
+"""
+Google OAuth credentials for Drive calls, refreshed once per user at a time.
+
+Each user's current access token and its expiry are cached under
+``drive:credentials:<user id>``, so every process sees a refreshed token as
+soon as it exists, whatever its copy of the user row says. Tokens are
+refreshed REFRESH_MARGIN before they expire, so a request never finds one
+expired. Only one caller refreshes a user's token at a time, behind a
+``cache.add`` lock. While it does, the others keep using the current token,
+or wait briefly for the new one if the current token is too close to expiry.
+The new token is saved to the user row with an ``update_fields`` save.
+"""
+import time
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from google.oauth2.credentials import Credentials
+
+from .client import refresh_request
+
+SCOPES = [
+    'https://www.googleapis.com/auth/drive.readonly',
+    'https://www.googleapis.com/auth/drive.metadata.readonly'
+]
+TOKEN_URI = 'https://oauth2.googleapis.com/token'
+# Refresh this long before expiry. google-auth refreshes credentials on its
+# own (uncoordinated) from 3m45s before expiry, so both stay above that.
+REFRESH_MARGIN = timedelta(minutes=5)
+USABLE_MARGIN = timedelta(minutes=4)
+# How long a refresh may hold the lock, and how often waiters look for its result.
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+# Google access tokens last an hour; assumed when a refresh doesn't say.
+DEFAULT_LIFETIME = timedelta(hours=1)
+
+
+def _key(user_id):
+    return f'drive:credentials:{user_id}'
+
+
+def _current(user):
+    """The newest token known for ``user``, and its expiry."""
+    entry = cache.get(_key(user.pk))
+    if entry is not None:
+        return entry['token'], entry['expiry']
+    return user.google_access_token, user.google_token_expiry
+
+
+def _expires_within(expiry, margin):
+    return expiry is not None and expiry - timezone.now() < margin
+
+
+def _credentials(user, token, expiry):
+    return Credentials(
+        token=token,
+        refresh_token=user.google_refresh_token,
+        token_uri=TOKEN_URI,
+        client_id=settings.SOCIAL_AUTH_GOOGLE_OAUTH2_KEY,
+        client_secret=settings.SOCIAL_AUTH_GOOGLE_OAUTH2_SECRET,
+        scopes=SCOPES,
+        # google-auth works in naive UTC.
+        expiry=expiry and timezone.make_naive(expiry, dt_timezone.utc)
+    )
+
+
+def remember(user):
+    """Make ``user``'s saved token the current one, e.g. after they sign in again."""
+    expiry = user.google_token_expiry
+    lifetime = expiry - timezone.now() if expiry else DEFAULT_LIFETIME
+    cache.set(
+        _key(user.pk),
+        {'token': user.google_access_token, 'expiry': expiry},
+        max(int(lifetime.total_seconds()), 1)
+    )
+
+
+def _refresh(user):
+    token, expiry = _current(user)
+    if not _expires_within(expiry, REFRESH_MARGIN):
+        # Another caller finished a refresh just before we took the lock.
+        return _credentials(user, token, expiry)
+
+    credentials = _credentials(user, token, expiry)
+    credentials.refresh(refresh_request())
+    user.google_access_token = credentials.token
+    user.google_token_expiry = (
+        timezone.make_aware(credentials.expiry, dt_timezone.utc) if credentials.expiry
+        else timezone.now() + DEFAULT_LIFETIME
+    )
+    user.save(update_fields=['google_access_token', 'google_token_expiry'])
+    remember(user)
+    return credentials
+
+
+def get_credentials(user):
+    """
+    Credentials for ``user``'s Drive, refreshing the token first if it's due.
+
+    Raises google-auth's RefreshError if Google refuses the refresh.
+    """
+    token, expiry = _current(user)
+    if not user.google_refresh_token or not _expires_within(expiry, REFRESH_MARGIN):
+        return _credentials(user, token, expiry)
+
+    lock = _key(user.pk) + ':refreshing'
+    if cache.add(lock, True, LOCK_TIMEOUT):
+        try:
+            return _refresh(user)
+        finally:
+            cache.delete(lock)
+
+    # Someone else is refreshing; use the current token while it lasts.
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while _expires_within(expiry, USABLE_MARGIN) and time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        token, expiry = _current(user)
+        if cache.get(lock) is None:
+            # The refresh is over. If it failed, google-auth refreshes the
+            # token itself when it's used.
+            token, expiry = _current(user)
+            break
+    return _credentials(user, token, expiry)
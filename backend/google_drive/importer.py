@@ -0,0 +1,203 @@
+"""
+Bulk import of a Drive folder tree into a course.
+
+Videos directly in the folder go to a module named after it, and each
+subfolder, with everything below it, becomes a module of its own. Videos
+become Video rows; other files become Resources, of the course when they sit
+in the folder itself and of their module otherwise.
+
+Files already in the course (matched by Drive file id) are skipped and
+modules already there (matched by title) are added to, so re-running an
+import only adds what's new. ``plan_import`` works the changes out without
+writing anything, which is all a dry run does; ``apply_import`` inserts them
+with one ``bulk_create`` per model and then refreshes what the model signals
+would have.
+"""
+import os
+
+from django.db import transaction
+from django.db.models import Max, Q
+
+from courses.aggregates import refresh_course_aggregates, refresh_module_aggregates
+from courses.course_documents import invalidate_course_documents
+from courses.models import Course, Module, Resource, Video
+from courses.search import refresh_search_vectors
+from .crawler import crawl_folder
+
+TITLE_LENGTH = 200
+URL_LENGTH = 500
+
+RESOURCE_TYPES = (
+    ('pdf', Resource.ResourceType.PDF),
+    ('spreadsheet', Resource.ResourceType.SPREADSHEET),
+    ('sheet', Resource.ResourceType.SPREADSHEET),
+    ('excel', Resource.ResourceType.SPREADSHEET),
+    ('csv', Resource.ResourceType.SPREADSHEET),
+    ('presentation', Resource.ResourceType.PRESENTATION),
+    ('powerpoint', Resource.ResourceType.PRESENTATION),
+    ('document', Resource.ResourceType.DOC),
+    ('msword', Resource.ResourceType.DOC),
+    ('text/x-', Resource.ResourceType.CODE),
+    ('javascript', Resource.ResourceType.CODE),
+    ('json', Resource.ResourceType.CODE),
+)
+
+
+def _title(name):
+    return os.path.splitext(name)[0][:TITLE_LENGTH] or name[:TITLE_LENGTH]
+
+
+def _is_video(file):
+    return (file['mime_type'] or '').startswith('video/')
+
+
+def _resource_type(mime_type):
+    for fragment, resource_type in RESOURCE_TYPES:
+        if fragment in (mime_type or ''):
+            return resource_type
+    return Resource.ResourceType.OTHER
+
+
+def _video(file):
+    thumbnail_url = file.get('thumbnail_url')
+    return {
+        'title': _title(file['name']),
+        'google_drive_file_id': file['id'],
+        'google_drive_url': file['embed_url'],
+        'thumbnail_url': thumbnail_url if thumbnail_url and len(thumbnail_url) <= URL_LENGTH else None,
+        'duration_minutes': file.get('duration_minutes') or 0,
+    }
+
+
+def _resource(file):
+    return {
+        'title': _title(file['name']),
+        'resource_type': _resource_type(file['mime_type']),
+        'google_drive_file_id': file['id'],
+        'google_drive_url': file.get('view_url') or file['embed_url'],
+        'file_size_bytes': int(file.get('size') or 0),
+    }
+
+
+def plan_import(course, tree):
+    """
+    Work out what importing ``tree`` (from ``crawl_folder``) into ``course`` adds.
+
+    Returns a JSON-serializable plan: the modules to create or add to, each
+    with its new videos and resources, the new course resources and counts.
+    """
+    existing_files = set(
+        Video.objects.filter(module__course=course).values_list('google_drive_file_id', flat=True)
+    ) | set(
+        Resource.objects.filter(Q(course=course) | Q(module__course=course))
+        .values_list('google_drive_file_id', flat=True)
+    )
+    existing_modules = dict(course.modules.values_list('title', 'pk'))
+    skipped = 0
+
+    def new(files):
+        nonlocal skipped
+        fresh = [f for f in files if f['id'] not in existing_files]
+        skipped += len(files) - len(fresh)
+        existing_files.update(f['id'] for f in fresh)
+        return fresh
+
+    # Folders with the same name share a module, as they would by title.
+    sections = {tree.name[:TITLE_LENGTH]: [f for f in tree.files if _is_video(f)]}
+    for subfolder in tree.subfolders:
+        sections.setdefault(subfolder.name[:TITLE_LENGTH], []).extend(
+            f for folder in subfolder.walk() for f in folder.files
+        )
+    course_resources = [_resource(f) for f in new([f for f in tree.files if not _is_video(f)])]
+
+    modules = []
+    for title, files in sections.items():
+        files = new(files)
+        if files:
+            modules.append({
+                'title': title,
+                'module_id': existing_modules.get(title),
+                'videos': [_video(f) for f in files if _is_video(f)],
+                'resources': [_resource(f) for f in files if not _is_video(f)],
+            })
+
+    return {
+        'course_id': course.pk,
+        'folder_id': tree.id,
+        'modules': modules,
+        'course_resources': course_resources,
+        'counts': {
+            'modules': sum(1 for m in modules if m['module_id'] is None),
+            'videos': sum(len(m['videos']) for m in modules),
+            'resources': len(course_resources) + sum(len(m['resources']) for m in modules),
+            'skipped': skipped,
+        },
+    }
+
+
+def apply_import(course, plan):
+    """Insert a plan's modules, videos and resources with one bulk_create per model."""
+    with transaction.atomic():
+        next_order = (course.modules.aggregate(order=Max('order'))['order'] or 0) + 1
+        new_modules = []
+        for section in plan['modules']:
+            if section['module_id'] is None:
+                new_modules.append(Module(course=course, title=section['title'], order=next_order))
+                next_order += 1
+        Module.objects.bulk_create(new_modules)
+
+        created = iter(new_modules)
+        modules = {}
+        for section in plan['modules']:
+            modules[section['title']] = (
+                next(created).pk if section['module_id'] is None else section['module_id']
+            )
+        video_orders = dict(
+            Video.objects.filter(module__in=modules.values()).order_by()
+            .values_list('module').annotate(order=Max('order'))
+        )
+        resource_orders = dict(
+            Resource.objects.filter(module__in=modules.values()).order_by()
+            .values_list('module').annotate(order=Max('order'))
+        )
+
+        videos, resources = [], []
+        for section in plan['modules']:
+            module_id = modules[section['title']]
+            first = video_orders.get(module_id, 0) + 1
+            videos.extend(
+                Video(module_id=module_id, order=first + i, **video)
+                for i, video in enumerate(section['videos'])
+            )
+            first = resource_orders.get(module_id, 0) + 1
+            resources.extend(
+                Resource(module_id=module_id, order=first + i, **resource)
+                for i, resource in enumerate(section['resources'])
+            )
+        first = (course.resources.aggregate(order=Max('order'))['order'] or 0) + 1
+        resources.extend(
+            Resource(course=course, order=first + i, **resource)
+            for i, resource in enumerate(plan['course_resources'])
+        )
+        Video.objects.bulk_create(videos, batch_size=500)
+        Resource.objects.bulk_create(resources, batch_size=500)
+
+        # bulk_create skips the signals that maintain these.
+        refresh_module_aggregates(modules.values())
+        refresh_course_aggregates([course.pk], structure_changed=bool(videos))
+        refresh_search_vectors([course.pk])
+        invalidate_course_documents([course.pk])
+    return plan['counts']
+
+
+def import_folder(user, course, folder_id, dry_run=False):
+    """Crawl ``folder_id`` as ``user`` and import it into ``course``, or only plan it."""
+    tree = crawl_folder(user, folder_id)
+    if dry_run:
+        return {**plan_import(course, tree), 'dry_run': True}
+    with transaction.atomic():
+        # Concurrent imports into one course would plan the same new modules.
+        course = Course.objects.select_for_update().get(pk=course.pk)
+        plan = plan_import(course, tree)
+        apply_import(course, plan)
+    return {**plan, 'dry_run': False}
@@ -0,0 +1,43 @@
+"""
+Management command to apply Drive's change feed to Video and Resource metadata.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from google_drive.sync import DriveSyncError, sync_all_changes, sync_changes
+
+
+class Command(BaseCommand):
+    help = 'Updates Video and Resource metadata from the Drive change feed of connected admins'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Only sync the Drive of the user with this email'
+        )
+
+    def handle(self, *args, **options):
+        if options['user']:
+            User = get_user_model()
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}.")
+            try:
+                result = sync_changes(user)
+            except DriveSyncError as e:
+                raise CommandError(f'Drive sync failed: {e}')
+            if result['started']:
+                self.stdout.write(self.style.SUCCESS(
+                    'Started tracking changes; the next sync applies them.'
+                ))
+                return
+        else:
+            result = sync_all_changes()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Applied {result['changes']} changes: updated {result['videos']} videos "
+            f"and {result['resources']} resources, {result['missing']} missing from Drive."
+        ))
+        if result.get('errors'):
+            self.stdout.write(self.style.WARNING(f"{result['errors']} users could not be synced."))
@@ -0,0 +1,102 @@
+"""
+Per-user cache of Drive metadata with stale-while-revalidate.
+
+Listings are cached under (user, folder, type, page size, page token),
+searches under (user, query, type) and single files under (user, file id).
+Drive shows each user different files, so nothing is shared between users.
+Batched lookups (``GoogleDriveService.get_files``) read and write the same
+single-file entries, many at a time.
+
+An entry is fresh for ``GOOGLE_DRIVE_CACHE_TTL`` seconds. After that it is
+still served, for up to ``GOOGLE_DRIVE_CACHE_STALE_TTL`` more seconds, while a
+single background refetch replaces it; only a miss waits on Drive. Errors are
+never cached.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Bump when the cached layout changes so old entries are never read.
+CACHE_FORMAT = 2
+# How long one refetch may hold the refresh lock before another may start.
+REFRESH_LOCK_TIMEOUT = 60
+
+
+def _key(user_id, kind, params):
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:32]
+    return f'drive:{CACHE_FORMAT}:{kind}:{user_id}:{digest}'
+
+
+def _fresh_for():
+    return settings.GOOGLE_DRIVE_CACHE_TTL
+
+
+def _timeout():
+    return settings.GOOGLE_DRIVE_CACHE_TTL + settings.GOOGLE_DRIVE_CACHE_STALE_TTL
+
+
+def store(user_id, kind, params, value):
+    """Cache a successful Drive result; results with an ``error`` are dropped."""
+    if 'error' in value:
+        return
+    entry = {'fetched_at': time.time(), 'value': value}
+    cache.set(_key(user_id, kind, params), entry, _timeout())
+
+
+def store_many(user_id, kind, items):
+    """Cache many successful results, given as ``(params, value)`` pairs, in one call."""
+    entry_time = time.time()
+    cache.set_many({
+        _key(user_id, kind, params): {'fetched_at': entry_time, 'value': value}
+        for params, value in items if 'error' not in value
+    }, _timeout())
+
+
+def finish_refresh(user_id, kind, params):
+    """Release the refresh lock taken for a stale entry."""
+    cache.delete(_key(user_id, kind, params) + ':refreshing')
+
+
+def get_or_fetch(user_id, kind, params, fetch, revalidate):
+    """
+    Return the cached result for ``params``, calling ``fetch()`` on a miss.
+
+    A stale hit is returned as is, and ``revalidate()`` is called to refetch
+    it in the background unless another refetch is already under way.
+    ``revalidate`` must call ``finish_refresh`` when it's done.
+    """
+    key = _key(user_id, kind, params)
+    entry = cache.get(key)
+    if entry is None:
+        value = fetch()
+        store(user_id, kind, params, value)
+        return value
+
+    if time.time() - entry['fetched_at'] >= _fresh_for():
+        if cache.add(key + ':refreshing', True, REFRESH_LOCK_TIMEOUT):
+            revalidate()
+    return entry['value']
+
+
+
+def get_many(user_id, kind, params_list):
+    """
+    Look up many cached results in one cache call.
+
+    Returns the values in ``params_list`` order, with ``None`` for misses,
+    and the params of the stale hits this caller took the refresh lock for;
+    the caller refetches those and calls ``finish_refresh`` for each.
+    """
+    keys = [_key(user_id, kind, params) for params in params_list]
+    entries = cache.get_many(keys)
+    values, stale = [], []
+    for params, key in zip(params_list, keys):
+        entry = entries.get(key)
+        values.append(entry and entry['value'])
+        if entry is not None and time.time() - entry['fetched_at'] >= _fresh_for():
+            if cache.add(key + ':refreshing', True, REFRESH_LOCK_TIMEOUT):
+                stale.append(params)
+    return values, stale
@@ -0,0 +1,24 @@
+"""
+Models for Google Drive integration.
+"""
+from django.conf import settings
+from django.db import models
+
+
+class DriveChangeCursor(models.Model):
+    """Where a user's Drive change feed was last read up to (see google_drive.sync)."""
+    
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='drive_change_cursor'
+    )
+    page_token = models.CharField(max_length=255)
+    synced_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Drive change cursor'
+        verbose_name_plural = 'Drive change cursors'
+    
+    def __str__(self):
+        return f"{self.user} @ {self.page_token}"
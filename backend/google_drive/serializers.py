@@ -0,0 +1,19 @@
+"""
+Serializers for Google Drive integration.
+"""
+from rest_framework import serializers
+
+from courses.models import Course
+
+
+class DriveFolderImportSerializer(serializers.Serializer):
+    """Serializer for importing a Drive folder tree into a course."""
+    
+    course_id = serializers.IntegerField()
+    folder_id = serializers.CharField(max_length=100)
+    dry_run = serializers.BooleanField(default=False)
+    
+    def validate_course_id(self, value):
+        if not Course.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Course not found.")
+        return value
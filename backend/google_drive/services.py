@@ -1,26 +1,46 @@
 """
 Google Drive API service for managing video content.
 """
-import os
-from datetime import datetime, timedelta
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 
+from kombu.exceptions import OperationalError
+
+from . import credentials, metadata_cache
+from .client import authorized_http, changes_resource, drive_resource, files_resource
+
+# Fields fetched for a single file.
+FILE_FIELDS = (
+    "id, name, mimeType, size, trashed, thumbnailLink, webViewLink, webContentLink, "
+    "createdTime, modifiedTime, videoMediaMetadata"
+)
+# The most calls Drive accepts in one batch request.
+BATCH_LIMIT = 100
+
 
 class GoogleDriveService:
-    """Service class for interacting with Google Drive API."""
+    """
+    Service class for interacting with Google Drive API.
+    
+    The Drive resource and HTTP connections are shared (see
+    google_drive.client); an instance only holds the user's credentials,
+    whose token is refreshed ahead of expiry, once per user (see
+    google_drive.credentials).
+    Listings, searches and file lookups are cached per user with
+    stale-while-revalidate (see google_drive.metadata_cache); a ``live``
+    service always asks Drive and only writes to the cache.
+    """
     
-    SCOPES = [
-        'https://www.googleapis.com/auth/drive.readonly',
-        'https://www.googleapis.com/auth/drive.metadata.readonly'
-    ]
+    SCOPES = credentials.SCOPES
     
-    def __init__(self, user=None):
+    def __init__(self, user=None, live=False):
         """Initialize the service with user credentials."""
         self.user = user
-        self.service = None
+        self.live = live
+        self.files = None
+        self.changes = None
+        self.credentials = None
+        self.http = None
         
         if user and user.google_access_token:
             self._initialize_service()
@@ -28,31 +48,96 @@ class GoogleDriveService:
     def _initialize_service(self):
         """Initialize the Google Drive service with user credentials."""
         try:
-            creds = Credentials(
-                token=self.user.google_access_token,
-                refresh_token=self.user.google_refresh_token,
-                token_uri='https://oauth2.googleapis.com/token',
-                client_id=settings.SOCIAL_AUTH_GOOGLE_OAUTH2_KEY,
-                client_secret=settings.SOCIAL_AUTH_GOOGLE_OAUTH2_SECRET,
-                scopes=self.SCOPES
-            )
-            
-            # Refresh token if expired
-            if self.user.google_token_expiry and datetime.now() >= self.user.google_token_expiry:
-                if creds.refresh_token:
-                    creds.refresh(Request())
-                    self.user.google_access_token = creds.token
-                    self.user.google_token_expiry = datetime.now() + timedelta(hours=1)
-                    self.user.save()
-            
-            self.service = build('drive', 'v3', credentials=creds)
+            self.credentials = credentials.get_credentials(self.user)
+            self.http = authorized_http(self.credentials)
+            self.files = files_resource()
+            self.changes = changes_resource()
         except Exception as e:
             print(f"Error initializing Google Drive service: {e}")
-            self.service = None
+            self.files = None
+    
+    def _cached(self, kind, **params):
+        """Serve a Drive call from the user's metadata cache."""
+        if not self.files:
+            return {'error': 'Google Drive service not initialized'}
+        fetch = getattr(self, f'_fetch_{kind}')
+        if self.live:
+            value = fetch(**params)
+            metadata_cache.store(self.user.pk, kind, params, value)
+            return value
+        return metadata_cache.get_or_fetch(
+            self.user.pk, kind, params,
+            fetch=lambda: fetch(**params),
+            revalidate=lambda: self._revalidate(kind, params)
+        )
+    
+    def _revalidate(self, kind, params):
+        from .tasks import refresh_metadata
+        try:
+            refresh_metadata.delay(self.user.pk, kind, params)
+        except OperationalError:
+            # No broker: keep serving the stale entry and retry on a later read.
+            metadata_cache.finish_refresh(self.user.pk, kind, params)
+    
+    def refresh(self, kind, params):
+        """Refetch a cached Drive call and replace the cached result."""
+        if self.files:
+            value = getattr(self, f'_fetch_{kind}')(**params)
+            metadata_cache.store(self.user.pk, kind, params, value)
     
     def list_files(self, folder_id=None, file_type='video', page_size=50, page_token=None):
         """List files from Google Drive."""
-        if not self.service:
+        return self._cached(
+            'list', folder_id=folder_id, file_type=file_type,
+            page_size=page_size, page_token=page_token
+        )
+    
+    def get_file(self, file_id):
+        """Get a single file's metadata from Google Drive."""
+        return self._cached('file', file_id=file_id)
+    
+    def get_files(self, file_ids):
+        """
+        Get many files' metadata, as a dict keyed by file id.
+        
+        Cached files are read in one cache call; the rest are fetched with
+        batch requests of up to BATCH_LIMIT files, several batches at a time.
+        A file Drive couldn't return maps to an ``error`` dict.
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        if not self.files:
+            return {file_id: {'error': 'Google Drive service not initialized'} for file_id in file_ids}
+        
+        results = {}
+        if not self.live:
+            values, stale = metadata_cache.get_many(
+                self.user.pk, 'file', [{'file_id': file_id} for file_id in file_ids]
+            )
+            results = {file_id: value for file_id, value in zip(file_ids, values) if value is not None}
+            if stale:
+                self._revalidate_files([params['file_id'] for params in stale])
+        
+        fetched = self._fetch_files([file_id for file_id in file_ids if file_id not in results])
+        metadata_cache.store_many(
+            self.user.pk, 'file', [({'file_id': file_id}, value) for file_id, value in fetched.items()]
+        )
+        results.update(fetched)
+        return {file_id: results[file_id] for file_id in file_ids}
+    
+    def _revalidate_files(self, file_ids):
+        from .tasks import refresh_files
+        try:
+            refresh_files.delay(self.user.pk, file_ids)
+        except OperationalError:
+            for file_id in file_ids:
+                metadata_cache.finish_refresh(self.user.pk, 'file', {'file_id': file_id})
+    
+    def search_files(self, query, file_type='video', page_size=20):
+        """Search for files in Google Drive."""
+        return self._cached('search', query=query, file_type=file_type, page_size=page_size)
+    
+    def _fetch_list(self, folder_id=None, file_type='video', page_size=50, page_token=None):
+        if not self.files:
             return {'error': 'Google Drive service not initialized'}
         
         try:
@@ -70,12 +155,12 @@ class GoogleDriveService:
             
             query = " and ".join(query_parts)
             
-            results = self.service.files().list(
+            results = self.files.list(
                 q=query,
                 pageSize=page_size,
                 pageToken=page_token,
                 fields="nextPageToken, files(id, name, mimeType, size, thumbnailLink, webViewLink, webContentLink, createdTime, modifiedTime, videoMediaMetadata)"
-            ).execute()
+            ).execute(http=self.http)
             
             files = results.get('files', [])
             next_page_token = results.get('nextPageToken')
@@ -87,24 +172,51 @@ class GoogleDriveService:
         except Exception as e:
             return {'error': str(e)}
     
-    def get_file(self, file_id):
-        """Get a single file's metadata from Google Drive."""
-        if not self.service:
+    def _fetch_file(self, file_id):
+        if not self.files:
             return {'error': 'Google Drive service not initialized'}
         
         try:
-            file = self.service.files().get(
-                fileId=file_id,
-                fields="id, name, mimeType, size, thumbnailLink, webViewLink, webContentLink, createdTime, modifiedTime, videoMediaMetadata"
-            ).execute()
+            file = self.files.get(fileId=file_id, fields=FILE_FIELDS).execute(http=self.http)
             
             return self._format_file(file)
         except Exception as e:
             return {'error': str(e)}
     
-    def search_files(self, query, file_type='video', page_size=20):
-        """Search for files in Google Drive."""
-        if not self.service:
+    def _fetch_files(self, file_ids):
+        batches = [file_ids[i:i + BATCH_LIMIT] for i in range(0, len(file_ids), BATCH_LIMIT)]
+        if len(batches) <= 1:
+            return self._fetch_batch(batches[0], self.http) if batches else {}
+        
+        # Each thread signs its batches over its own pooled connection.
+        results = {}
+        with ThreadPoolExecutor(min(len(batches), settings.GOOGLE_DRIVE_BATCH_WORKERS)) as pool:
+            for batch_results in pool.map(
+                lambda batch: self._fetch_batch(batch, authorized_http(self.credentials)), batches
+            ):
+                results.update(batch_results)
+        return results
+    
+    def _fetch_batch(self, file_ids, http):
+        results = {}
+        
+        def collect(request_id, response, exception):
+            results[request_id] = (
+                {'error': str(exception)} if exception else self._format_file(response)
+            )
+        
+        batch = drive_resource().new_batch_http_request(callback=collect)
+        for file_id in file_ids:
+            batch.add(self.files.get(fileId=file_id, fields=FILE_FIELDS), request_id=file_id)
+        try:
+            batch.execute(http=http)
+        except Exception as e:
+            for file_id in file_ids:
+                results.setdefault(file_id, {'error': str(e)})
+        return results
+    
+    def _fetch_search(self, query, file_type='video', page_size=20):
+        if not self.files:
             return {'error': 'Google Drive service not initialized'}
         
         try:
@@ -117,11 +229,11 @@ class GoogleDriveService:
             
             search_query = " and ".join(query_parts)
             
-            results = self.service.files().list(
+            results = self.files.list(
                 q=search_query,
                 pageSize=page_size,
                 fields="files(id, name, mimeType, size, thumbnailLink, webViewLink, webContentLink, videoMediaMetadata)"
-            ).execute()
+            ).execute(http=self.http)
             
             files = results.get('files', [])
             
@@ -129,6 +241,51 @@ class GoogleDriveService:
         except Exception as e:
             return {'error': str(e)}
     
+    def get_start_page_token(self):
+        """Get the change feed token for "now"; changes after it are listed from it."""
+        if not self.changes:
+            return {'error': 'Google Drive service not initialized'}
+        
+        try:
+            result = self.changes.getStartPageToken().execute(http=self.http)
+            return {'start_page_token': result['startPageToken']}
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def list_changes(self, page_token, page_size=1000):
+        """
+        List one page of changes to files since ``page_token``.
+        
+        Not cached: each token is read once. The last page carries
+        ``new_start_page_token`` instead of ``next_page_token``.
+        """
+        if not self.changes:
+            return {'error': 'Google Drive service not initialized'}
+        
+        try:
+            results = self.changes.list(
+                pageToken=page_token,
+                pageSize=page_size,
+                includeRemoved=True,
+                spaces='drive',
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}))"
+            ).execute(http=self.http)
+            
+            return {
+                'changes': [
+                    {
+                        'file_id': change.get('fileId'),
+                        'removed': change.get('removed', False),
+                        'file': self._format_file(change['file']) if change.get('file') else None,
+                    }
+                    for change in results.get('changes', [])
+                ],
+                'next_page_token': results.get('nextPageToken'),
+                'new_start_page_token': results.get('newStartPageToken'),
+            }
+        except Exception as e:
+            return {'error': str(e)}
+    
     def list_folders(self, parent_id=None):
         """List folders from Google Drive."""
         return self.list_files(folder_id=parent_id, file_type='folder')
@@ -158,6 +315,7 @@ class GoogleDriveService:
             'embed_url': self.get_embed_url(file.get('id')),
             'created_at': file.get('createdTime'),
             'modified_at': file.get('modifiedTime'),
+            'trashed': file.get('trashed', False),
         }
         
         # Add video metadata if available
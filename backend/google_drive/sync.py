@@ -0,0 +1,211 @@
+"""
+Incremental sync of Video and Resource metadata from Drive's change feed.
+
+Durations, thumbnails and file sizes are copied from Drive when a row is
+created. Rather than re-fetching every linked file to keep them current, each
+admin's change feed is read from where the last sync stopped (their
+DriveChangeCursor), so a sync costs one request per page of changes however
+big the library is. Only rows whose linked file changed are written, with one
+``bulk_update`` per model per page; files that were trashed, deleted or
+unshared are flagged with ``drive_file_missing`` rather than removed, and the
+flag clears again if the file comes back.
+
+A file dropping out of one admin's feed only means that admin lost access to
+it, so a linked file is flagged for removal only once no other connected
+admin can still see it.
+
+The first sync for a user only records the feed's current position.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from courses.aggregates import refresh_course_aggregates, refresh_module_aggregates
+from courses.course_documents import invalidate_course_documents
+from courses.models import Resource, Video
+from .models import DriveChangeCursor
+from .services import GoogleDriveService
+
+User = get_user_model()
+
+# The largest page Drive serves.
+PAGE_SIZE = 1000
+VIDEO_FIELDS = ['duration_minutes', 'thumbnail_url', 'drive_file_missing', 'updated_at']
+RESOURCE_FIELDS = ['file_size_bytes', 'drive_file_missing', 'updated_at']
+
+
+class DriveSyncError(Exception):
+    """Drive refused a change feed request; the cursor is left where it was."""
+
+
+def _is_missing(change):
+    return change['removed'] or change['file'] is None or change['file']['trashed']
+
+
+def connected_admins():
+    """Admins and superusers who have connected Google Drive."""
+    return User.objects.filter(
+        Q(role=User.Role.ADMIN) | Q(is_superuser=True),
+        google_access_token__isnull=False
+    ).exclude(google_access_token='')
+
+
+def confirm_removals(user, changes):
+    """
+    Replace removals of linked files that another admin can still see.
+
+    Each is swapped for a change carrying that admin's view of the file, so
+    only files gone for every connected admin are flagged missing. Costs one
+    batch of lookups per other admin, and only for pages that removed a
+    linked file.
+    """
+    removed = {change['file_id'] for change in changes if change['removed']}
+    if not removed:
+        return changes
+    unconfirmed = (
+        set(Video.objects.filter(google_drive_file_id__in=removed)
+            .values_list('google_drive_file_id', flat=True))
+        | set(Resource.objects.filter(google_drive_file_id__in=removed)
+              .values_list('google_drive_file_id', flat=True))
+    )
+    visible = {}
+    for admin in connected_admins().exclude(pk=user.pk).iterator():
+        if not unconfirmed:
+            break
+        files = GoogleDriveService(user=admin, live=True).get_files(sorted(unconfirmed))
+        for file_id, file in files.items():
+            if 'error' not in file:
+                visible[file_id] = file
+                unconfirmed.discard(file_id)
+    return [
+        {'file_id': change['file_id'], 'removed': False, 'file': visible[change['file_id']]}
+        if change['removed'] and change['file_id'] in visible else change
+        for change in changes
+    ]
+
+
+def _video_changes(change):
+    missing = _is_missing(change)
+    values = {'drive_file_missing': missing}
+    file = change['file']
+    if file and not missing:
+        # Drive leaves these out while a video is still processing.
+        if file.get('duration_minutes') is not None:
+            values['duration_minutes'] = file['duration_minutes']
+        thumbnail_url = file.get('thumbnail_url')
+        if thumbnail_url and len(thumbnail_url) <= Video._meta.get_field('thumbnail_url').max_length:
+            values['thumbnail_url'] = thumbnail_url
+    return values
+
+
+def _resource_changes(change):
+    missing = _is_missing(change)
+    values = {'drive_file_missing': missing}
+    file = change['file']
+    if file and not missing and file.get('size') is not None:
+        values['file_size_bytes'] = int(file['size'])
+    return values
+
+
+def _update(rows, changes, values_for):
+    """Set each row's new values; return the rows that actually changed."""
+    now = timezone.now()
+    changed = []
+    for row in rows:
+        values = values_for(changes[row.google_drive_file_id])
+        if any(getattr(row, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(row, name, value)
+            row.updated_at = now
+            changed.append(row)
+    return changed
+
+
+def apply_changes(changes):
+    """
+    Write one page of changes (from ``list_changes``) to the rows they touch.
+
+    Returns how many videos and resources changed and how many of those are
+    now flagged missing.
+    """
+    changes = {change['file_id']: change for change in changes if change['file_id']}
+    if not changes:
+        return {'videos': 0, 'resources': 0, 'missing': 0}
+
+    videos = _update(
+        Video.objects.filter(google_drive_file_id__in=changes)
+        .annotate(course_id=F('module__course_id')),
+        changes, _video_changes
+    )
+    resources = _update(
+        Resource.objects.filter(google_drive_file_id__in=changes)
+        .annotate(owner_course_id=F('module__course_id')),
+        changes, _resource_changes
+    )
+    Video.objects.bulk_update(videos, VIDEO_FIELDS, batch_size=500)
+    Resource.objects.bulk_update(resources, RESOURCE_FIELDS, batch_size=500)
+
+    # bulk_update skips the signals that maintain these.
+    course_ids = {video.course_id for video in videos}
+    course_ids.update(resource.course_id or resource.owner_course_id for resource in resources)
+    if videos:
+        refresh_module_aggregates({video.module_id for video in videos})
+        refresh_course_aggregates({video.course_id for video in videos})
+    invalidate_course_documents(course_ids)
+
+    return {
+        'videos': len(videos),
+        'resources': len(resources),
+        'missing': sum(1 for row in (*videos, *resources) if row.drive_file_missing),
+    }
+
+
+def sync_changes(user):
+    """
+    Apply every change in ``user``'s Drive since their last sync.
+
+    Each page is applied together with the cursor moving past it, so a sync
+    that fails part way resumes from the first page it didn't finish.
+    """
+    service = GoogleDriveService(user=user)
+    cursor = DriveChangeCursor.objects.filter(user=user).first()
+    totals = {'changes': 0, 'videos': 0, 'resources': 0, 'missing': 0}
+
+    if cursor is None:
+        result = service.get_start_page_token()
+        if 'error' in result:
+            raise DriveSyncError(result['error'])
+        DriveChangeCursor.objects.create(user=user, page_token=result['start_page_token'])
+        return {**totals, 'started': True}
+
+    while True:
+        result = service.list_changes(cursor.page_token, page_size=PAGE_SIZE)
+        if 'error' in result:
+            raise DriveSyncError(result['error'])
+        changes = confirm_removals(user, result['changes'])
+        with transaction.atomic():
+            counts = apply_changes(changes)
+            cursor.page_token = result['next_page_token'] or result['new_start_page_token']
+            cursor.save(update_fields=['page_token', 'synced_at'])
+        totals['changes'] += len(result['changes'])
+        for name, count in counts.items():
+            totals[name] += count
+        if not result['next_page_token']:
+            return {**totals, 'started': False}
+
+
+def sync_all_changes():
+    """Sync every admin who has connected Google Drive; one failure doesn't stop the rest."""
+    admins = connected_admins()
+    totals = {'users': 0, 'errors': 0, 'changes': 0, 'videos': 0, 'resources': 0, 'missing': 0}
+    for user in admins.iterator():
+        try:
+            result = sync_changes(user)
+        except DriveSyncError:
+            totals['errors'] += 1
+            continue
+        totals['users'] += 1
+        for name in ('changes', 'videos', 'resources', 'missing'):
+            totals[name] += result[name]
+    return totals
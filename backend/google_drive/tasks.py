@@ -0,0 +1,52 @@
+"""
+Background tasks for Google Drive integration.
+"""
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from courses.models import Course
+from lms_project.jobs import TrackedTask
+from . import metadata_cache
+from .importer import import_folder
+from .services import GoogleDriveService
+from .sync import sync_all_changes
+
+User = get_user_model()
+
+
+@shared_task(name='google_drive.refresh_metadata', ignore_result=True)
+def refresh_metadata(user_id, kind, params):
+    """Refetch one stale cached Drive result (see google_drive.metadata_cache)."""
+    try:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            GoogleDriveService(user=user).refresh(kind, params)
+    finally:
+        metadata_cache.finish_refresh(user_id, kind, params)
+
+
+@shared_task(name='google_drive.refresh_files', ignore_result=True)
+def refresh_files(user_id, file_ids):
+    """Refetch many stale cached files in batches (see GoogleDriveService.get_files)."""
+    try:
+        user = User.objects.filter(pk=user_id).first()
+        if user is not None:
+            GoogleDriveService(user=user, live=True).get_files(file_ids)
+    finally:
+        for file_id in file_ids:
+            metadata_cache.finish_refresh(user_id, 'file', {'file_id': file_id})
+
+
+@shared_task(base=TrackedTask, name='google_drive.import_folder')
+def import_folder_task(user_id, course_id, folder_id, dry_run=False):
+    """Import a Drive folder tree into a course; re-running only adds new files."""
+    return import_folder(
+        User.objects.get(pk=user_id), Course.objects.get(pk=course_id), folder_id, dry_run=dry_run
+    )
+
+
+@shared_task(name='google_drive.sync_changes')
+def sync_drive_changes():
+    """Periodic Drive change feed sync (see CELERY_BEAT_SCHEDULE)."""
+    return sync_all_changes()
+
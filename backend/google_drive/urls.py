@@ -8,7 +8,9 @@ from .views import (
     ListDriveFoldersView,
     GetDriveFileView,
     SearchDriveFilesView,
-    GetVideoEmbedUrlView
+    GetVideoEmbedUrlView,
+    ImportDriveFolderView,
+    ValidateCourseFilesView
 )
 
 app_name = 'google_drive'
@@ -20,4 +22,6 @@ urlpatterns = [
     path('files/<str:file_id>/', GetDriveFileView.as_view(), name='get_file'),
     path('search/', SearchDriveFilesView.as_view(), name='search_files'),
     path('embed/<str:file_id>/', GetVideoEmbedUrlView.as_view(), name='embed_url'),
+    path('import/', ImportDriveFolderView.as_view(), name='import_folder'),
+    path('courses/<slug:slug>/files/', ValidateCourseFilesView.as_view(), name='validate_course_files'),
 ]
@@ -0,0 +1,55 @@
+"""
+Checks that the Drive files a course links to are still there.
+"""
+from django.db.models import Q
+
+from courses.models import Resource, Video
+from .services import GoogleDriveService
+
+
+def _problem(file, is_video):
+    if 'error' in file:
+        return 'unavailable'
+    if file.get('trashed'):
+        return 'trashed'
+    if is_video and not (file.get('mime_type') or '').startswith('video/'):
+        return 'not_a_video'
+    return None
+
+
+def course_file_rows(course):
+    """Every Video and Resource in ``course``, as ``(kind, row)`` pairs."""
+    return [
+        ('video', row) for row in Video.objects.filter(module__course=course)
+        .order_by('module__order', 'order').values('id', 'title', 'google_drive_file_id')
+    ] + [
+        ('resource', row) for row in Resource.objects.filter(Q(course=course) | Q(module__course=course))
+        .order_by('module__order', 'order').values('id', 'title', 'google_drive_file_id')
+    ]
+
+
+def fetch_course_files(user, rows):
+    """Look up the files of ``rows`` in one ``get_files`` call."""
+    return GoogleDriveService(user=user).get_files(row['google_drive_file_id'] for _, row in rows)
+
+
+def file_report(course, rows, files):
+    """How many rows were checked, and one entry per row whose file has a problem."""
+    problems = []
+    for kind, row in rows:
+        file = files[row['google_drive_file_id']]
+        problem = _problem(file, kind == 'video')
+        if problem:
+            problems.append({
+                'type': kind,
+                **row,
+                'problem': problem,
+                'detail': file.get('error', ''),
+            })
+    return {
+        'course_id': course.pk,
+        'checked': len(rows),
+        'ok': len(rows) - len(problems),
+        'problems': problems,
+    }
+
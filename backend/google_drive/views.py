@@ -1,12 +1,25 @@
 """
 Views for Google Drive integration.
+
+Views that call Drive are async: each Drive call runs on the Drive thread
+pool (see google_drive.concurrency), so a slow Google round trip holds no
+server worker while it waits.
 """
+from asgiref.sync import sync_to_async
+from django.shortcuts import get_object_or_404
 from rest_framework import status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from .concurrency import drive_call
+from .serializers import DriveFolderImportSerializer
 from .services import GoogleDriveService
+from .tasks import import_folder_task
+from .validation import course_file_rows, fetch_course_files, file_report
 from accounts.permissions import IsAdmin
+from courses.models import Course
+from lms_project.async_views import AsyncAPIView
+from lms_project.jobs import enqueue, job_key, job_response
 
 
 class DriveConnectionStatusView(APIView):
@@ -24,22 +37,21 @@ class DriveConnectionStatusView(APIView):
         })
 
 
-class ListDriveFilesView(APIView):
+class ListDriveFilesView(AsyncAPIView):
     """List files from user's Google Drive."""
     
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     
-    def get(self, request):
+    async def get(self, request):
         folder_id = request.query_params.get('folder_id')
         file_type = request.query_params.get('type', 'video')
         page_token = request.query_params.get('page_token')
         
-        service = GoogleDriveService(user=request.user)
-        result = service.list_files(
+        result = await drive_call(lambda: GoogleDriveService(user=request.user).list_files(
             folder_id=folder_id,
             file_type=file_type,
             page_token=page_token
-        )
+        ))
         
         if 'error' in result:
             return Response(
@@ -50,16 +62,17 @@ class ListDriveFilesView(APIView):
         return Response(result)
 
 
-class ListDriveFoldersView(APIView):
+class ListDriveFoldersView(AsyncAPIView):
     """List folders from user's Google Drive."""
     
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     
-    def get(self, request):
+    async def get(self, request):
         parent_id = request.query_params.get('parent_id')
         
-        service = GoogleDriveService(user=request.user)
-        result = service.list_folders(parent_id=parent_id)
+        result = await drive_call(
+            lambda: GoogleDriveService(user=request.user).list_folders(parent_id=parent_id)
+        )
         
         if 'error' in result:
             return Response(
@@ -70,14 +83,13 @@ class ListDriveFoldersView(APIView):
         return Response(result)
 
 
-class GetDriveFileView(APIView):
+class GetDriveFileView(AsyncAPIView):
     """Get a specific file from Google Drive."""
     
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     
-    def get(self, request, file_id):
-        service = GoogleDriveService(user=request.user)
-        result = service.get_file(file_id)
+    async def get(self, request, file_id):
+        result = await drive_call(lambda: GoogleDriveService(user=request.user).get_file(file_id))
         
         if 'error' in result:
             return Response(
@@ -88,12 +100,12 @@ class GetDriveFileView(APIView):
         return Response(result)
 
 
-class SearchDriveFilesView(APIView):
+class SearchDriveFilesView(AsyncAPIView):
     """Search for files in Google Drive."""
     
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     
-    def get(self, request):
+    async def get(self, request):
         query = request.query_params.get('q', '')
         file_type = request.query_params.get('type', 'video')
         
@@ -103,8 +115,9 @@ class SearchDriveFilesView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        service = GoogleDriveService(user=request.user)
-        result = service.search_files(query=query, file_type=file_type)
+        result = await drive_call(
+            lambda: GoogleDriveService(user=request.user).search_files(query=query, file_type=file_type)
+        )
         
         if 'error' in result:
             return Response(
@@ -125,3 +138,58 @@ class GetVideoEmbedUrlView(APIView):
         embed_url = service.get_embed_url(file_id)
         
         return Response({'embed_url': embed_url})
+
+
+class ImportDriveFolderView(APIView):
+    """
+    Import a Drive folder tree into a course as a background job (admin only).
+    
+    Subfolders become modules and their files videos and resources (see
+    google_drive.importer). With ``dry_run`` the job only reports what would
+    be added. Responds with 202 and the job's status URL.
+    """
+    
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    
+    def post(self, request):
+        serializer = DriveFolderImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        if not request.user.google_access_token:
+            return Response(
+                {'error': 'Google Drive is not connected.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        data = serializer.validated_data
+        job = enqueue(
+            import_folder_task, request.user.id, data['course_id'], data['folder_id'],
+            dry_run=data['dry_run'],
+            key=job_key(request, 'drive-import', data['course_id'], data['folder_id'], data['dry_run']),
+            owner=request.user
+        )
+        return job_response(request, job)
+
+
+class ValidateCourseFilesView(AsyncAPIView):
+    """
+    Check every video and resource file in a course against Drive (admin only).
+    
+    Reports the rows whose file is unavailable, trashed or not a video; all
+    of a course's files are looked up in a few batch requests.
+    """
+    
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    
+    async def get(self, request, slug):
+        course = await sync_to_async(get_object_or_404)(Course, slug=slug)
+        
+        if not request.user.google_access_token:
+            return Response(
+                {'error': 'Google Drive is not connected.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        rows = await sync_to_async(course_file_rows)(course)
+        files = await drive_call(fetch_course_files, request.user, rows)
+        return Response(file_report(course, rows, files))
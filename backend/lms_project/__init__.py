@@ -1 +1,4 @@
 # LMS Project
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
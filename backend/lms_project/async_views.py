@@ -0,0 +1,42 @@
+"""
+Async REST framework views, for endpoints that mostly wait on other services.
+
+Django serves ``async def`` handlers natively under ASGI, but REST
+framework's APIView only runs sync ones. ``AsyncAPIView`` keeps everything
+else about an APIView (authentication, permissions, throttling, exception
+handling and rendering) and awaits the handler instead. The sync parts that
+may touch the database run through ``sync_to_async``.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """An APIView whose handlers are ``async def``."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                # OPTIONS is answered by APIView's sync handler.
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
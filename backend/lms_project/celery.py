@@ -0,0 +1,16 @@
+"""
+Celery application for the LMS project.
+
+Run a worker with ``celery -A lms_project worker`` and the periodic jobs with
+``celery -A lms_project beat``. With CELERY_TASK_ALWAYS_EAGER set, tasks run
+in-process instead and no broker is needed.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lms_project.settings')
+
+app = Celery('lms_project')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,84 @@
+"""
+Conditional GET for API views.
+
+A view that can name its representation cheaply, from a cached version token,
+a cached document or a row timestamp, sends it as an ETag (and, where it has
+one, a Last-Modified date). A request whose ``If-None-Match`` (or, without
+one, ``If-Modified-Since``) still matches gets a 304 before anything is
+loaded or serialized.
+"""
+import hashlib
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """A strong ETag naming the representation identified by ``parts``."""
+    digest = hashlib.sha256('\x1f'.join(str(part) for part in parts).encode())
+    return '"%s"' % digest.hexdigest()[:32]
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(request, etag=None, last_modified=None):
+    """
+    Whether the client's copy is current, by RFC 9110 precedence.
+
+    ETags are compared weakly, as a GET allows, so an ETag weakened by a
+    compressing proxy still matches.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        if etag is None:
+            return False
+        etags = {_strip_weak(tag) for tag in parse_etags(if_none_match)}
+        return '*' in etags or _strip_weak(etag) in etags
+
+    if last_modified is not None:
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return since is not None and int(last_modified.timestamp()) <= since
+    return False
+
+
+def validator_headers(etag=None, last_modified=None, public=False):
+    """Response headers carrying the validators; clients must revalidate."""
+    headers = {'Cache-Control': 'public, no-cache' if public else 'private, no-cache'}
+    if etag is not None:
+        headers['ETag'] = etag
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return headers
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET (and HEAD) with validators from ``get_validators()``.
+
+    ``get_validators()`` returns ``(etag, last_modified)``, either of which
+    may be None; it runs before the view's own ``get()``, so it should only
+    read caches or cheap columns. Responses are ``private`` unless
+    ``public_validators`` is set, since most differ per user.
+    """
+
+    public_validators = False
+
+    def get_validators(self, request, *args, **kwargs):
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        if etag is None and last_modified is None:
+            return super().get(request, *args, **kwargs)
+
+        headers = validator_headers(etag, last_modified, self.public_validators)
+        if is_not_modified(request, etag, last_modified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+        return response
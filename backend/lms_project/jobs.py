@@ -0,0 +1,160 @@
+"""
+Background job tracking for Celery tasks.
+
+``enqueue`` records a job in the cache and sends the task once the current
+transaction commits. Tasks built on ``TrackedTask`` keep that record current
+(pending, running, retrying, succeeded, failed), which is what the job status
+endpoint serves. Passing an idempotency ``key`` makes repeated requests for
+the same work return the existing job instead of starting another one.
+
+Files a job writes for its owner go to ``job_file_storage``, which is private:
+they are only downloaded through the job file endpoint, by the job's owner
+or an admin.
+"""
+import hashlib
+import uuid
+
+from celery import Task
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.db import OperationalError, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+JOB_TIMEOUT = 60 * 60 * 24
+
+
+class JobStatus:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    RETRYING = 'retrying'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+
+def _job_key(job_id):
+    return f'jobs:{job_id}'
+
+
+def _idempotency_key(key):
+    return f'jobs:key:{key}'
+
+
+def get_job(job_id):
+    return cache.get(_job_key(job_id))
+
+
+def get_visible_job(user, job_id):
+    """The job, if ``user`` started it or is an admin; otherwise None."""
+    job = get_job(job_id)
+    if job is None or (job['owner_id'] != user.id and not user.is_admin):
+        return None
+    return job
+
+
+def job_file_storage():
+    """Storage for files jobs write; nothing serves it but JobFileView."""
+    return FileSystemStorage(location=settings.JOB_FILES_ROOT)
+
+
+def update_job(job_id, **changes):
+    job = get_job(job_id)
+    if job is None:
+        # Task was called directly rather than through enqueue().
+        return None
+    job.update(changes, updated_at=timezone.now().isoformat())
+    cache.set(_job_key(job_id), job, JOB_TIMEOUT)
+    return job
+
+
+def enqueue(task, *args, key=None, owner=None, **kwargs):
+    """
+    Record a job for ``task`` and send it on commit.
+
+    Returns the job record. With ``key``, an existing job for the same key
+    that hasn't failed is returned instead and nothing new is sent.
+    """
+    job_id = uuid.uuid4().hex
+    if key:
+        if not cache.add(_idempotency_key(key), job_id, JOB_TIMEOUT):
+            existing = get_job(cache.get(_idempotency_key(key)))
+            if existing and existing['status'] != JobStatus.FAILED:
+                return existing
+            cache.set(_idempotency_key(key), job_id, JOB_TIMEOUT)
+
+    now = timezone.now().isoformat()
+    job = {
+        'id': job_id,
+        'task': task.name,
+        'key': key,
+        'owner_id': owner.id if owner else None,
+        'status': JobStatus.PENDING,
+        'result': None,
+        'error': None,
+        'retries': 0,
+        'created_at': now,
+        'updated_at': now,
+    }
+    cache.set(_job_key(job_id), job, JOB_TIMEOUT)
+
+    transaction.on_commit(
+        lambda: task.apply_async(args=args, kwargs=kwargs, task_id=job_id)
+    )
+    return job
+
+
+def job_key(request, name, *parts):
+    """
+    Idempotency key for a job started by ``request``.
+
+    A client-supplied Idempotency-Key header wins; otherwise the key is
+    derived from ``parts``, the parameters that identify the work. With
+    neither, returns None and every request starts a new job.
+    """
+    supplied = request.headers.get('Idempotency-Key')
+    if supplied:
+        return f'{name}:{request.user.id}:{supplied}'
+    if not parts:
+        return None
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'{name}:{digest}'
+
+
+def wants_async(request):
+    """Whether the client asked for the work to run as a background job."""
+    return request.query_params.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def job_response(request, job):
+    """202 response pointing the client at the job status endpoint."""
+    status_url = request.build_absolute_uri(reverse('job_status', args=[job['id']]))
+    return Response(
+        {**job, 'status_url': status_url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': status_url}
+    )
+
+
+class TrackedTask(Task):
+    """Task base class that mirrors its lifecycle onto the job record."""
+
+    autoretry_for = (OperationalError,)
+    retry_backoff = True
+    max_retries = 3
+
+    def before_start(self, task_id, args, kwargs):
+        update_job(task_id, status=JobStatus.RUNNING)
+
+    def on_retry(self, exc, task_id, args, kwargs, einfo):
+        update_job(
+            task_id, status=JobStatus.RETRYING, error=str(exc), retries=self.request.retries + 1
+        )
+
+    def on_success(self, retval, task_id, args, kwargs):
+        update_job(task_id, status=JobStatus.SUCCEEDED, result=retval, error=None)
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        update_job(task_id, status=JobStatus.FAILED, error=str(exc))
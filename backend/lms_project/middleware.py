@@ -0,0 +1,51 @@
+"""
+Async-capable versions of third-party middleware that only declare sync support.
+
+Under ASGI, one sync-only middleware makes Django run the rest of the request
+through a thread that stays blocked until the response is ready, so async
+views would hold a thread for their whole wait after all. Neither of these
+does any blocking work per request, so both can run on the event loop.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from social_django import middleware as social_middleware
+from whitenoise import middleware as whitenoise_middleware
+
+
+class _AsyncCapable:
+    sync_capable = True
+    async_capable = True
+
+    def _check_async(self, get_response):
+        self._is_async = iscoroutinefunction(get_response)
+        if self._is_async:
+            markcoroutinefunction(self)
+
+
+class WhiteNoiseMiddleware(_AsyncCapable, whitenoise_middleware.WhiteNoiseMiddleware):
+    """WhiteNoise, answering static file requests from the event loop too."""
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self._check_async(get_response)
+
+    def __call__(self, request):
+        if self._is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class SocialAuthExceptionMiddleware(_AsyncCapable, social_middleware.SocialAuthExceptionMiddleware):
+    """social-auth's exception handler; it only acts in ``process_exception``."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._check_async(get_response)
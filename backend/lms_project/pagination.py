@@ -0,0 +1,131 @@
+"""
+Pagination for high-volume list endpoints.
+
+Page-number pagination runs a COUNT(*) and an OFFSET that grows with the page
+number, so deep pages of a large table get slower and slower. Keyset
+(cursor) pagination instead continues from the last row seen: each page is a
+``WHERE (key, id) < (last_key, last_id) ORDER BY key, id LIMIT n`` that costs
+the same at row ten million as at row one. It only offers "next" links and
+ignores ``?ordering=``, so it's opt-in per request.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def _cursor_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the model's default ordering, tie-broken by id.
+
+    The first ordering field in the model's ``Meta.ordering`` (or the view's
+    ``keyset_ordering``) is the key, e.g. ``-started_at``; rows sharing a key
+    are ordered by id in the same direction.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def get_ordering(self, queryset, view):
+        ordering = getattr(view, 'keyset_ordering', None) or queryset.model._meta.ordering[0]
+        descending = ordering.startswith('-')
+        return ordering.lstrip('-'), descending
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def encode_cursor(self, key, pk):
+        # Full precision: DjangoJSONEncoder would round datetimes to milliseconds.
+        data = json.dumps([key, pk], default=_cursor_value).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, request, field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            key, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return field.to_python(key), int(pk)
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        key, descending = self.get_ordering(queryset, view)
+        field = queryset.model._meta.get_field(key)
+        direction = '-' if descending else ''
+        queryset = queryset.order_by(direction + key, direction + 'pk')
+
+        cursor = self.decode_cursor(request, field)
+        if cursor is not None:
+            value, pk = cursor
+            after = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{key}__{after}': value}) | Q(**{key: value, f'pk__{after}': pk})
+            )
+
+        page_size = self.get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = (
+            self.encode_cursor(getattr(rows[-1], key), rows[-1].pk) if self.has_next else None
+        )
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; keyset pagination with ``?pagination=cursor``.
+
+    The ``next`` links of a keyset page carry a ``cursor`` parameter, which
+    also selects keyset mode.
+    """
+
+    keyset_class = KeysetPagination
+    mode_query_param = 'pagination'
+
+    def wants_keyset(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_class() if self.wants_keyset(request) else None
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
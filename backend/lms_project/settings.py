@@ -45,7 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'lms_project.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,7 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'social_django.middleware.SocialAuthExceptionMiddleware',
+    'lms_project.middleware.SocialAuthExceptionMiddleware',
 ]
 
 ROOT_URLCONF = 'lms_project.urls'
@@ -95,6 +95,35 @@ CACHES = {
     }
 }
 
+# Buffer non-completing video heartbeats in the cache and write them to the
+# database in bulk with `manage.py flush_video_progress`.
+VIDEO_PROGRESS_WRITE_BEHIND = os.environ.get(
+    'VIDEO_PROGRESS_WRITE_BEHIND', 'False'
+).lower() in ('true', '1', 'yes')
+
+# Celery
+CELERY_BROKER_URL = os.environ.get(
+    'CELERY_BROKER_URL', os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+)
+# Job status is tracked in the cache (see lms_project.jobs), not a result backend
+CELERY_TASK_IGNORE_RESULT = True
+# Run tasks in-process, without a broker; failures are recorded on the job
+CELERY_TASK_ALWAYS_EAGER = os.environ.get(
+    'CELERY_TASK_ALWAYS_EAGER', 'False'
+).lower() in ('true', '1', 'yes')
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BEAT_SCHEDULE = {
+    'flush-video-progress': {
+        'task': 'progress.flush_video_progress',
+        'schedule': 30.0,
+    },
+    'sync-drive-changes': {
+        'task': 'google_drive.sync_changes',
+        'schedule': float(os.environ.get('GOOGLE_DRIVE_SYNC_INTERVAL', '300')),
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -118,6 +147,10 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Files written by background jobs, such as report exports. Kept out of
+# MEDIA_ROOT so nothing serves them directly; see lms_project.views.JobFileView.
+JOB_FILES_ROOT = Path(os.environ.get('JOB_FILES_ROOT', BASE_DIR / 'job_files'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -192,6 +225,20 @@ SOCIAL_AUTH_PIPELINE = (
 
 # Google Drive Settings
 GOOGLE_DRIVE_API_KEY = os.environ.get('GOOGLE_DRIVE_API_KEY', '')
+# Seconds to wait on a Drive API connection or response
+GOOGLE_DRIVE_TIMEOUT = int(os.environ.get('GOOGLE_DRIVE_TIMEOUT', '30'))
+# Drive listings and file lookups are cached per user for this many seconds,
+# then served stale for up to GOOGLE_DRIVE_CACHE_STALE_TTL more while they refresh
+GOOGLE_DRIVE_CACHE_TTL = int(os.environ.get('GOOGLE_DRIVE_CACHE_TTL', '120'))
+GOOGLE_DRIVE_CACHE_STALE_TTL = int(os.environ.get('GOOGLE_DRIVE_CACHE_STALE_TTL', '86400'))
+# Drive folder listings run in parallel when crawling a folder tree for import
+GOOGLE_DRIVE_CRAWL_WORKERS = int(os.environ.get('GOOGLE_DRIVE_CRAWL_WORKERS', '8'))
+# Batch requests (of up to 100 files each) sent at once by GoogleDriveService.get_files
+GOOGLE_DRIVE_BATCH_WORKERS = int(os.environ.get('GOOGLE_DRIVE_BATCH_WORKERS', '4'))
+# Drive calls the async Drive views run at once per server process, and how
+# long a request may wait for one to start and finish, in seconds
+GOOGLE_DRIVE_CONCURRENCY = int(os.environ.get('GOOGLE_DRIVE_CONCURRENCY', '32'))
+GOOGLE_DRIVE_REQUEST_TIMEOUT = float(os.environ.get('GOOGLE_DRIVE_REQUEST_TIMEOUT', '30'))
 
 # Login URLs
 LOGIN_URL = '/auth/login/'
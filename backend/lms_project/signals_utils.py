@@ -0,0 +1,15 @@
+"""
+Helpers shared by the apps' signal handlers.
+"""
+from django.db.models import QuerySet
+
+
+def is_cascade(origin, model):
+    """
+    Whether a delete signal for ``model`` comes from deleting something else.
+
+    ``origin`` is the instance or queryset whose ``delete()`` started the
+    collection; handlers skip cascades that the parent's own signal covers.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin is not None and origin_model is not model
@@ -7,6 +7,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from .views import JobFileView, JobStatusView
+
 urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
@@ -17,6 +19,8 @@ urlpatterns = [
     path('api/quizzes/', include('quizzes.urls')),
     path('api/progress/', include('progress.urls')),
     path('api/drive/', include('google_drive.urls')),
+    path('api/jobs/<str:job_id>/', JobStatusView.as_view(), name='job_status'),
+    path('api/jobs/<str:job_id>/file/', JobFileView.as_view(), name='job_file'),
     
     # Social Auth
     path('auth/', include('social_django.urls', namespace='social')),
@@ -0,0 +1,50 @@
+"""
+Project-level views.
+"""
+import os
+
+from django.http import FileResponse
+from django.utils.cache import patch_cache_control
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .jobs import JobStatus, get_visible_job, job_file_storage
+
+
+class JobStatusView(APIView):
+    """Poll a background job started by one of the ?async=1 endpoints."""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, job_id):
+        job = get_visible_job(request.user, job_id)
+        if job is None:
+            return Response(
+                {'error': 'Job not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(job)
+
+
+class JobFileView(APIView):
+    """Download the file a finished job wrote, such as a report export."""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, job_id):
+        job = get_visible_job(request.user, job_id)
+        result = job['result'] if job and job['status'] == JobStatus.SUCCEEDED else None
+        name = result.get('path') if isinstance(result, dict) else None
+        storage = job_file_storage()
+        if not name or not storage.exists(name):
+            return Response(
+                {'error': 'File not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        response = FileResponse(
+            storage.open(name), as_attachment=True, filename=os.path.basename(name)
+        )
+        # Student data: never keep a copy in a shared cache.
+        patch_cache_control(response, private=True, no_store=True)
+        return response
@@ -19,7 +19,7 @@ class CourseProgressAdmin(admin.ModelAdmin):
 @admin.register(VideoProgress)
 class VideoProgressAdmin(admin.ModelAdmin):
     list_display = ('user', 'video', 'is_completed', 'progress_percentage', 'watch_count', 'last_watched_at')
-    list_filter = ('is_completed', 'video__module__course')
+    list_filter = ('is_completed', 'course')
     search_fields = ('user__email', 'video__title')
     raw_id_fields = ('user', 'video')
     
@@ -5,3 +5,9 @@ class ProgressConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'progress'
     verbose_name = 'Progress Tracking'
+    
+    def ready(self):
+        import progress.signals  # noqa
+        from django.core import checks
+        from .heartbeats import check_write_behind
+        checks.register(check_write_behind)
@@ -0,0 +1,26 @@
+"""
+Certificate issuance shared by the API views and background tasks.
+"""
+from .models import CourseProgress, Certificate
+
+
+class CertificateNotAvailable(Exception):
+    """The student hasn't completed the course (or never started it)."""
+
+
+def issue_certificate(user, course):
+    """
+    Issue the certificate for a completed course.
+
+    Returns ``(certificate, created)``; issuing twice returns the existing
+    certificate. Raises CertificateNotAvailable if the course isn't complete.
+    """
+    try:
+        progress = CourseProgress.objects.get(user=user, course=course)
+    except CourseProgress.DoesNotExist:
+        raise CertificateNotAvailable('No progress found for this course.')
+
+    if not progress.is_completed:
+        raise CertificateNotAvailable('Course not yet completed.')
+
+    return Certificate.objects.get_or_create(user=user, course=course)
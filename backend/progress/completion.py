@@ -0,0 +1,115 @@
+"""
+Incremental course-completion evaluation.
+
+A video completion or a first pass of a required quiz is applied to the
+student's CourseProgress as a single ``F()`` increment, followed by one read
+to see whether the course is now complete. The counters are only recounted
+from scratch when the row is new or the course's structure_version has moved
+on since the row was last computed (videos or required quizzes added, moved
+or removed).
+"""
+from django.db.models import F, Q
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+from quizzes.models import Quiz, QuizAttempt
+from .models import CourseProgress, VideoProgress
+
+
+def required_quizzes(course_id):
+    return Quiz.objects.filter(
+        Q(course_id=course_id) | Q(module__course_id=course_id) |
+        Q(video__module__course_id=course_id),
+        is_required=True
+    )
+
+
+def _complete_if_done(progress):
+    """Stamp the course and enrollment complete once every requirement is met."""
+    if progress.completed_at is not None:
+        return
+    if progress.videos_completed < progress.total_videos:
+        return
+    if progress.quizzes_passed < progress.total_quizzes:
+        return
+
+    now = timezone.now()
+    # Only the first caller to get here completes the course.
+    if CourseProgress.objects.filter(pk=progress.pk, completed_at__isnull=True).update(completed_at=now):
+        progress.completed_at = now
+        Enrollment.objects.filter(
+            user_id=progress.user_id, course_id=progress.course_id
+        ).exclude(status=Enrollment.Status.COMPLETED).update(
+            status=Enrollment.Status.COMPLETED, completed_at=now
+        )
+
+
+def recompute_course_progress(progress):
+    """Recount every CourseProgress counter for one student and course."""
+    course = Course.objects.only('total_videos', 'structure_version').get(pk=progress.course_id)
+    required = required_quizzes(course.pk)
+
+    progress.structure_version = course.structure_version
+    progress.total_videos = course.total_videos
+    progress.videos_completed = VideoProgress.objects.filter(
+        user_id=progress.user_id, course_id=course.pk, is_completed=True
+    ).count()
+    progress.total_quizzes = required.count()
+    progress.quizzes_passed = QuizAttempt.objects.filter(
+        user_id=progress.user_id, course_id=course.pk, quiz__is_required=True, passed=True
+    ).values('quiz').distinct().count()
+    progress.save()
+
+    _complete_if_done(progress)
+    return progress
+
+
+def is_stale(progress):
+    """Whether the course structure has changed since the row was computed."""
+    return progress.structure_version != progress.course.structure_version
+
+
+def _apply_delta(user_id, course_id, **deltas):
+    current = CourseProgress.objects.filter(
+        user_id=user_id, course_id=course_id,
+        structure_version=F('course__structure_version')
+    )
+    updated = current.update(
+        last_accessed_at=timezone.now(),
+        **{field: F(field) + amount for field, amount in deltas.items()}
+    )
+    if not updated:
+        # Missing or computed against an older course structure: recount.
+        progress, _ = CourseProgress.objects.get_or_create(user_id=user_id, course_id=course_id)
+        return recompute_course_progress(progress)
+
+    progress = CourseProgress.objects.only(
+        'user_id', 'course_id', 'videos_completed', 'total_videos',
+        'quizzes_passed', 'total_quizzes', 'completed_at'
+    ).get(user_id=user_id, course_id=course_id)
+    _complete_if_done(progress)
+    return progress
+
+
+def record_video_completed(user_id, course_id):
+    """Apply one newly completed video to the student's course progress."""
+    return _apply_delta(user_id, course_id, videos_completed=1)
+
+
+def record_quiz_passed(attempt):
+    """
+    Apply a passed attempt of a required quiz to the student's course progress.
+
+    Only the first passing attempt of a quiz counts; retakes are ignored.
+    """
+    quiz = attempt.quiz
+    if not (attempt.passed and quiz.is_required):
+        return None
+    course_id = quiz.get_course_id()
+    if course_id is None:
+        return None
+    if QuizAttempt.objects.filter(
+        user_id=attempt.user_id, quiz_id=quiz.pk, passed=True
+    ).exclude(pk=attempt.pk).exists():
+        return None
+    return _apply_delta(attempt.user_id, course_id, quizzes_passed=1)
@@ -0,0 +1,61 @@
+"""
+Denormalized course references on VideoProgress and QuizAttempt.
+
+Both tables are read per student and course far more often than they are
+written, so each row stores its course directly instead of reaching it
+through video -> module -> course (or the quiz's attachment). New rows fill
+the column in ``save``; these helpers rewrite it with set-based UPDATEs when
+content moves between courses, and backfill rows written before the column
+existed.
+"""
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from courses.models import Video
+from quizzes.models import Quiz, QuizAttempt
+from .models import VideoProgress
+
+
+def _video_course():
+    return Subquery(Video.objects.filter(pk=OuterRef('video_id')).values('module__course_id')[:1])
+
+
+def _quiz_course():
+    return Subquery(
+        Quiz.objects.filter(pk=OuterRef('quiz_id')).annotate(
+            course_ref=Coalesce('course_id', 'module__course_id', 'video__module__course_id')
+        ).values('course_ref')[:1]
+    )
+
+
+def backfill_course_refs(only_missing=True):
+    """
+    Derive the course of every progress row and attempt from its video or quiz.
+
+    Returns the number of VideoProgress and QuizAttempt rows updated.
+    """
+    progress = VideoProgress.objects.all()
+    attempts = QuizAttempt.objects.all()
+    if only_missing:
+        progress = progress.filter(course__isnull=True)
+        attempts = attempts.filter(course__isnull=True)
+    return progress.update(course_id=_video_course()), attempts.update(course_id=_quiz_course())
+
+
+def video_moved(video):
+    """Point a moved video's progress rows and quiz attempts at its new course."""
+    course_id = video.module.course_id
+    VideoProgress.objects.filter(video=video).update(course_id=course_id)
+    QuizAttempt.objects.filter(quiz__video=video).update(course_id=course_id)
+
+
+def module_moved(module):
+    """Point the progress rows and attempts under a moved module at its new course."""
+    VideoProgress.objects.filter(video__module=module).update(course_id=module.course_id)
+    QuizAttempt.objects.filter(
+        Q(quiz__module=module) | Q(quiz__video__module=module)
+    ).update(course_id=module.course_id)
+
+
+def quiz_moved(quiz, course_id):
+    QuizAttempt.objects.filter(quiz=quiz).update(course_id=course_id)
@@ -0,0 +1,205 @@
+"""
+Write-behind buffering for video player heartbeats.
+
+With ``VIDEO_PROGRESS_WRITE_BEHIND`` enabled, heartbeats that don't complete
+a video are accumulated per (user, video) instead of being written to
+VideoProgress on every call. ``flush_heartbeats`` drains the buffer and
+applies it to the database with one bulk update and one bulk insert; run it
+periodically with ``manage.py flush_video_progress``.
+
+The buffer lives in Redis, where the web workers, the flush command and the
+beat task all see it. Buffering needs the default cache to be django-redis;
+with any other backend heartbeats are written synchronously (and the
+``progress.W001`` check says so), since a per-process buffer could never be
+drained by another process.
+"""
+import json
+import uuid
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from courses.models import Video
+from .models import VideoProgress
+
+BUFFER_KEY = 'progress:heartbeats'
+COMPLETED_TIMEOUT = 60 * 60 * 24
+COMPLETION_THRESHOLD = 90
+
+
+def _field(user_id, video_id):
+    return f'{user_id}:{video_id}'
+
+
+def _completed_key(user_id, video_id):
+    return f'progress:completed:{user_id}:{video_id}'
+
+
+class RedisHeartbeatBuffer:
+    """Buffer heartbeats in a single Redis hash, one field per (user, video)."""
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+        from redis.exceptions import ResponseError
+        self.redis = get_redis_connection('default')
+        self.missing_key_error = ResponseError
+
+    def get(self, user_id, video_id):
+        raw = self.redis.hget(BUFFER_KEY, _field(user_id, video_id))
+        return json.loads(raw) if raw else None
+
+    def put(self, user_id, video_id, entry):
+        self.redis.hset(BUFFER_KEY, _field(user_id, video_id), json.dumps(entry))
+
+    def discard(self, user_id, video_id):
+        self.redis.hdel(BUFFER_KEY, _field(user_id, video_id))
+
+    def drain(self):
+        # Renaming is atomic, so heartbeats arriving mid-flush land in a
+        # fresh hash and are picked up by the next flush.
+        flushing = f'{BUFFER_KEY}:flushing:{uuid.uuid4().hex}'
+        try:
+            self.redis.rename(BUFFER_KEY, flushing)
+        except self.missing_key_error:
+            # Nothing buffered since the last flush.
+            return {}
+        raw = self.redis.hgetall(flushing)
+        self.redis.delete(flushing)
+        return {key.decode(): json.loads(value) for key, value in raw.items()}
+
+
+def shared_buffer_available():
+    return 'django_redis' in settings.CACHES['default']['BACKEND']
+
+
+def get_buffer():
+    return RedisHeartbeatBuffer()
+
+
+def write_behind_enabled():
+    """Whether to buffer heartbeats: asked for, and there's a shared buffer to use."""
+    return getattr(settings, 'VIDEO_PROGRESS_WRITE_BEHIND', False) and shared_buffer_available()
+
+
+def check_write_behind(app_configs, **kwargs):
+    """System check: write-behind was asked for without Redis to buffer in."""
+    if getattr(settings, 'VIDEO_PROGRESS_WRITE_BEHIND', False) and not shared_buffer_available():
+        return [checks.Warning(
+            'VIDEO_PROGRESS_WRITE_BEHIND is on, but the default cache is not django-redis.',
+            hint='Heartbeats are written synchronously until a Redis cache is configured.',
+            id='progress.W001',
+        )]
+    return []
+
+
+def _percentage(watched_seconds, total_seconds):
+    if total_seconds == 0:
+        return 0
+    return min(round((watched_seconds / total_seconds) * 100, 2), 100)
+
+
+def buffer_heartbeat(user_id, data, buffer=None):
+    """
+    Buffer a heartbeat, unless it would complete the video.
+
+    Returns the buffered entry, or None when the caller must take the
+    synchronous path so completion is applied immediately.
+    """
+    buffer = buffer or get_buffer()
+    video_id = data['video_id']
+    previous = buffer.get(user_id, video_id) or {}
+    watched_seconds = max(previous.get('watched_seconds', 0), data['watched_seconds'])
+
+    already_completed = cache.get(_completed_key(user_id, video_id))
+    completes = (
+        data.get('is_completed')
+        or _percentage(watched_seconds, data['total_seconds']) >= COMPLETION_THRESHOLD
+    )
+    if completes and not already_completed:
+        return None
+
+    entry = {
+        'watched_seconds': watched_seconds,
+        'total_seconds': data['total_seconds'],
+        'last_position_seconds': data.get('last_position_seconds', 0),
+        'updated_at': timezone.now().isoformat(),
+    }
+    buffer.put(user_id, video_id, entry)
+    return entry
+
+
+def _apply(progress, entry):
+    """Bring a progress row up to a buffered entry, without saving it."""
+    progress.watched_seconds = max(progress.watched_seconds, entry['watched_seconds'])
+    progress.total_seconds = entry['total_seconds']
+    progress.last_position_seconds = entry['last_position_seconds']
+    progress.last_watched_at = parse_datetime(entry['updated_at'])
+    return progress
+
+
+def _new_progress(user_id, video_id, course_id):
+    return VideoProgress(user_id=user_id, video_id=video_id, course_id=course_id, watch_count=1)
+
+
+def buffered_progress(user, video, entry):
+    """The video's progress row as it will read once ``entry`` is flushed (unsaved)."""
+    progress = VideoProgress.objects.filter(user=user, video=video).first()
+    if progress is None:
+        progress = _new_progress(user.id, video.id, video.module.course_id)
+        progress.user, progress.video = user, video
+    return _apply(progress, entry)
+
+
+def mark_completed(user_id, video_id, buffer=None):
+    """Record that a video was completed synchronously; drop stale buffered state."""
+    (buffer or get_buffer()).discard(user_id, video_id)
+    cache.set(_completed_key(user_id, video_id), True, COMPLETED_TIMEOUT)
+
+
+def flush_heartbeats(buffer=None):
+    """Apply every buffered heartbeat to VideoProgress in bulk; return rows written."""
+    entries = (buffer or get_buffer()).drain()
+    if not entries:
+        return 0
+
+    buffered = {}
+    for field, entry in entries.items():
+        user_id, video_id = (int(part) for part in field.split(':'))
+        buffered[(user_id, video_id)] = entry
+
+    user_ids = {user_id for user_id, _ in buffered}
+    video_courses = dict(Video.objects.filter(
+        id__in={video_id for _, video_id in buffered}
+    ).values_list('id', 'module__course_id'))
+    video_ids = set(video_courses)
+
+    existing = {
+        (p.user_id, p.video_id): p
+        for p in VideoProgress.objects.filter(user_id__in=user_ids, video_id__in=video_ids)
+        if (p.user_id, p.video_id) in buffered
+    }
+
+    to_update, to_create = [], []
+    for (user_id, video_id), entry in buffered.items():
+        if video_id not in video_ids:
+            continue
+        progress = existing.get((user_id, video_id))
+        if progress is None:
+            to_create.append(_apply(_new_progress(user_id, video_id, video_courses[video_id]), entry))
+        else:
+            to_update.append(_apply(progress, entry))
+
+    if to_update:
+        VideoProgress.objects.bulk_update(
+            to_update,
+            ['watched_seconds', 'total_seconds', 'last_position_seconds', 'last_watched_at'],
+            batch_size=1000
+        )
+    if to_create:
+        # A synchronous completion may have created the row meanwhile; it wins.
+        VideoProgress.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+
+    return len(to_update) + len(to_create)
@@ -0,0 +1,26 @@
+"""
+Management command to fill in the denormalized course on progress rows and attempts.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from progress.course_refs import backfill_course_refs
+
+
+class Command(BaseCommand):
+    help = 'Sets VideoProgress.course and QuizAttempt.course from their video or quiz'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every row, not just rows without a course'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            progress, attempts = backfill_course_refs(only_missing=not options['all'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {progress} video progress records and {attempts} quiz attempts.'
+        ))
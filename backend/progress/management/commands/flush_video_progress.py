@@ -0,0 +1,32 @@
+"""
+Management command to write buffered video heartbeats to the database.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from progress.heartbeats import flush_heartbeats
+
+
+class Command(BaseCommand):
+    help = 'Flushes buffered video progress heartbeats to VideoProgress in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Keep running and flush every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        while True:
+            written = flush_heartbeats()
+            self.stdout.write(
+                self.style.SUCCESS(f'Flushed {written} video progress records.')
+            )
+            if not interval:
+                break
+            time.sleep(interval)
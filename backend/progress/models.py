@@ -25,6 +25,8 @@ class CourseProgress(models.Model):
     quizzes_completed = models.PositiveIntegerField(default=0)
     quizzes_passed = models.PositiveIntegerField(default=0)
     total_quizzes = models.PositiveIntegerField(default=0)
+    # Course.structure_version the counters were last recounted against
+    structure_version = models.PositiveIntegerField(null=True, blank=True, editable=False)
     
     last_accessed_at = models.DateTimeField(auto_now=True)
     started_at = models.DateTimeField(auto_now_add=True)
@@ -34,6 +36,13 @@ class CourseProgress(models.Model):
         verbose_name = 'course progress'
         verbose_name_plural = 'course progress records'
         unique_together = ['user', 'course']
+        indexes = [
+            # Completion counts per course; only completed rows are indexed
+            models.Index(
+                fields=['course'], condition=models.Q(completed_at__isnull=False),
+                name='courseprogress_completed_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.course.title} - {self.progress_percentage}%"
@@ -49,18 +58,6 @@ class CourseProgress(models.Model):
     def is_completed(self):
         """Check if course is completed."""
         return self.videos_completed >= self.total_videos and self.completed_at is not None
-    
-    def update_totals(self):
-        """Update total counts from course."""
-        self.total_videos = self.course.total_videos
-        from quizzes.models import Quiz
-        self.total_quizzes = Quiz.objects.filter(
-            models.Q(course=self.course) | 
-            models.Q(module__course=self.course) |
-            models.Q(video__module__course=self.course),
-            is_required=True
-        ).count()
-        self.save()
 
 
 class VideoProgress(models.Model):
@@ -76,6 +73,15 @@ class VideoProgress(models.Model):
         on_delete=models.CASCADE,
         related_name='progress_records'
     )
+    # Denormalized video.module.course, so per-course queries skip the joins;
+    # kept in step with video and module moves by progress.signals
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name='video_progress_records'
+    )
     
     watched_seconds = models.PositiveIntegerField(default=0)
     total_seconds = models.PositiveIntegerField(default=0)
@@ -92,11 +98,20 @@ class VideoProgress(models.Model):
         verbose_name = 'video progress'
         verbose_name_plural = 'video progress records'
         unique_together = ['user', 'video']
+        indexes = [
+            # A student's (completed) videos in one course
+            models.Index(fields=['user', 'course', 'is_completed'], name='videoprogress_user_done_idx'),
+        ]
     
     def __str__(self):
         status = "Completed" if self.is_completed else f"{self.progress_percentage}%"
         return f"{self.user.email} - {self.video.title} - {status}"
     
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.course_id is None:
+            self.course_id = self.video.module.course_id
+        super().save(*args, **kwargs)
+    
     @property
     def progress_percentage(self):
         """Calculate video watch progress."""
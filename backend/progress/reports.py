@@ -0,0 +1,119 @@
+"""
+Set-based report queries for the admin progress reports.
+
+Every per-student figure is a correlated subquery on the student row, so the
+whole report is a single SELECT no matter how many students there are.
+"""
+import csv
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from courses.models import Enrollment
+from quizzes.models import QuizAttempt
+from .models import CourseProgress, Certificate
+
+User = get_user_model()
+
+STUDENT_REPORT_FIELDS = [
+    'user_id', 'user_email', 'user_name', 'courses_enrolled', 'courses_completed',
+    'overall_progress', 'quizzes_taken', 'average_quiz_score', 'certificates_earned',
+]
+
+
+def _per_user(queryset, aggregate, output_field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(user=OuterRef('pk'))
+            .order_by()
+            .values('user')
+            .annotate(value=aggregate)
+            .values('value'),
+            output_field=output_field
+        ),
+        0,
+        output_field=output_field
+    )
+
+
+def student_progress_report_queryset():
+    """Students annotated with every figure in the progress report."""
+    completed_attempts = QuizAttempt.objects.filter(status=QuizAttempt.Status.COMPLETED)
+    integer, number = models.IntegerField(), models.FloatField()
+
+    return User.objects.filter(role=User.Role.STUDENT).annotate(
+        courses_enrolled=_per_user(Enrollment.objects, Count('pk'), integer),
+        courses_completed=_per_user(
+            Enrollment.objects.filter(status=Enrollment.Status.COMPLETED), Count('pk'), integer
+        ),
+        overall_progress=_per_user(CourseProgress.objects, Avg('videos_completed'), number),
+        quizzes_taken=_per_user(completed_attempts, Count('pk'), integer),
+        average_quiz_score=_per_user(completed_attempts, Avg('score'), number),
+        certificates_earned=_per_user(Certificate.objects, Count('pk'), integer),
+    ).order_by('pk')
+
+
+def student_report_row(student):
+    """Format one annotated student as a report row."""
+    return {
+        'user_id': student.id,
+        'user_email': student.email,
+        'user_name': student.full_name,
+        'courses_enrolled': student.courses_enrolled,
+        'courses_completed': student.courses_completed,
+        'overall_progress': student.overall_progress,
+        'quizzes_taken': student.quizzes_taken,
+        'average_quiz_score': round(student.average_quiz_score, 2),
+        'certificates_earned': student.certificates_earned,
+    }
+
+
+def iter_student_report_rows(queryset, chunk_size=2000):
+    """Yield report rows without materializing the whole student table."""
+    for student in queryset.iterator(chunk_size=chunk_size):
+        yield student_report_row(student)
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_json(rows):
+    """Stream rows as a single JSON array."""
+    yield '['
+    for index, row in enumerate(rows):
+        yield (',' if index else '') + json.dumps(row, cls=DjangoJSONEncoder)
+    yield ']'
+
+
+def stream_csv(rows, fields):
+    """Stream rows as CSV with a header line."""
+    writer = csv.DictWriter(_Echo(), fieldnames=fields)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+async def aiter_chunks(chunks, batch_size=500):
+    """
+    Iterate a blocking generator of chunks from async code, for ASGI responses.
+
+    Django 4.2 turns a sync iterator given to a StreamingHttpResponse under
+    ASGI into a list before sending anything. Here the generator advances
+    ``batch_size`` chunks at a time on the request's thread-sensitive
+    thread, where its database cursor lives, so memory stays bounded.
+    """
+    iterator = iter(chunks)
+    take = sync_to_async(lambda: list(itertools.islice(iterator, batch_size)))
+    while batch := await take():
+        for chunk in batch:
+            yield chunk
@@ -70,10 +70,9 @@ class CourseProgressDetailSerializer(serializers.ModelSerializer):
         ]
     
     def get_video_progress(self, obj):
-        videos = obj.course.modules.values_list('videos', flat=True)
         progress = VideoProgress.objects.filter(
-            user=obj.user,
-            video__in=videos
+            user_id=obj.user_id,
+            course_id=obj.course_id
         )
         return VideoProgressSerializer(progress, many=True).data
 
@@ -0,0 +1,35 @@
+"""
+Signals for progress app.
+
+Keep the denormalized course on VideoProgress and QuizAttempt rows current
+when a video, module or quiz moves to another course.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from courses.models import Module, Video
+from quizzes.models import Quiz
+from .course_refs import module_moved, quiz_moved, video_moved
+
+
+@receiver(post_save, sender=Video)
+def follow_moved_video(sender, instance, created, **kwargs):
+    previous_module_id = getattr(instance, '_previous_module_id', None)
+    if not created and previous_module_id and previous_module_id != instance.module_id:
+        video_moved(instance)
+
+
+@receiver(post_save, sender=Module)
+def follow_moved_module(sender, instance, created, **kwargs):
+    previous_course_id = getattr(instance, '_previous_course_id', None)
+    if not created and previous_course_id and previous_course_id != instance.course_id:
+        module_moved(instance)
+
+
+@receiver(post_save, sender=Quiz)
+def follow_moved_quiz(sender, instance, created, **kwargs):
+    if created or not hasattr(instance, '_previous_course_id'):
+        return
+    course_id = instance.get_course_id()
+    if instance._previous_course_id != course_id:
+        quiz_moved(instance, course_id)
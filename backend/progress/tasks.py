@@ -0,0 +1,57 @@
+"""
+Background tasks for progress tracking.
+"""
+import tempfile
+import uuid
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.urls import reverse
+
+from courses.models import Course
+from lms_project.jobs import TrackedTask, job_file_storage
+from .certificates import issue_certificate
+from .heartbeats import flush_heartbeats
+from .reports import (
+    STUDENT_REPORT_FIELDS, student_progress_report_queryset,
+    iter_student_report_rows, stream_csv, stream_json
+)
+
+User = get_user_model()
+
+
+@shared_task(base=TrackedTask, name='progress.issue_certificate')
+def issue_certificate_task(user_id, course_id):
+    """Issue a certificate; re-running returns the one already issued."""
+    certificate, created = issue_certificate(
+        User.objects.get(pk=user_id), Course.objects.get(pk=course_id)
+    )
+    return {'certificate_number': certificate.certificate_number, 'created': created}
+
+
+@shared_task(base=TrackedTask, bind=True, name='progress.generate_student_report')
+def generate_student_report(self, export='csv'):
+    """
+    Write the student progress report to private job storage.
+
+    Returns the stored name and the job file URL it's downloaded from.
+    """
+    rows = iter_student_report_rows(student_progress_report_queryset())
+    chunks = stream_csv(rows, STUDENT_REPORT_FIELDS) if export == 'csv' else stream_json(rows)
+
+    with tempfile.TemporaryFile(mode='w+b') as report:
+        for chunk in chunks:
+            report.write(chunk.encode())
+        report.seek(0)
+        name = job_file_storage().save(
+            f'reports/student-progress-{uuid.uuid4().hex}.{export}', File(report)
+        )
+
+    return {'path': name, 'url': reverse('job_file', args=[self.request.id])}
+
+
+@shared_task(name='progress.flush_video_progress')
+def flush_video_progress():
+    """Periodic flush of buffered heartbeats (see CELERY_BEAT_SCHEDULE)."""
+    return flush_heartbeats()
@@ -4,19 +4,32 @@ Views for progress tracking.
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count
 from django.contrib.auth import get_user_model
 
 from .models import CourseProgress, VideoProgress, Certificate
+from .certificates import CertificateNotAvailable, issue_certificate
+from .completion import is_stale, recompute_course_progress, record_video_completed
+from .heartbeats import (
+    buffer_heartbeat, buffered_progress, mark_completed, write_behind_enabled
+)
+from .reports import (
+    STUDENT_REPORT_FIELDS, student_progress_report_queryset, student_report_row,
+    iter_student_report_rows, stream_csv, stream_json, aiter_chunks
+)
+from .tasks import issue_certificate_task, generate_student_report
 from .serializers import (
     CourseProgressSerializer, CourseProgressDetailSerializer,
     VideoProgressSerializer, UpdateVideoProgressSerializer,
     CertificateSerializer, StudentProgressReportSerializer
 )
-from courses.models import Course, Video, Enrollment
-from quizzes.models import QuizAttempt
+from courses.models import Course, Video
 from accounts.permissions import IsAdmin
+from lms_project.jobs import enqueue, job_key, job_response, wants_async
 
 User = get_user_model()
 
@@ -46,13 +59,19 @@ class CourseProgressDetailView(generics.RetrieveAPIView):
             course__slug=course_slug,
             defaults={'course': Course.objects.get(slug=course_slug)}
         )
-        if created:
-            progress.update_totals()
+        if created or is_stale(progress):
+            recompute_course_progress(progress)
         return progress
 
 
 class UpdateVideoProgressView(APIView):
-    """Update video progress."""
+    """
+    Update video progress.
+    
+    With VIDEO_PROGRESS_WRITE_BEHIND on, heartbeats that don't complete the
+    video are buffered and acknowledged with 202 and the progress as it will
+    read once flushed; completions are always written immediately.
+    """
     
     permission_classes = [permissions.IsAuthenticated]
     
@@ -61,18 +80,29 @@ class UpdateVideoProgressView(APIView):
         serializer.is_valid(raise_exception=True)
         
         try:
-            video = Video.objects.get(id=serializer.validated_data['video_id'])
+            video = Video.objects.select_related('module').get(
+                id=serializer.validated_data['video_id']
+            )
         except Video.DoesNotExist:
             return Response(
                 {'error': 'Video not found.'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        if write_behind_enabled():
+            entry = buffer_heartbeat(request.user.id, serializer.validated_data)
+            if entry is not None:
+                return Response(
+                    VideoProgressSerializer(buffered_progress(request.user, video, entry)).data,
+                    status=status.HTTP_202_ACCEPTED
+                )
+        
         # Get or create video progress
         progress, created = VideoProgress.objects.get_or_create(
             user=request.user,
             video=video,
             defaults={
+                'course_id': video.module.course_id,
                 'total_seconds': video.duration_minutes * 60
             }
         )
@@ -90,66 +120,21 @@ class UpdateVideoProgressView(APIView):
         
         # Mark as completed if watched enough (90%)
         if serializer.validated_data.get('is_completed') or progress.progress_percentage >= 90:
-            if not progress.is_completed:
+            completed_at = timezone.now()
+            # Only the request that flips the flag counts the completion.
+            if not progress.is_completed and VideoProgress.objects.filter(
+                pk=progress.pk, is_completed=False
+            ).update(is_completed=True, completed_at=completed_at):
                 progress.is_completed = True
-                progress.completed_at = timezone.now()
-                
-                # Update course progress
-                self._update_course_progress(request.user, video)
+                progress.completed_at = completed_at
+                record_video_completed(request.user.id, video.module.course_id)
         
         progress.save()
         
-        return Response(VideoProgressSerializer(progress).data)
-    
-    def _update_course_progress(self, user, video):
-        """Update course progress when a video is completed."""
-        course = video.module.course
-        
-        course_progress, created = CourseProgress.objects.get_or_create(
-            user=user,
-            course=course
-        )
-        
-        # Count completed videos
-        completed_videos = VideoProgress.objects.filter(
-            user=user,
-            video__module__course=course,
-            is_completed=True
-        ).count()
-        
-        course_progress.videos_completed = completed_videos
-        course_progress.update_totals()
-        
-        # Check if course is completed
-        if course_progress.videos_completed >= course_progress.total_videos:
-            # Check required quizzes
-            from quizzes.models import Quiz
-            required_quizzes = Quiz.objects.filter(
-                Q(course=course) | Q(module__course=course) | Q(video__module__course=course),
-                is_required=True
-            )
-            
-            passed_quizzes = QuizAttempt.objects.filter(
-                user=user,
-                quiz__in=required_quizzes,
-                passed=True
-            ).values('quiz').distinct().count()
-            
-            course_progress.quizzes_passed = passed_quizzes
-            
-            if passed_quizzes >= required_quizzes.count():
-                course_progress.completed_at = timezone.now()
-                
-                # Update enrollment status
-                enrollment = Enrollment.objects.filter(
-                    user=user, course=course
-                ).first()
-                if enrollment:
-                    enrollment.status = Enrollment.Status.COMPLETED
-                    enrollment.completed_at = timezone.now()
-                    enrollment.save()
+        if write_behind_enabled() and progress.is_completed:
+            mark_completed(request.user.id, video.id)
         
-        course_progress.save()
+        return Response(VideoProgressSerializer(progress).data)
 
 
 class VideoProgressListView(generics.ListAPIView):
@@ -162,7 +147,7 @@ class VideoProgressListView(generics.ListAPIView):
         course_slug = self.kwargs.get('course_slug')
         return VideoProgress.objects.filter(
             user=self.request.user,
-            video__module__course__slug=course_slug
+            course__slug=course_slug
         ).select_related('video')
 
 
@@ -188,7 +173,7 @@ class CertificateDetailView(generics.RetrieveAPIView):
 
 
 class IssueCertificateView(APIView):
-    """Issue certificate for completed course."""
+    """Issue certificate for completed course; ?async=1 issues it as a background job."""
     
     permission_classes = [permissions.IsAuthenticated]
     
@@ -201,30 +186,22 @@ class IssueCertificateView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Check if course is completed
-        try:
-            progress = CourseProgress.objects.get(
-                user=request.user,
-                course=course
-            )
-        except CourseProgress.DoesNotExist:
-            return Response(
-                {'error': 'No progress found for this course.'},
-                status=status.HTTP_400_BAD_REQUEST
+        if wants_async(request):
+            job = enqueue(
+                issue_certificate_task, request.user.id, course.id,
+                key=job_key(request, 'certificate', request.user.id, course.id),
+                owner=request.user
             )
+            return job_response(request, job)
         
-        if not progress.is_completed:
+        try:
+            certificate, created = issue_certificate(request.user, course)
+        except CertificateNotAvailable as exc:
             return Response(
-                {'error': 'Course not yet completed.'},
+                {'error': str(exc)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if certificate already exists
-        certificate, created = Certificate.objects.get_or_create(
-            user=request.user,
-            course=course
-        )
-        
         if not created:
             return Response(
                 {'message': 'Certificate already issued.', 'certificate': CertificateSerializer(certificate).data}
@@ -237,42 +214,65 @@ class IssueCertificateView(APIView):
 
 
 # Admin Views
+class ReportPagination(PageNumberPagination):
+    """Opt-in pagination for admin reports."""
+    
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+def _streaming_export(request, chunks, content_type):
+    """Stream ``chunks``, asynchronously when served over ASGI."""
+    if isinstance(request._request, ASGIRequest):
+        chunks = aiter_chunks(chunks)
+    return StreamingHttpResponse(chunks, content_type=content_type)
+
+
 class StudentProgressReportView(APIView):
-    """Get progress report for all students (admin only)."""
+    """
+    Get progress report for all students (admin only).
+    
+    Returns the full list by default. Pass ``page`` (and optionally
+    ``page_size``) for a paginated response, or ``export=csv``/``export=json``
+    to stream the whole student body with bounded memory. Adding ``async=1``
+    to an export writes the file to storage in a background job instead.
+    """
     
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     
     def get(self, request):
-        students = User.objects.filter(role=User.Role.STUDENT)
-        reports = []
+        queryset = student_progress_report_queryset()
+        export = request.query_params.get('export')
+        
+        if export in ('csv', 'json') and wants_async(request):
+            job = enqueue(
+                generate_student_report, export,
+                key=job_key(request, 'student-report'), owner=request.user
+            )
+            return job_response(request, job)
+        
+        if export == 'csv':
+            response = _streaming_export(
+                request,
+                stream_csv(iter_student_report_rows(queryset), STUDENT_REPORT_FIELDS),
+                'text/csv'
+            )
+            response['Content-Disposition'] = 'attachment; filename="student-progress.csv"'
+            return response
+        
+        if export == 'json':
+            return _streaming_export(
+                request, stream_json(iter_student_report_rows(queryset)), 'application/json'
+            )
         
-        for student in students:
-            enrollments = Enrollment.objects.filter(user=student)
-            completed = enrollments.filter(status=Enrollment.Status.COMPLETED).count()
-            
-            quiz_attempts = QuizAttempt.objects.filter(
-                user=student,
-                status=QuizAttempt.Status.COMPLETED
+        if 'page' in request.query_params:
+            paginator = ReportPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(
+                [student_report_row(student) for student in page]
             )
-            
-            avg_score = quiz_attempts.aggregate(avg=Avg('score'))['avg'] or 0
-            
-            course_progress = CourseProgress.objects.filter(user=student)
-            overall = course_progress.aggregate(avg=Avg('videos_completed'))['avg'] or 0
-            
-            reports.append({
-                'user_id': student.id,
-                'user_email': student.email,
-                'user_name': student.full_name,
-                'courses_enrolled': enrollments.count(),
-                'courses_completed': completed,
-                'overall_progress': overall,
-                'quizzes_taken': quiz_attempts.count(),
-                'average_quiz_score': round(avg_score, 2),
-                'certificates_earned': Certificate.objects.filter(user=student).count()
-            })
         
-        return Response(reports)
+        return Response([student_report_row(student) for student in queryset])
 
 
 class CourseProgressReportView(APIView):
@@ -0,0 +1,125 @@
+"""
+Compiled, cached answer-key snapshots for quizzes.
+
+A snapshot holds everything grading needs (question ids, types, points,
+correct answer ids and normalized short answers) and is immutable once
+built. Snapshots are stored in the default cache under a per-quiz version
+token; changing a question or answer replaces the token (after the
+transaction commits), so readers move to a fresh snapshot and stale ones
+simply expire.
+"""
+import uuid
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Question
+
+# Bump when the snapshot layout changes so old pickles are never read.
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+def normalize_text(value):
+    """Normalize a short answer for comparison."""
+    return (value or '').strip().lower()
+
+
+@dataclass(frozen=True)
+class QuestionKey:
+    """Everything needed to grade one question."""
+
+    id: int
+    question_type: str
+    points: int
+    # All answer ids in display order, used to order a selection the way
+    # the stored M2M selection reads back.
+    answer_ids: tuple
+    correct_answer_ids: frozenset
+    # Single-answer and short answer questions are graded against the first
+    # correct answer in display order.
+    first_correct_answer_id: int = None
+    first_correct_text: str = None
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """The graded view of a quiz: its questions and their correct answers."""
+
+    quiz_id: int
+    questions: dict = field(default_factory=dict)
+
+    @property
+    def total_points(self):
+        return sum(q.points for q in self.questions.values())
+
+    @property
+    def total_questions(self):
+        return len(self.questions)
+
+
+def build_answer_key(quiz_id, questions=None):
+    """
+    Compile a quiz's questions and answers into an AnswerKey.
+    
+    Loads them with two queries, unless ``questions`` (with ``answers``
+    prefetched) is already in hand.
+    """
+    if questions is None:
+        questions = Question.objects.filter(quiz_id=quiz_id).prefetch_related('answers')
+    
+    compiled = {}
+    for question in questions:
+        answers = list(question.answers.all())
+        correct = [a for a in answers if a.is_correct]
+        compiled[question.id] = QuestionKey(
+            id=question.id,
+            question_type=question.question_type,
+            points=question.points,
+            answer_ids=tuple(a.id for a in answers),
+            correct_answer_ids=frozenset(a.id for a in correct),
+            first_correct_answer_id=correct[0].id if correct else None,
+            first_correct_text=normalize_text(correct[0].answer_text) if correct else None,
+        )
+    return AnswerKey(quiz_id=quiz_id, questions=compiled)
+
+
+def _version_key(quiz_id):
+    return f'quizzes:answer-key-version:{quiz_id}'
+
+
+def _snapshot_key(quiz_id, version):
+    return f'quizzes:answer-key:{SNAPSHOT_FORMAT}:{quiz_id}:{version}'
+
+
+def current_version(quiz_id):
+    version = cache.get(_version_key(quiz_id))
+    if version is None:
+        # A missing token (first use or eviction) must not resurrect an older
+        # snapshot, so start from a new random token rather than a counter.
+        cache.add(_version_key(quiz_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(quiz_id))
+    return version
+
+
+def get_answer_key(quiz_id, questions=None):
+    """
+    Return the quiz's answer key, building and caching it on a miss.
+    
+    ``questions`` optionally supplies already-prefetched questions to build
+    from on a miss.
+    """
+    snapshot_key = _snapshot_key(quiz_id, current_version(quiz_id))
+    answer_key = cache.get(snapshot_key)
+    if answer_key is None:
+        answer_key = build_answer_key(quiz_id, questions)
+        cache.set(snapshot_key, answer_key, SNAPSHOT_TIMEOUT)
+    return answer_key
+
+
+def invalidate_answer_key(quiz_id):
+    """Retire the quiz's current snapshot once the surrounding transaction commits."""
+    transaction.on_commit(
+        lambda: cache.set(_version_key(quiz_id), uuid.uuid4().hex, None)
+    )
@@ -0,0 +1,177 @@
+"""
+Batched grading engine for quiz submissions.
+
+A quiz's cached answer key (see answer_keys) is read once, every submitted
+response is graded in memory against it, and responses and their selected
+answers are written with bulk queries. Grading a submission costs the same handful of queries
+whether the quiz has five questions or five hundred.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from courses.aggregates import bump_structure_version
+from progress.completion import record_quiz_passed
+from .answer_keys import get_answer_key, normalize_text
+from .models import Quiz, Question, QuizAttempt, QuizResponse
+
+SINGLE_ANSWER_TYPES = (Question.QuestionType.MULTIPLE_CHOICE, Question.QuestionType.TRUE_FALSE)
+
+
+def grade_response(question, selected_ids, text_response):
+    """Grade a single response in memory against its QuestionKey."""
+    chosen = set(selected_ids)
+    selected_ids = [i for i in question.answer_ids if i in chosen]
+
+    if question.question_type in SINGLE_ANSWER_TYPES:
+        return bool(selected_ids) and selected_ids[0] == question.first_correct_answer_id
+
+    if question.question_type == Question.QuestionType.MULTIPLE_SELECT:
+        return set(selected_ids) == question.correct_answer_ids
+
+    if question.question_type == Question.QuestionType.SHORT_ANSWER:
+        if question.first_correct_text is None:
+            return False
+        return normalize_text(text_response) == question.first_correct_text
+
+    return False
+
+
+@transaction.atomic
+def grade_submission(attempt, submitted, answer_key=None):
+    """
+    Grade and persist a set of submitted responses for an attempt.
+
+    ``submitted`` is a list of dicts with ``question_id`` and optional
+    ``selected_answer_ids``/``text_response``, as validated by
+    SubmitQuizSerializer. Responses to questions outside the quiz are ignored,
+    as are selected answers that don't belong to their question. Completes
+    the attempt, sets its score and credits a first pass of a required quiz
+    to the student's course progress.
+    """
+    if answer_key is None:
+        answer_key = get_answer_key(attempt.quiz_id)
+
+    # Later entries for the same question win, as if submitted one by one.
+    by_question = {}
+    for data in submitted:
+        if data['question_id'] in answer_key.questions:
+            by_question[data['question_id']] = data
+
+    existing = {r.question_id: r for r in QuizResponse.objects.filter(attempt=attempt)}
+    selected_through = QuizResponse.selected_answers.through
+    current_selection = {}
+    if existing:
+        for response_id, answer_id in selected_through.objects.filter(
+            quizresponse__attempt=attempt
+        ).values_list('quizresponse_id', 'answer_id'):
+            current_selection.setdefault(response_id, []).append(answer_id)
+
+    to_create, to_update, new_selection = [], [], {}
+    for question_id, data in by_question.items():
+        question = answer_key.questions[question_id]
+        response = existing.get(question_id)
+        if response is None:
+            response = QuizResponse(attempt=attempt, question_id=question_id)
+            to_create.append(response)
+        else:
+            to_update.append(response)
+
+        selected_ids = [i for i in data.get('selected_answer_ids') or [] if i in question.answer_ids]
+        if data.get('selected_answer_ids'):
+            new_selection[question_id] = selected_ids
+        else:
+            selected_ids = current_selection.get(response.pk, [])
+
+        if data.get('text_response'):
+            response.text_response = data['text_response']
+
+        response.is_correct = grade_response(question, selected_ids, response.text_response)
+        response.points_earned = question.points if response.is_correct else 0
+
+    now = timezone.now()
+    for response in to_create + to_update:
+        response.answered_at = now
+
+    QuizResponse.objects.bulk_create(to_create)
+    if to_update:
+        QuizResponse.objects.bulk_update(
+            to_update, ['text_response', 'is_correct', 'points_earned', 'answered_at']
+        )
+
+    if new_selection:
+        responses = {r.question_id: r for r in to_create + to_update}
+        replaced = [responses[qid].pk for qid in new_selection if qid in existing]
+        if replaced:
+            selected_through.objects.filter(quizresponse_id__in=replaced).delete()
+        selected_through.objects.bulk_create([
+            selected_through(quizresponse_id=responses[qid].pk, answer_id=answer_id)
+            for qid, answer_ids in new_selection.items()
+            for answer_id in set(answer_ids)
+        ])
+
+    earned = sum(r.points_earned for r in list(existing.values()) + to_create)
+
+    attempt.status = QuizAttempt.Status.COMPLETED
+    attempt.completed_at = now
+    attempt.time_taken_seconds = int((attempt.completed_at - attempt.started_at).total_seconds())
+    attempt.set_score(earned, answer_key.total_points)
+    attempt.save()
+    record_quiz_passed(attempt)
+    return attempt
+
+
+
+def regrade_quiz(quiz_id, chunk_size=500):
+    """
+    Re-grade every completed attempt of a quiz against its current answer key.
+
+    Works through the attempts in chunks, each in its own transaction, with
+    one read and one bulk update per table per chunk. Returns the number of
+    attempts re-graded.
+    """
+    answer_key = get_answer_key(quiz_id)
+    selected_through = QuizResponse.selected_answers.through
+    attempts = QuizAttempt.objects.filter(
+        quiz_id=quiz_id, status=QuizAttempt.Status.COMPLETED
+    ).select_related('quiz').order_by('pk')
+
+    regraded, pass_changed, last_pk = 0, False, 0
+    while True:
+        batch = list(attempts.filter(pk__gt=last_pk)[:chunk_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+
+        with transaction.atomic():
+            responses = list(QuizResponse.objects.filter(attempt__in=batch))
+            selection = {}
+            for response_id, answer_id in selected_through.objects.filter(
+                quizresponse__attempt__in=batch
+            ).values_list('quizresponse_id', 'answer_id'):
+                selection.setdefault(response_id, []).append(answer_id)
+
+            earned = {}
+            for response in responses:
+                question = answer_key.questions.get(response.question_id)
+                response.is_correct = question is not None and grade_response(
+                    question, selection.get(response.pk, []), response.text_response
+                )
+                response.points_earned = question.points if response.is_correct else 0
+                earned[response.attempt_id] = earned.get(response.attempt_id, 0) + response.points_earned
+            QuizResponse.objects.bulk_update(responses, ['is_correct', 'points_earned'])
+
+            for attempt in batch:
+                passed = attempt.passed
+                attempt.set_score(earned.get(attempt.pk, 0), answer_key.total_points)
+                pass_changed = pass_changed or attempt.passed != passed
+            QuizAttempt.objects.bulk_update(batch, ['score', 'passed'])
+
+        regraded += len(batch)
+
+    if pass_changed:
+        quiz = Quiz.objects.select_related('module', 'video__module').get(pk=quiz_id)
+        course_id = quiz.get_course_id() if quiz.is_required else None
+        if course_id:
+            # Stored pass counts no longer hold; recount course progress on next use.
+            bump_structure_version([course_id])
+    return regraded
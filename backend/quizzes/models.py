@@ -56,6 +56,16 @@ class Quiz(models.Model):
     def __str__(self):
         return self.title
     
+    def get_course_id(self):
+        """Id of the course this quiz belongs to, however it is attached."""
+        if self.course_id:
+            return self.course_id
+        if self.module_id:
+            return self.module.course_id
+        if self.video_id:
+            return self.video.module.course_id
+        return None
+    
     @property
     def total_questions(self):
         return self.questions.count()
@@ -143,6 +153,14 @@ class QuizAttempt(models.Model):
         on_delete=models.CASCADE,
         related_name='attempts'
     )
+    # Denormalized quiz.get_course_id(), kept in step with quiz moves by signals
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        null=True,
+        editable=False,
+        related_name='quiz_attempts'
+    )
     
     status = models.CharField(
         max_length=20,
@@ -161,20 +179,39 @@ class QuizAttempt(models.Model):
         verbose_name = 'quiz attempt'
         verbose_name_plural = 'quiz attempts'
         ordering = ['-started_at']
+        indexes = [
+            # Attempt limit and in-progress checks when starting a quiz
+            models.Index(fields=['user', 'quiz', 'status'], name='quizattempt_user_quiz_idx'),
+            # Keyset pagination of the all-attempts list
+            models.Index(fields=['-started_at', '-id'], name='quizattempt_keyset_idx'),
+            # A student's attempts in one course
+            models.Index(fields=['user', 'course'], name='quizattempt_user_course_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.email} - {self.quiz.title} - {self.score}%"
     
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.course_id is None:
+            self.course_id = self.quiz.get_course_id()
+        super().save(*args, **kwargs)
+    
     def calculate_score(self):
         """Calculate the score based on responses."""
         total_points = self.quiz.total_points
         if total_points == 0:
             return 0
         
-        earned_points = sum(
-            response.question.points
-            for response in self.responses.filter(is_correct=True)
-        )
+        earned_points = self.responses.filter(is_correct=True).aggregate(
+            total=models.Sum('question__points')
+        )['total'] or 0
+        
+        return self.set_score(earned_points, total_points)
+    
+    def set_score(self, earned_points, total_points):
+        """Set score and pass status from already-graded point totals."""
+        if total_points == 0:
+            return 0
         
         self.score = (earned_points / total_points) * 100
         self.passed = self.score >= self.quiz.passing_score
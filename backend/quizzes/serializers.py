@@ -3,6 +3,7 @@ Serializers for quizzes.
 """
 from rest_framework import serializers
 from .models import Quiz, Question, Answer, QuizAttempt, QuizResponse
+from .answer_keys import get_answer_key
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -102,8 +103,8 @@ class QuizDetailSerializer(serializers.ModelSerializer):
     """Serializer for quiz details with questions."""
     
     questions = QuestionSerializer(many=True, read_only=True)
-    total_questions = serializers.ReadOnlyField()
-    total_points = serializers.ReadOnlyField()
+    total_questions = serializers.SerializerMethodField()
+    total_points = serializers.SerializerMethodField()
     user_attempts = serializers.SerializerMethodField()
     
     class Meta:
@@ -116,6 +117,19 @@ class QuizDetailSerializer(serializers.ModelSerializer):
             'user_attempts', 'created_at'
         ]
     
+    def _answer_key(self, obj):
+        # QuizDetailView prefetches questions__answers, so a cache miss
+        # compiles the snapshot without further queries.
+        if not hasattr(obj, '_answer_key'):
+            obj._answer_key = get_answer_key(obj.id, obj.questions.all())
+        return obj._answer_key
+    
+    def get_total_questions(self, obj):
+        return self._answer_key(obj).total_questions
+    
+    def get_total_points(self, obj):
+        return self._answer_key(obj).total_points
+    
     def get_user_attempts(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
@@ -0,0 +1,76 @@
+"""
+Signals for quizzes app.
+
+Retire cached answer-key snapshots whenever a question or answer changes,
+whether through the API serializers or the Django admin, and mark course
+progress for recompute when a required quiz is added, moved or removed.
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from courses.aggregates import bump_structure_version
+from lms_project.signals_utils import is_cascade
+from .answer_keys import invalidate_answer_key
+from .models import Quiz, Question, Answer
+
+
+@receiver(pre_save, sender=Quiz)
+def remember_previous_requirement(sender, instance, **kwargs):
+    """Record the quiz's course, and whether it counted towards it, before this save."""
+    instance._previous_requirement = None
+    if instance.pk:
+        previous = (
+            Quiz.objects.select_related('module', 'video__module').filter(pk=instance.pk).first()
+        )
+        if previous:
+            instance._previous_course_id = previous.get_course_id()
+            if previous.is_required:
+                instance._previous_requirement = instance._previous_course_id
+
+
+@receiver(post_save, sender=Quiz)
+def update_required_quiz_structure(sender, instance, **kwargs):
+    """Bump the structure version of every course whose required quizzes changed."""
+    previous_course_id = getattr(instance, '_previous_requirement', None)
+    current_course_id = instance.get_course_id() if instance.is_required else None
+    if previous_course_id != current_course_id:
+        bump_structure_version({previous_course_id, current_course_id} - {None})
+
+
+@receiver(post_delete, sender=Quiz)
+def remove_required_quiz_structure(sender, instance, origin=None, **kwargs):
+    if not instance.is_required or is_cascade(origin, Quiz):
+        # A cascade from a deleted video/module/course bumps the version itself.
+        return
+    course_id = instance.get_course_id()
+    if course_id:
+        bump_structure_version([course_id])
+
+
+@receiver(pre_save, sender=Question)
+def remember_previous_quiz(sender, instance, **kwargs):
+    """Record the quiz a question is being moved out of, if any."""
+    instance._previous_quiz_id = None
+    if instance.pk:
+        instance._previous_quiz_id = (
+            Question.objects.filter(pk=instance.pk).values_list('quiz_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_answer_key(sender, instance, **kwargs):
+    invalidate_answer_key(instance.quiz_id)
+    previous_quiz_id = getattr(instance, '_previous_quiz_id', None)
+    if previous_quiz_id and previous_quiz_id != instance.quiz_id:
+        invalidate_answer_key(previous_quiz_id)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def invalidate_answer_answer_key(sender, instance, origin=None, **kwargs):
+    if is_cascade(origin, Answer):
+        # Cascade from a deleted question/quiz/course; the question's own
+        # post_delete has invalidated the snapshot already.
+        return
+    invalidate_answer_key(instance.question.quiz_id)
@@ -0,0 +1,13 @@
+"""
+Background tasks for quizzes.
+"""
+from celery import shared_task
+
+from lms_project.jobs import TrackedTask
+from .grading import regrade_quiz
+
+
+@shared_task(base=TrackedTask, name='quizzes.regrade_quiz')
+def regrade_quiz_task(quiz_id):
+    """Re-grade a quiz's completed attempts, e.g. after an answer was corrected."""
+    return {'quiz_id': quiz_id, 'regraded': regrade_quiz(quiz_id)}
@@ -7,7 +7,7 @@ from .views import (
     QuestionListCreateView, QuestionDetailView,
     StartQuizView, SubmitQuizView,
     MyQuizAttemptsView, QuizAttemptDetailView,
-    AllQuizAttemptsView, QuizStatisticsView
+    AllQuizAttemptsView, QuizStatisticsView, RegradeQuizView
 )
 
 app_name = 'quizzes'
@@ -32,4 +32,5 @@ urlpatterns = [
     # Admin
     path('all-attempts/', AllQuizAttemptsView.as_view(), name='all_attempts'),
     path('<int:quiz_id>/statistics/', QuizStatisticsView.as_view(), name='quiz_statistics'),
+    path('<int:quiz_id>/regrade/', RegradeQuizView.as_view(), name='regrade_quiz'),
 ]
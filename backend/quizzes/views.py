@@ -5,15 +5,24 @@ from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Avg
+from django.db.models import (
+    Avg, Count, IntegerField, OuterRef, Q, Prefetch, Subquery, Value, prefetch_related_objects
+)
+from django.db.models.functions import Coalesce
 
-from .models import Quiz, Question, Answer, QuizAttempt, QuizResponse
+from .models import Quiz, Question, QuizAttempt, QuizResponse
+from .answer_keys import current_version as answer_key_version, get_answer_key
+from .grading import grade_submission
 from .serializers import (
     QuizListSerializer, QuizDetailSerializer, QuizAdminSerializer,
     QuizCreateSerializer, QuestionCreateSerializer, QuestionAdminSerializer,
     QuizAttemptSerializer, StartQuizSerializer, SubmitQuizSerializer
 )
+from .tasks import regrade_quiz_task
 from accounts.permissions import IsAdmin, IsAdminOrReadOnly
+from lms_project.conditional import ConditionalGetMixin, make_etag
+from lms_project.jobs import enqueue, job_key, job_response
+from lms_project.pagination import PageNumberOrKeysetPagination
 
 
 class QuizListView(generics.ListCreateAPIView):
@@ -40,11 +49,46 @@ class QuizListView(generics.ListCreateAPIView):
         return QuizListSerializer
 
 
-class QuizDetailView(generics.RetrieveUpdateDestroyAPIView):
-    """Retrieve, update, delete quiz."""
+class QuizDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    Retrieve, update, delete quiz.
+    
+    The ETag names the quiz row's ``updated_at``, its answer-key version
+    (which changes with any question or answer) and, for students, how many
+    attempts they have made, all read in one query. The attempt count is a
+    subquery over the (user, quiz) index rather than a join over every
+    attempt at the quiz.
+    """
     
     permission_classes = [IsAdminOrReadOnly]
     
+    def get_validators(self, request, *args, **kwargs):
+        user = request.user
+        is_admin = user.is_authenticated and user.is_admin
+        quiz = Quiz.objects.filter(pk=kwargs['pk'])
+        if not is_admin:
+            quiz = quiz.filter(is_published=True)
+        if user.is_authenticated:
+            attempts = (
+                QuizAttempt.objects.filter(user=user, quiz=OuterRef('pk'))
+                .order_by().values('quiz').annotate(count=Count('pk')).values('count')
+            )
+            quiz = quiz.annotate(
+                user_attempts=Coalesce(Subquery(attempts, output_field=IntegerField()), 0)
+            )
+        else:
+            quiz = quiz.annotate(user_attempts=Value(0))
+        row = quiz.values_list('updated_at', 'user_attempts').first()
+        if row is None:
+            return None, None
+        
+        updated_at, user_attempts = row
+        etag = make_etag(
+            'quiz', kwargs['pk'], updated_at.isoformat(), answer_key_version(kwargs['pk']),
+            is_admin, user_attempts
+        )
+        return etag, None
+    
     def get_queryset(self):
         queryset = Quiz.objects.prefetch_related('questions__answers')
         user = self.request.user
@@ -148,7 +192,7 @@ class SubmitQuizView(APIView):
         serializer.is_valid(raise_exception=True)
         
         try:
-            attempt = QuizAttempt.objects.get(
+            attempt = QuizAttempt.objects.select_related('quiz').get(
                 id=serializer.validated_data['attempt_id'],
                 user=request.user,
                 status=QuizAttempt.Status.IN_PROGRESS
@@ -172,43 +216,13 @@ class SubmitQuizView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Process responses
-        for response_data in serializer.validated_data['responses']:
-            try:
-                question = Question.objects.get(
-                    id=response_data['question_id'],
-                    quiz=attempt.quiz
-                )
-            except Question.DoesNotExist:
-                continue
-            
-            quiz_response, created = QuizResponse.objects.get_or_create(
-                attempt=attempt,
-                question=question
-            )
-            
-            # Set selected answers
-            if response_data.get('selected_answer_ids'):
-                quiz_response.selected_answers.set(
-                    Answer.objects.filter(
-                        id__in=response_data['selected_answer_ids'],
-                        question=question
-                    )
-                )
-            
-            # Set text response
-            if response_data.get('text_response'):
-                quiz_response.text_response = response_data['text_response']
-            
-            quiz_response.check_answer()
-            quiz_response.save()
+        # Grade every response in memory against the answer key, bulk-write the results
+        grade_submission(attempt, serializer.validated_data['responses'])
         
-        # Complete attempt
-        attempt.status = QuizAttempt.Status.COMPLETED
-        attempt.completed_at = timezone.now()
-        attempt.time_taken_seconds = int((attempt.completed_at - attempt.started_at).total_seconds())
-        attempt.calculate_score()
-        attempt.save()
+        prefetch_related_objects([attempt], Prefetch(
+            'responses',
+            queryset=QuizResponse.objects.select_related('question').prefetch_related('selected_answers')
+        ))
         
         return Response(QuizAttemptSerializer(attempt).data)
 
@@ -241,15 +255,19 @@ class QuizAttemptDetailView(generics.RetrieveAPIView):
 
 # Admin Views
 class AllQuizAttemptsView(generics.ListAPIView):
-    """List all quiz attempts (admin only)."""
+    """List all quiz attempts (admin only); ``?pagination=cursor`` for keyset pages."""
     
     serializer_class = QuizAttemptSerializer
+    pagination_class = PageNumberOrKeysetPagination
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
     filterset_fields = ['quiz', 'user', 'status', 'passed']
     search_fields = ['user__email', 'quiz__title']
     
     def get_queryset(self):
-        return QuizAttempt.objects.select_related('user', 'quiz').all()
+        return QuizAttempt.objects.select_related('user', 'quiz').prefetch_related(Prefetch(
+            'responses',
+            queryset=QuizResponse.objects.select_related('question').prefetch_related('selected_answers')
+        ))
 
 
 class QuizStatisticsView(APIView):
@@ -266,21 +284,50 @@ class QuizStatisticsView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        attempts = QuizAttempt.objects.filter(
+        totals = QuizAttempt.objects.filter(
             quiz=quiz,
             status=QuizAttempt.Status.COMPLETED
+        ).aggregate(
+            total=Count('id'),
+            passed=Count('id', filter=Q(passed=True)),
+            avg_score=Avg('score'),
+            avg_time=Avg('time_taken_seconds'),
         )
+        answer_key = get_answer_key(quiz.id)
         
         stats = {
             'quiz_id': quiz.id,
             'quiz_title': quiz.title,
-            'total_attempts': attempts.count(),
-            'average_score': attempts.aggregate(avg=Avg('score'))['avg'] or 0,
+            'total_questions': answer_key.total_questions,
+            'total_points': answer_key.total_points,
+            'total_attempts': totals['total'],
+            'average_score': totals['avg_score'] or 0,
             'pass_rate': (
-                attempts.filter(passed=True).count() / attempts.count() * 100
-                if attempts.count() > 0 else 0
+                totals['passed'] / totals['total'] * 100
+                if totals['total'] > 0 else 0
             ),
-            'average_time_seconds': attempts.aggregate(avg=Avg('time_taken_seconds'))['avg'] or 0,
+            'average_time_seconds': totals['avg_time'] or 0,
         }
         
         return Response(stats)
+
+
+class RegradeQuizView(APIView):
+    """Re-grade every completed attempt of a quiz in the background (admin only)."""
+    
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    
+    def post(self, request, quiz_id):
+        if not Quiz.objects.filter(id=quiz_id).exists():
+            return Response(
+                {'error': 'Quiz not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        # A changed answer key is new work even for the same quiz.
+        job = enqueue(
+            regrade_quiz_task, quiz_id,
+            key=job_key(request, 'regrade-quiz', quiz_id, answer_key_version(quiz_id)),
+            owner=request.user
+        )
+        return job_response(request, job)
@@ -0,0 +1,234 @@
+"""
+Realistic benchmark datasets built from the model factories.
+
+Rows are built with the factories and inserted with ``bulk_create`` so that
+the larger scales (thousands of users, millions of progress rows) load in
+minutes rather than hours. ``bulk_create`` bypasses model signals, so the
+denormalized course aggregates and user profiles are written explicitly.
+"""
+from dataclasses import dataclass, field
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from accounts.models import StudentProfile
+from courses.aggregates import refresh_module_aggregates, refresh_course_aggregates
+from courses.models import Category, Course, Module, Video, Resource, Enrollment
+from quizzes.models import Quiz, Question, Answer, QuizAttempt
+from progress.models import CourseProgress, VideoProgress, Certificate
+
+from . import factories
+
+BATCH_SIZE = 5000
+
+SCALES = {
+    'ci': dict(
+        students=25, courses=6, modules_per_course=3, videos_per_module=4,
+        resources_per_course=2, quizzes_per_course=2, questions_per_quiz=5,
+        answers_per_question=4, enrollments_per_student=3,
+    ),
+    'medium': dict(
+        students=1000, courses=100, modules_per_course=5, videos_per_module=6,
+        resources_per_course=3, quizzes_per_course=2, questions_per_quiz=20,
+        answers_per_question=4, enrollments_per_student=5,
+    ),
+    'large': dict(
+        students=5000, courses=300, modules_per_course=6, videos_per_module=10,
+        resources_per_course=4, quizzes_per_course=3, questions_per_quiz=50,
+        answers_per_question=4, enrollments_per_student=8,
+    ),
+}
+
+
+@dataclass
+class Dataset:
+    """Handles on the rows that endpoint cases address directly."""
+
+    scale: str
+    admin: object
+    student: object
+    category: Category
+    course: Course
+    module: Module
+    video: Video
+    incomplete_video: Video
+    resource: Resource
+    quiz: Quiz
+    question: Question
+    enrollment: Enrollment
+    attempt: QuizAttempt
+    certificate: Certificate
+    counts: dict = field(default_factory=dict)
+
+
+def _bulk(model, objs):
+    return model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+
+
+def build_dataset(scale='ci'):
+    """Populate the database at the given scale and return a Dataset."""
+    config = SCALES[scale]
+    now = timezone.now()
+
+    admin = factories.AdminFactory(email='bench-admin@example.com')
+
+    roots = [factories.CategoryFactory(order=i) for i in range(4)]
+    categories = roots + [
+        factories.CategoryFactory(parent=root, order=j)
+        for root in roots for j in range(2)
+    ]
+
+    # Hash once and share it; hashing per user dominates at larger scales.
+    password = make_password('password123')
+    students = factories.UserFactory.build_batch(config['students'])
+    for student in students:
+        student.password = password
+    students = _bulk(factories.UserFactory._meta.model, students)
+    _bulk(StudentProfile, [StudentProfile(user=s) for s in students])
+
+    courses = _bulk(Course, [
+        factories.CourseFactory.build(
+            category=categories[i % len(categories)],
+            instructor=admin,
+            is_featured=i % 5 == 0,
+            published_at=now,
+        )
+        for i in range(config['courses'])
+    ])
+
+    modules = _bulk(Module, [
+        factories.ModuleFactory.build(course=course, order=m)
+        for course in courses for m in range(config['modules_per_course'])
+    ])
+
+    videos = _bulk(Video, [
+        factories.VideoFactory.build(module=module, order=v)
+        for module in modules for v in range(config['videos_per_module'])
+    ])
+
+    resources = _bulk(Resource, [
+        factories.ResourceFactory.build(course=course, order=r)
+        for course in courses for r in range(config['resources_per_course'])
+    ])
+
+    quizzes = _bulk(Quiz, [
+        factories.QuizFactory.build(course=course, order=q)
+        for course in courses for q in range(config['quizzes_per_course'])
+    ])
+
+    questions = _bulk(Question, [
+        factories.QuestionFactory.build(quiz=quiz, order=q)
+        for quiz in quizzes for q in range(config['questions_per_quiz'])
+    ])
+
+    _bulk(Answer, [
+        factories.AnswerFactory.build(question=question, order=a, is_correct=a == 0)
+        for question in questions for a in range(config['answers_per_question'])
+    ])
+
+    videos_by_course = {}
+    for video in videos:
+        videos_by_course.setdefault(video.module.course_id, []).append(video)
+    quizzes_by_course = {}
+    for quiz in quizzes:
+        quizzes_by_course.setdefault(quiz.course_id, []).append(quiz)
+
+    # Each student enrolls in a rotating window of courses so every course
+    # gets a similar share of the student body.
+    pairs = [
+        (student, courses[(i + j * 7) % len(courses)])
+        for i, student in enumerate(students)
+        for j in range(min(config['enrollments_per_student'], len(courses)))
+    ]
+    pairs = list({(s.pk, c.pk): (s, c) for s, c in pairs}.values())
+
+    enrollments = _bulk(Enrollment, [
+        factories.EnrollmentFactory.build(user=student, course=course, assigned_by=admin)
+        for student, course in pairs
+    ])
+
+    _bulk(CourseProgress, [
+        factories.CourseProgressFactory.build(
+            user=student,
+            course=course,
+            videos_completed=len(videos_by_course[course.pk]) // 2,
+            total_videos=len(videos_by_course[course.pk]),
+            total_quizzes=len(quizzes_by_course.get(course.pk, [])),
+            structure_version=course.structure_version,
+        )
+        for student, course in pairs
+    ])
+
+    # The progress table dominates at scale; insert it in chunks.
+    chunk = []
+    for student, course in pairs:
+        course_videos = videos_by_course[course.pk]
+        half = len(course_videos) // 2
+        for index, video in enumerate(course_videos):
+            completed = index < half
+            chunk.append(VideoProgress(
+                user=student,
+                video=video,
+                course=course,
+                watched_seconds=600 if completed else 120,
+                total_seconds=600,
+                last_position_seconds=600 if completed else 120,
+                is_completed=completed,
+                completed_at=now if completed else None,
+                watch_count=1,
+            ))
+        if len(chunk) >= BATCH_SIZE:
+            _bulk(VideoProgress, chunk)
+            chunk = []
+    if chunk:
+        _bulk(VideoProgress, chunk)
+
+    attempts = _bulk(QuizAttempt, [
+        factories.QuizAttemptFactory.build(
+            user=student, quiz=quiz, course=course, completed_at=now
+        )
+        for student, course in pairs
+        for quiz in quizzes_by_course.get(course.pk, [])
+    ])
+
+    certificates = [
+        factories.CertificateFactory.build(user=student, course=course)
+        for student, course in pairs[::config['enrollments_per_student']]
+    ]
+    for certificate in certificates:
+        certificate.certificate_number = f'CERT-{certificate.user.pk:05d}{certificate.course.pk:04d}'
+    certificates = _bulk(Certificate, certificates)
+
+    refresh_module_aggregates()
+    refresh_course_aggregates()
+
+    student = students[0]
+    course = courses[0]
+    course.refresh_from_db()
+    module = modules[0]
+    quiz = quizzes[0]
+
+    return Dataset(
+        scale=scale,
+        admin=admin,
+        student=student,
+        category=categories[0],
+        course=course,
+        module=module,
+        video=videos[0],
+        incomplete_video=videos_by_course[course.pk][-1],
+        resource=resources[0],
+        quiz=quiz,
+        question=Question.objects.filter(quiz=quiz).first(),
+        enrollment=Enrollment.objects.get(user=student, course=course),
+        attempt=QuizAttempt.objects.filter(user=student, quiz=quiz).first(),
+        certificate=Certificate.objects.filter(user=student).first(),
+        counts={
+            'students': len(students),
+            'courses': len(courses),
+            'videos': len(videos),
+            'enrollments': len(enrollments),
+            'quiz_attempts': len(attempts),
+            'video_progress': VideoProgress.objects.count(),
+        },
+    )
@@ -0,0 +1,278 @@
+"""
+Every routed endpoint of the accounts, courses, quizzes and progress apps,
+plus background job polling, expressed as a request against a Dataset.
+
+Each case names the user it runs as (``'admin'``, ``'student'`` or ``None``
+for anonymous), the request to make and the status codes that count as a
+successful call. Query budgets are recorded separately in
+``query_budgets.json`` under the case name.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.urls import reverse
+
+
+@dataclass
+class EndpointCase:
+    name: str
+    method: str
+    url: Callable
+    user: Optional[str] = 'student'
+    data: Optional[Callable] = None
+    expected: tuple = (200,)
+    setup: Optional[Callable] = field(default=None, repr=False)
+    format: str = 'json'
+
+    def __str__(self):
+        return self.name
+
+
+def _url(name, **kwargs):
+    return lambda ds: reverse(name, kwargs={k: v(ds) for k, v in kwargs.items()})
+
+
+def _start_attempt(ds):
+    """Leave the dataset's student with an in-progress attempt to submit."""
+    from quizzes.models import QuizAttempt
+    ds.open_attempt = QuizAttempt.objects.create(
+        user=ds.student, quiz=ds.quiz, status=QuizAttempt.Status.IN_PROGRESS
+    )
+
+
+def _submit_payload(ds):
+    responses = []
+    for question in ds.quiz.questions.prefetch_related('answers'):
+        correct = [a.id for a in question.answers.all() if a.is_correct]
+        responses.append({'question_id': question.id, 'selected_answer_ids': correct})
+    return {'attempt_id': ds.open_attempt.id, 'responses': responses}
+
+
+def _unenrolled_students(ds):
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    return list(
+        User.objects.filter(role=User.Role.STUDENT)
+        .exclude(enrollments__course=ds.course)
+        .values_list('id', flat=True)
+    )
+
+
+def _enqueue_job(ds):
+    """Give the dataset's student a pending background job to poll."""
+    from lms_project.jobs import enqueue
+    from progress.tasks import issue_certificate_task
+    ds.job = enqueue(issue_certificate_task, ds.student.pk, ds.course.pk, owner=ds.student)
+
+
+def _roster_upload(ds):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    rows = '\n'.join(str(user_id) for user_id in _unenrolled_students(ds))
+    return {
+        'course_id': ds.course.pk,
+        'file': SimpleUploadedFile('roster.csv', f'user_id\n{rows}\n'.encode(), 'text/csv'),
+    }
+
+
+def _refresh_token(ds):
+    from rest_framework_simplejwt.tokens import RefreshToken
+    return {'refresh': str(RefreshToken.for_user(ds.student))}
+
+
+slug = lambda ds: ds.course.slug  # noqa: E731
+
+
+ENDPOINTS = [
+    # accounts
+    EndpointCase('accounts.register', 'post', _url('accounts:register'), user=None,
+                 data=lambda ds: {
+                     'email': 'new-student@example.com', 'password': 'longpassword1',
+                     'password_confirm': 'longpassword1', 'first_name': 'New', 'last_name': 'Student',
+                 }, expected=(201,)),
+    EndpointCase('accounts.login', 'post', _url('accounts:login'), user=None,
+                 data=lambda ds: {'email': ds.student.email, 'password': 'password123'}),
+    EndpointCase('accounts.token_refresh', 'post', _url('accounts:token_refresh'), user=None,
+                 data=_refresh_token),
+    EndpointCase('accounts.logout', 'post', _url('accounts:logout')),
+    EndpointCase('accounts.google_auth', 'post', _url('accounts:google_auth'), user=None,
+                 data=lambda ds: {'access_token': 'google-id-token'}),
+    EndpointCase('accounts.profile', 'get', _url('accounts:profile')),
+    EndpointCase('accounts.profile_update', 'patch', _url('accounts:profile'),
+                 data=lambda ds: {'bio': 'Updated bio'}),
+    EndpointCase('accounts.change_password', 'post', _url('accounts:change_password'),
+                 data=lambda ds: {
+                     'old_password': 'password123', 'new_password': 'newpassword123',
+                     'new_password_confirm': 'newpassword123',
+                 }),
+    EndpointCase('accounts.student_list', 'get', _url('accounts:student_list'), user='admin'),
+    EndpointCase('accounts.student_list_cursor', 'get',
+                 lambda ds: reverse('accounts:student_list') + '?pagination=cursor', user='admin'),
+    EndpointCase('accounts.student_detail', 'get',
+                 _url('accounts:student_detail', pk=lambda ds: ds.student.pk), user='admin'),
+    EndpointCase('accounts.user_detail', 'get',
+                 _url('accounts:user_detail', pk=lambda ds: ds.student.pk)),
+
+    # courses
+    EndpointCase('courses.category_list', 'get', _url('courses:category_list'), user=None),
+    EndpointCase('courses.category_create', 'post', _url('courses:category_list'), user='admin',
+                 data=lambda ds: {'name': 'New Category', 'slug': 'new-category'}, expected=(201,)),
+    EndpointCase('courses.category_detail', 'get',
+                 _url('courses:category_detail', slug=lambda ds: ds.category.slug), user=None),
+    EndpointCase('courses.course_list', 'get', _url('courses:course_list'), user=None),
+    EndpointCase('courses.course_list_admin', 'get', _url('courses:course_list'), user='admin'),
+    EndpointCase('courses.course_list_category_tree', 'get',
+                 lambda ds: reverse('courses:course_list') + f'?category_tree={ds.category.slug}',
+                 user=None),
+    EndpointCase('courses.course_create', 'post', _url('courses:course_list'), user='admin',
+                 data=lambda ds: {
+                     'title': 'New Course', 'slug': 'new-course', 'description': 'A new course',
+                 }, expected=(201,)),
+    EndpointCase('courses.featured', 'get', _url('courses:featured_courses'), user=None),
+    EndpointCase('courses.course_autocomplete', 'get',
+                 lambda ds: reverse('courses:course_autocomplete') + '?q=' + ds.course.title[:4],
+                 user=None),
+    EndpointCase('courses.course_search', 'get',
+                 lambda ds: reverse('courses:course_list') + '?search=' + ds.course.title.split()[0],
+                 user=None),
+    EndpointCase('courses.course_detail', 'get', _url('courses:course_detail', slug=slug)),
+    EndpointCase('courses.course_update', 'patch', _url('courses:course_detail', slug=slug),
+                 user='admin', data=lambda ds: {'short_description': 'Updated'}),
+    EndpointCase('courses.course_delete', 'delete', _url('courses:course_detail', slug=slug),
+                 user='admin', expected=(204,)),
+    EndpointCase('courses.module_list', 'get', _url('courses:module_list', course_slug=slug)),
+    EndpointCase('courses.module_create', 'post', _url('courses:module_list', course_slug=slug),
+                 user='admin', data=lambda ds: {
+                     'course': ds.course.pk, 'title': 'New Module', 'order': 99,
+                 }, expected=(201,)),
+    EndpointCase('courses.module_detail', 'get',
+                 _url('courses:module_detail', pk=lambda ds: ds.module.pk)),
+    EndpointCase('courses.video_list', 'get',
+                 _url('courses:video_list', module_id=lambda ds: ds.module.pk)),
+    EndpointCase('courses.video_create', 'post',
+                 _url('courses:video_list', module_id=lambda ds: ds.module.pk), user='admin',
+                 data=lambda ds: {
+                     'module': ds.module.pk, 'title': 'New Video', 'order': 99,
+                     'google_drive_file_id': 'new-file',
+                     'google_drive_url': 'https://drive.google.com/file/d/new-file/view',
+                     'duration_minutes': 12,
+                 }, expected=(201,)),
+    EndpointCase('courses.video_detail', 'get',
+                 _url('courses:video_detail', pk=lambda ds: ds.video.pk)),
+    EndpointCase('courses.resource_list', 'get', _url('courses:resource_list', course_slug=slug)),
+    EndpointCase('courses.resource_detail', 'get',
+                 _url('courses:resource_detail', pk=lambda ds: ds.resource.pk)),
+    EndpointCase('courses.enrollment_list', 'get', _url('courses:enrollment_list')),
+    EndpointCase('courses.enrollment_list_admin', 'get', _url('courses:enrollment_list'),
+                 user='admin'),
+    EndpointCase('courses.enrollment_list_cursor', 'get',
+                 lambda ds: reverse('courses:enrollment_list') + '?pagination=cursor', user='admin'),
+    EndpointCase('courses.enrollment_create', 'post', _url('courses:enrollment_create'),
+                 user='admin', data=lambda ds: {
+                     'user': _unenrolled_students(ds)[0], 'course': ds.course.pk,
+                 }, expected=(201,)),
+    EndpointCase('courses.enrollment_detail', 'get',
+                 _url('courses:enrollment_detail', pk=lambda ds: ds.enrollment.pk), user='admin'),
+    EndpointCase('courses.bulk_enroll', 'post', _url('courses:bulk_enroll'), user='admin',
+                 data=lambda ds: {'course_id': ds.course.pk, 'user_ids': _unenrolled_students(ds)}),
+    EndpointCase('courses.bulk_enroll_upload', 'post', _url('courses:bulk_enroll_upload'),
+                 user='admin', data=_roster_upload, format='multipart'),
+    EndpointCase('courses.bulk_enroll_async', 'post',
+                 lambda ds: reverse('courses:bulk_enroll') + '?async=1', user='admin',
+                 data=lambda ds: {'course_id': ds.course.pk, 'user_ids': _unenrolled_students(ds)},
+                 expected=(202,)),
+    EndpointCase('courses.mark_complete', 'post',
+                 _url('courses:mark_complete', enrollment_id=lambda ds: ds.enrollment.pk),
+                 user='admin'),
+    EndpointCase('courses.self_enroll', 'post', _url('courses:self_enroll', course_slug=slug),
+                 expected=(200, 201)),
+    EndpointCase('courses.my_courses', 'get', _url('courses:my_courses')),
+
+    # quizzes
+    EndpointCase('quizzes.quiz_list', 'get', _url('quizzes:quiz_list')),
+    EndpointCase('quizzes.quiz_list_admin', 'get', _url('quizzes:quiz_list'), user='admin'),
+    EndpointCase('quizzes.quiz_create', 'post', _url('quizzes:quiz_list'), user='admin',
+                 data=lambda ds: {'title': 'New Quiz', 'course': ds.course.pk}, expected=(201,)),
+    EndpointCase('quizzes.quiz_detail', 'get', _url('quizzes:quiz_detail', pk=lambda ds: ds.quiz.pk)),
+    EndpointCase('quizzes.quiz_detail_admin', 'get',
+                 _url('quizzes:quiz_detail', pk=lambda ds: ds.quiz.pk), user='admin'),
+    EndpointCase('quizzes.question_list', 'get',
+                 _url('quizzes:question_list', quiz_id=lambda ds: ds.quiz.pk), user='admin'),
+    EndpointCase('quizzes.question_create', 'post',
+                 _url('quizzes:question_list', quiz_id=lambda ds: ds.quiz.pk), user='admin',
+                 data=lambda ds: {
+                     'quiz': ds.quiz.pk, 'question_text': 'New question?', 'order': 99,
+                     'answers': [
+                         {'answer_text': 'Yes', 'is_correct': True, 'order': 0},
+                         {'answer_text': 'No', 'is_correct': False, 'order': 1},
+                     ],
+                 }, expected=(201,)),
+    EndpointCase('quizzes.question_detail', 'get',
+                 _url('quizzes:question_detail', pk=lambda ds: ds.question.pk), user='admin'),
+    EndpointCase('quizzes.start_quiz', 'post', _url('quizzes:start_quiz'),
+                 data=lambda ds: {'quiz_id': ds.quiz.pk}, expected=(200, 201)),
+    EndpointCase('quizzes.submit_quiz', 'post', _url('quizzes:submit_quiz'),
+                 data=_submit_payload, setup=_start_attempt),
+    EndpointCase('quizzes.my_attempts', 'get', _url('quizzes:my_attempts')),
+    EndpointCase('quizzes.attempt_detail', 'get',
+                 _url('quizzes:attempt_detail', pk=lambda ds: ds.attempt.pk)),
+    EndpointCase('quizzes.all_attempts', 'get', _url('quizzes:all_attempts'), user='admin'),
+    EndpointCase('quizzes.all_attempts_cursor', 'get',
+                 lambda ds: reverse('quizzes:all_attempts') + '?pagination=cursor', user='admin'),
+    EndpointCase('quizzes.statistics', 'get',
+                 _url('quizzes:quiz_statistics', quiz_id=lambda ds: ds.quiz.pk), user='admin'),
+    EndpointCase('quizzes.regrade_quiz', 'post',
+                 _url('quizzes:regrade_quiz', quiz_id=lambda ds: ds.quiz.pk), user='admin',
+                 expected=(202,)),
+
+    # progress
+    EndpointCase('progress.my_progress', 'get', _url('progress:my_progress')),
+    EndpointCase('progress.course_progress', 'get',
+                 _url('progress:course_progress', course_slug=slug)),
+    EndpointCase('progress.video_progress_list', 'get',
+                 _url('progress:video_progress_list', course_slug=slug)),
+    EndpointCase('progress.update_video_progress', 'post', _url('progress:update_video_progress'),
+                 data=lambda ds: {
+                     'video_id': ds.incomplete_video.pk, 'watched_seconds': 600,
+                     'total_seconds': 600, 'last_position_seconds': 600,
+                 }),
+    EndpointCase('progress.my_certificates', 'get', _url('progress:my_certificates')),
+    EndpointCase('progress.certificate_detail', 'get',
+                 _url('progress:certificate_detail',
+                      certificate_number=lambda ds: ds.certificate.certificate_number), user=None),
+    EndpointCase('progress.issue_certificate', 'post',
+                 _url('progress:issue_certificate', course_slug=slug), expected=(200, 201, 400)),
+    EndpointCase('progress.student_report', 'get', _url('progress:student_progress_report'),
+                 user='admin'),
+    EndpointCase('progress.student_report_page', 'get',
+                 lambda ds: reverse('progress:student_progress_report') + '?page=1', user='admin'),
+    EndpointCase('progress.student_report_csv', 'get',
+                 lambda ds: reverse('progress:student_progress_report') + '?export=csv',
+                 user='admin'),
+    EndpointCase('progress.course_report', 'get',
+                 _url('progress:course_progress_report', course_slug=slug), user='admin'),
+
+    # background jobs
+    EndpointCase('jobs.job_status', 'get', lambda ds: reverse('job_status', args=[ds.job['id']]),
+                 setup=_enqueue_job),
+]
+
+
+def prepare(case, client, ds):
+    """Run the case's setup and authenticate the client; return (url, data)."""
+    if case.setup:
+        case.setup(ds)
+    # Authenticate as a fresh copy, since views may mutate request.user.
+    users = {'admin': ds.admin, 'student': ds.student}
+    user = users.get(case.user)
+    if user is not None:
+        user = type(user).objects.get(pk=user.pk)
+    client.force_authenticate(user=user)
+    return case.url(ds), case.data(ds) if case.data else None
+
+
+def perform(case, client, url, data):
+    response = getattr(client, case.method)(url, data, format=case.format)
+    if response.streaming:
+        # Queries run while the body streams, so drain it inside the caller's capture.
+        response.streamed_content = b''.join(response.streaming_content)
+    return response
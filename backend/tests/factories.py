@@ -0,0 +1,164 @@
+"""
+Model factories for tests and benchmark datasets.
+"""
+import factory
+from django.contrib.auth import get_user_model
+from django.utils.text import slugify
+
+from courses.models import Category, Course, Module, Video, Resource, Enrollment
+from quizzes.models import Quiz, Question, Answer, QuizAttempt
+from progress.models import CourseProgress, VideoProgress, Certificate
+
+User = get_user_model()
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+
+    email = factory.Sequence(lambda n: f'student{n}@example.com')
+    first_name = factory.Faker('first_name')
+    last_name = factory.Faker('last_name')
+    role = User.Role.STUDENT
+    password = factory.django.Password('password123')
+
+
+class AdminFactory(UserFactory):
+    email = factory.Sequence(lambda n: f'admin{n}@example.com')
+    role = User.Role.ADMIN
+    is_staff = True
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    name = factory.Sequence(lambda n: f'Category {n}')
+    slug = factory.LazyAttribute(lambda o: slugify(o.name))
+    description = factory.Faker('sentence')
+
+
+class CourseFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Course
+
+    title = factory.Sequence(lambda n: f'Course {n}')
+    slug = factory.LazyAttribute(lambda o: slugify(o.title))
+    description = factory.Faker('paragraph')
+    short_description = factory.Faker('sentence')
+    category = factory.SubFactory(CategoryFactory)
+    instructor = factory.SubFactory(AdminFactory)
+    status = Course.Status.PUBLISHED
+
+
+class ModuleFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Module
+
+    course = factory.SubFactory(CourseFactory)
+    title = factory.Sequence(lambda n: f'Module {n}')
+    order = factory.Sequence(lambda n: n)
+
+
+class VideoFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Video
+
+    module = factory.SubFactory(ModuleFactory)
+    title = factory.Sequence(lambda n: f'Video {n}')
+    google_drive_file_id = factory.Sequence(lambda n: f'drive-file-{n}')
+    google_drive_url = factory.LazyAttribute(
+        lambda o: f'https://drive.google.com/file/d/{o.google_drive_file_id}/view'
+    )
+    duration_minutes = factory.Faker('random_int', min=1, max=30)
+    order = factory.Sequence(lambda n: n)
+
+
+class ResourceFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Resource
+
+    course = factory.SubFactory(CourseFactory)
+    title = factory.Sequence(lambda n: f'Resource {n}')
+    resource_type = Resource.ResourceType.PDF
+    google_drive_file_id = factory.Sequence(lambda n: f'drive-resource-{n}')
+    google_drive_url = factory.LazyAttribute(
+        lambda o: f'https://drive.google.com/file/d/{o.google_drive_file_id}/view'
+    )
+    file_size_bytes = 1024
+
+
+class EnrollmentFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Enrollment
+
+    user = factory.SubFactory(UserFactory)
+    course = factory.SubFactory(CourseFactory)
+
+
+class QuizFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Quiz
+
+    title = factory.Sequence(lambda n: f'Quiz {n}')
+    course = factory.SubFactory(CourseFactory)
+    is_required = True
+
+
+class QuestionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Question
+
+    quiz = factory.SubFactory(QuizFactory)
+    question_text = factory.Faker('sentence')
+    question_type = Question.QuestionType.MULTIPLE_CHOICE
+    points = 1
+    order = factory.Sequence(lambda n: n)
+
+
+class AnswerFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Answer
+
+    question = factory.SubFactory(QuestionFactory)
+    answer_text = factory.Faker('word')
+    is_correct = False
+    order = factory.Sequence(lambda n: n)
+
+
+class QuizAttemptFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = QuizAttempt
+
+    user = factory.SubFactory(UserFactory)
+    quiz = factory.SubFactory(QuizFactory)
+    status = QuizAttempt.Status.COMPLETED
+    score = 80
+    passed = True
+
+
+class CourseProgressFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CourseProgress
+
+    user = factory.SubFactory(UserFactory)
+    course = factory.SubFactory(CourseFactory)
+
+
+class VideoProgressFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = VideoProgress
+
+    user = factory.SubFactory(UserFactory)
+    video = factory.SubFactory(VideoFactory)
+    watched_seconds = 600
+    total_seconds = 600
+    is_completed = True
+
+
+class CertificateFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Certificate
+
+    user = factory.SubFactory(UserFactory)
+    course = factory.SubFactory(CourseFactory)
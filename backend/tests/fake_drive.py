@@ -0,0 +1,227 @@
+"""
+An in-memory Google Drive for tests.
+
+``FakeDrive`` stands in for the pooled ``httplib2.Http`` (see the
+``fake_drive`` fixture), so requests go through the real googleapiclient
+resource and ``AuthorizedHttp`` and are answered from ``FakeDrive.files``.
+It understands the ``q`` expressions GoogleDriveService builds, ``pageSize``
+and ``pageToken``, and answers batch requests part by part. It records every
+request it serves; a batch is one request. Adding, updating,
+trashing and deleting files is logged to a change feed served from
+``changes``, whose page tokens are positions in that log. A file unshared
+from an access token is hidden from requests made with it, and shows as
+removed in its feed. Token refreshes get a new access token after
+``token_delay`` seconds.
+"""
+import email.parser
+import itertools
+import json
+import re
+import time
+from http.client import responses
+from urllib.parse import parse_qs, urlsplit
+
+import httplib2
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+def _split_top_level(expression, separator):
+    """Split ``expression`` on ``separator`` outside quotes and parentheses."""
+    parts, depth, quoted, start = [], 0, False, 0
+    i = 0
+    while i < len(expression):
+        char = expression[i]
+        if char == "'" and (i == 0 or expression[i - 1] != '\\'):
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and expression.startswith(separator, i):
+            parts.append(expression[start:i])
+            i += len(separator)
+            start = i
+            continue
+        i += 1
+    parts.append(expression[start:])
+    return [part.strip() for part in parts]
+
+
+def _literal(raw):
+    raw = raw.strip()
+    if raw in ('true', 'false'):
+        return raw == 'true'
+    return raw[1:-1].replace("\\'", "'")
+
+
+class FakeDrive:
+    """Files keyed by id, each a Drive API file resource dict."""
+
+    timeout = None
+    token_delay = 0
+
+    def __init__(self):
+        self.files = {}
+        self.unshared = {}
+        self.changes = []
+        self.requests = []
+        self._ids = itertools.count(1)
+
+    def add_file(self, name, mime_type='video/mp4', parents=(), **fields):
+        file_id = fields.pop('id', None) or f'fake-{next(self._ids)}'
+        self.files[file_id] = {
+            'id': file_id,
+            'name': name,
+            'mimeType': mime_type,
+            'parents': list(parents),
+            'trashed': False,
+            'webViewLink': f'https://drive.google.com/file/d/{file_id}/view',
+            'createdTime': '2024-01-01T00:00:00.000Z',
+            'modifiedTime': '2024-01-01T00:00:00.000Z',
+            **fields,
+        }
+        self._changed(file_id)
+        return self.files[file_id]
+
+    def add_folder(self, name, parents=(), **fields):
+        return self.add_file(name, FOLDER_MIME_TYPE, parents, **fields)
+
+    def update_file(self, file_id, **fields):
+        self.files[file_id].update(fields)
+        self._changed(file_id)
+
+    def trash_file(self, file_id):
+        self.update_file(file_id, trashed=True)
+
+    def delete_file(self, file_id):
+        del self.files[file_id]
+        self._changed(file_id)
+
+    def unshare_file(self, file_id, token):
+        self.unshared.setdefault(file_id, set()).add(token)
+        self._changed(file_id)
+
+    def _visible(self, file_id, token):
+        return file_id in self.files and token not in self.unshared.get(file_id, ())
+
+    def _changed(self, file_id):
+        self.changes.append(file_id)
+
+    # Query evaluation
+
+    def _matches(self, file, expression):
+        return all(self._term(file, term) for term in _split_top_level(expression, ' and '))
+
+    def _term(self, file, term):
+        if term.startswith('(') and term.endswith(')'):
+            return any(self._term(file, part) for part in _split_top_level(term[1:-1], ' or '))
+        match = re.fullmatch(r"'(.*)' in parents", term)
+        if match:
+            return match.group(1) in file['parents']
+        field, operator, raw = re.fullmatch(r"(\w+) (=|!=|contains) (.+)", term).groups()
+        value, actual = _literal(raw), file.get(field)
+        if operator == 'contains':
+            return str(value).lower() in str(actual).lower()
+        return (actual == value) == (operator == '=')
+
+    # HTTP
+
+    def _respond(self, status, payload):
+        return httplib2.Response({'status': str(status)}), json.dumps(payload).encode()
+
+    def _list(self, params, token):
+        expression = params.get('q', 'trashed = false')
+        matches = sorted(
+            (f for f in self.files.values()
+             if self._visible(f['id'], token) and self._matches(f, expression)),
+            key=lambda f: (f['name'], f['id'])
+        )
+        start = int(params.get('pageToken') or 0)
+        size = int(params.get('pageSize') or 100)
+        payload = {'files': matches[start:start + size]}
+        if start + size < len(matches):
+            payload['nextPageToken'] = str(start + size)
+        return self._respond(200, payload)
+
+    def _list_changes(self, params, token):
+        start = int(params['pageToken'])
+        size = int(params.get('pageSize') or 100)
+        changes = []
+        for file_id in self.changes[start:start + size]:
+            if self._visible(file_id, token):
+                changes.append({'fileId': file_id, 'removed': False, 'file': dict(self.files[file_id])})
+            else:
+                changes.append({'fileId': file_id, 'removed': True})
+        payload = {'changes': changes}
+        if start + size < len(self.changes):
+            payload['nextPageToken'] = str(start + size)
+        else:
+            payload['newStartPageToken'] = str(len(self.changes))
+        return self._respond(200, payload)
+
+    def _get(self, file_id, token):
+        if not self._visible(file_id, token):
+            return self._respond(404, {'error': {'code': 404, 'message': f'File not found: {file_id}.'}})
+        return self._respond(200, self.files[file_id])
+
+    def _batch(self, body, headers):
+        # googleapiclient sends one application/http part per call.
+        message = email.parser.Parser().parsestr(
+            f'Content-Type: {headers["content-type"]}\r\n\r\n{body}'
+        )
+        boundary = 'fake_batch_boundary'
+        parts = []
+        for part in message.get_payload():
+            request_line = part.get_payload().splitlines()[0]
+            method, uri, _ = request_line.split(' ')
+            response, content = self._dispatch(method, uri, headers)
+            parts.append(
+                f'--{boundary}\r\n'
+                'Content-Type: application/http\r\n'
+                f'Content-ID: <response-{part["Content-ID"][1:-1]}>\r\n\r\n'
+                f'HTTP/1.1 {response.status} {responses[response.status]}\r\n'
+                'Content-Type: application/json; charset=UTF-8\r\n\r\n'
+                f'{content.decode()}\r\n'
+            )
+        content = ''.join(parts) + f'--{boundary}--'
+        return httplib2.Response({
+            'status': '200', 'content-type': f'multipart/mixed; boundary={boundary}'
+        }), content.encode()
+
+    def _dispatch(self, method, uri, headers):
+        token = (headers or {}).get('authorization', '').removeprefix('Bearer ')
+        url = urlsplit(uri)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path.removeprefix('/drive/v3/')
+        if path == 'changes/startPageToken':
+            return self._respond(200, {'startPageToken': str(len(self.changes))})
+        if path == 'changes':
+            return self._list_changes(params, token)
+        if path == 'files':
+            return self._list(params, token)
+        if path.startswith('files/'):
+            return self._get(path[len('files/'):], token)
+        return self._respond(404, {'error': {'code': 404, 'message': 'Not found.'}})
+
+    def _refresh_token(self):
+        time.sleep(self.token_delay)
+        refreshes = sum(1 for _, path, _, _ in self.requests if path == 'token')
+        return self._respond(200, {
+            'access_token': f'refreshed-token-{refreshes}',
+            'expires_in': 3600,
+            'token_type': 'Bearer',
+        })
+
+    def request(self, uri, method='GET', body=None, headers=None, redirections=5,
+                connection_type=None):
+        url = urlsplit(uri)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path.removeprefix('/drive/v3/').removeprefix('/')
+        self.requests.append((method, path, params, headers or {}))
+
+        if url.netloc == 'oauth2.googleapis.com' and path == 'token':
+            return self._refresh_token()
+        if path == 'batch/drive/v3':
+            return self._batch(body, headers)
+        return self._dispatch(method, uri, headers)
@@ -0,0 +1,82 @@
+"""
+Tests for cached answer-key snapshots.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from quizzes.answer_keys import get_answer_key
+from quizzes.serializers import QuestionCreateSerializer
+from . import factories
+
+
+@pytest.fixture
+def quiz():
+    quiz = factories.QuizFactory()
+    question = factories.QuestionFactory(quiz=quiz, points=2)
+    factories.AnswerFactory(question=question, is_correct=True, answer_text=' Yes ')
+    factories.AnswerFactory(question=question, answer_text='No')
+    return quiz
+
+
+@pytest.mark.django_db
+def test_snapshot_is_served_from_cache(quiz):
+    first = get_answer_key(quiz.id)
+
+    with CaptureQueriesContext(connection) as queries:
+        second = get_answer_key(quiz.id)
+
+    assert len(queries) == 0
+    assert second == first
+    assert first.total_points == 2
+    assert first.total_questions == 1
+    (question,) = first.questions.values()
+    assert question.first_correct_text == 'yes'
+
+
+@pytest.mark.django_db
+def test_question_update_invalidates_snapshot(quiz, django_capture_on_commit_callbacks):
+    question = quiz.questions.get()
+    assert get_answer_key(quiz.id).total_points == 2
+
+    serializer = QuestionCreateSerializer(question, data={
+        'quiz': quiz.id, 'question_text': 'Changed?', 'question_type': 'multiple_choice',
+        'points': 5, 'order': 0,
+        'answers': [{'answer_text': 'Maybe', 'is_correct': True, 'order': 0}],
+    })
+    assert serializer.is_valid(), serializer.errors
+    with django_capture_on_commit_callbacks(execute=True):
+        serializer.save()
+
+    answer_key = get_answer_key(quiz.id)
+    assert answer_key.total_points == 5
+    (question_key,) = answer_key.questions.values()
+    assert question_key.first_correct_text == 'maybe'
+
+
+@pytest.mark.django_db
+def test_moving_a_question_invalidates_both_quizzes(quiz, django_capture_on_commit_callbacks):
+    other = factories.QuizFactory()
+    assert get_answer_key(quiz.id).total_questions == 1
+    assert get_answer_key(other.id).total_questions == 0
+
+    question = quiz.questions.get()
+    with django_capture_on_commit_callbacks(execute=True):
+        question.quiz = other
+        question.save()
+
+    assert get_answer_key(quiz.id).total_questions == 0
+    assert get_answer_key(other.id).total_questions == 1
+
+
+@pytest.mark.django_db
+def test_answer_change_invalidates_snapshot(quiz, django_capture_on_commit_callbacks):
+    get_answer_key(quiz.id)
+    answer = quiz.questions.get().answers.get(answer_text='No')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        answer.is_correct = True
+        answer.save()
+
+    (question_key,) = get_answer_key(quiz.id).questions.values()
+    assert answer.id in question_key.correct_answer_ids
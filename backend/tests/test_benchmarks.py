@@ -0,0 +1,71 @@
+"""
+Latency and memory benchmarks for every routed endpoint.
+
+Skipped unless ``--benchmark`` is given. Pair with ``--dataset-scale`` to run
+against the larger generated datasets, e.g.::
+
+    pytest tests/test_benchmarks.py --benchmark --dataset-scale=large \
+        --benchmark-report=bench.json
+"""
+import statistics
+import time
+import tracemalloc
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .endpoints import ENDPOINTS, prepare, perform
+
+
+@pytest.fixture(autouse=True)
+def fake_google_id_token(monkeypatch):
+    monkeypatch.setattr(
+        'accounts.views.id_token.verify_oauth2_token',
+        lambda token, request, audience: {'email': 'google-user@example.com'}
+    )
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('case', ENDPOINTS, ids=str)
+def test_benchmark(case, dataset, api_client, request):
+    iterations = request.config.getoption('--benchmark-iterations')
+
+    def run(traced=False):
+        # Every run sees the same starting state, so write endpoints
+        # (submit, enroll, delete) can be repeated.
+        with transaction.atomic():
+            url, data = prepare(case, api_client, dataset)
+            if traced:
+                tracemalloc.start()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = perform(case, api_client, url, data)
+                elapsed = (time.perf_counter() - started) * 1000
+            peak = 0
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            transaction.set_rollback(True)
+
+        assert response.status_code in case.expected, response.content[:500]
+        return elapsed, len(queries), peak
+
+    # Memory tracing slows allocation-heavy code, so it gets its own run.
+    _, query_count, peak = run(traced=True)
+    timings = [run()[0] for _ in range(iterations)]
+
+    request.config.benchmark_results[case.name] = {
+        'queries': query_count,
+        'p50_ms': statistics.median(timings),
+        'p99_ms': _percentile(timings, 99),
+        'peak_memory_kib': peak / 1024,
+        'iterations': iterations,
+        'dataset': dataset.counts,
+    }
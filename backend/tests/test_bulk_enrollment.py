@@ -0,0 +1,136 @@
+"""
+Tests for set-based bulk enrollment and roster uploads.
+"""
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from courses.enrollments import enroll_users, iter_json_roster
+from courses.models import Enrollment
+from . import factories
+
+
+@pytest.fixture
+def admin_client(api_client):
+    api_client.force_authenticate(factories.AdminFactory())
+    return api_client
+
+
+@pytest.mark.django_db
+def test_enroll_users_reports_created_existing_and_missing(django_assert_num_queries):
+    course = factories.CourseFactory()
+    enrolled = factories.EnrollmentFactory(course=course).user
+    students = factories.UserFactory.create_batch(4)
+
+    ids = [s.id for s in students] + [enrolled.id, 999999]
+    # A savepoint around two chunks of resolve/existing/insert/count and one
+    # counter refresh.
+    with django_assert_num_queries(11):
+        summary = enroll_users(course, ids, batch_size=3)
+
+    assert summary == {'created': 4, 'existing': 1, 'not_found': 1}
+    course.refresh_from_db()
+    assert course.enrolled_students_count == 5
+
+
+@pytest.mark.django_db
+def test_a_student_listed_by_id_and_email_is_not_missing():
+    course = factories.CourseFactory()
+    student = factories.UserFactory()
+
+    summary = enroll_users(course, [student.id, student.email, 'nobody@example.com', 999999])
+
+    assert summary == {'created': 1, 'existing': 0, 'not_found': 2}
+
+
+@pytest.mark.django_db
+def test_a_malformed_roster_enrolls_nobody(django_capture_on_commit_callbacks):
+    course = factories.CourseFactory()
+    students = factories.UserFactory.create_batch(3)
+
+    def roster():
+        yield from (s.id for s in students)
+        raise ValueError('Malformed roster.')
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        with pytest.raises(ValueError):
+            enroll_users(course, roster(), batch_size=2)
+
+    assert not Enrollment.objects.filter(course=course).exists()
+    assert not callbacks
+
+
+@pytest.mark.django_db
+def test_bulk_enroll_returns_a_compact_summary(admin_client):
+    course = factories.CourseFactory()
+    students = factories.UserFactory.create_batch(2)
+
+    response = admin_client.post(reverse('courses:bulk_enroll'), {
+        'course_id': course.id, 'user_ids': [s.id for s in students] * 2,
+    }, format='json')
+
+    assert response.status_code == 200
+    assert response.data == {'course_id': course.id, 'created': 2, 'existing': 0, 'not_found': 0}
+
+
+@pytest.mark.django_db
+def test_csv_roster_upload_accepts_ids_and_emails(admin_client):
+    course = factories.CourseFactory()
+    by_id, by_email = factories.UserFactory.create_batch(2)
+    roster = f'user_id,email\n{by_id.id},\n,{by_email.email}\n,nobody@example.com\n'
+
+    response = admin_client.post(reverse('courses:bulk_enroll_upload'), {
+        'course_id': course.id,
+        'file': SimpleUploadedFile('cohort.csv', roster.encode(), 'text/csv'),
+    }, format='multipart')
+
+    assert response.status_code == 200
+    assert response.data['created'] == 2
+    assert response.data['not_found'] == 1
+    assert set(course.enrollments.values_list('user_id', flat=True)) == {by_id.id, by_email.id}
+
+
+@pytest.mark.django_db
+def test_malformed_roster_is_rejected(admin_client):
+    course = factories.CourseFactory()
+    response = admin_client.post(reverse('courses:bulk_enroll_upload'), {
+        'course_id': course.id, 'format': 'json',
+        'file': SimpleUploadedFile('cohort.txt', b'{"user_id": 1}'),
+    }, format='multipart')
+
+    assert response.status_code == 400
+    assert not Enrollment.objects.filter(course=course).exists()
+
+
+def test_json_roster_is_parsed_incrementally():
+    roster = b'[12345, "a@example.com" , {"user_id": 7}, {"email": "b@example.com"}, true]'
+    # A tiny read size splits numbers and strings across reads.
+    items = list(iter_json_roster(io.BytesIO(roster), read_size=3))
+    assert items == [12345, 'a@example.com', 7, 'b@example.com']
+
+    with pytest.raises(ValueError):
+        list(iter_json_roster(io.BytesIO(b'[1, 2'), read_size=3))
+
+
+@pytest.mark.django_db
+def test_async_roster_upload_is_enrolled_by_a_job(
+    admin_client, settings, tmp_path, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = tmp_path
+    course = factories.CourseFactory()
+    students = factories.UserFactory.create_batch(3)
+    roster = '[' + ','.join(str(s.id) for s in students) + ']'
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_client.post(reverse('courses:bulk_enroll_upload') + '?async=1', {
+            'course_id': course.id,
+            'file': SimpleUploadedFile('cohort.json', roster.encode(), 'application/json'),
+        }, format='multipart')
+
+    assert response.status_code == 202
+    job = admin_client.get(response['Location']).data
+    assert job['result']['created'] == 3
+    # The stored roster is removed once enrolled.
+    assert not any((tmp_path / 'rosters').iterdir())
@@ -0,0 +1,89 @@
+"""
+Tests for materialized category paths and the category_tree course filter.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from courses.models import Category, Course
+from . import factories
+
+URL = reverse('courses:course_list')
+
+
+@pytest.fixture
+def taxonomy():
+    root = factories.CategoryFactory(name='Root')
+    child = factories.CategoryFactory(name='Child', parent=root)
+    grandchild = factories.CategoryFactory(name='Grandchild', parent=child)
+    other = factories.CategoryFactory(name='Other')
+    return root, child, grandchild, other
+
+
+def _path(category):
+    category.refresh_from_db()
+    return category.path
+
+
+@pytest.mark.django_db
+def test_paths_follow_the_hierarchy(taxonomy):
+    root, child, grandchild, _ = taxonomy
+    assert root.path == f'{root.pk}/'
+    assert child.path == f'{root.pk}/{child.pk}/'
+    assert _path(grandchild) == f'{root.pk}/{child.pk}/{grandchild.pk}/'
+
+
+@pytest.mark.django_db
+def test_moving_a_category_rewrites_its_subtree(taxonomy):
+    root, child, grandchild, other = taxonomy
+    child.parent = other
+    child.save()
+
+    assert _path(child) == f'{other.pk}/{child.pk}/'
+    assert _path(grandchild) == f'{other.pk}/{child.pk}/{grandchild.pk}/'
+    assert _path(root) == f'{root.pk}/'
+
+
+@pytest.mark.django_db
+def test_category_cannot_move_below_itself(api_client, taxonomy):
+    root, _, grandchild, _ = taxonomy
+    admin = factories.AdminFactory()
+    api_client.force_authenticate(admin)
+
+    response = api_client.patch(
+        reverse('courses:category_detail', kwargs={'slug': root.slug}),
+        {'parent': grandchild.pk}, format='json'
+    )
+
+    assert response.status_code == 400
+    assert _path(root) == f'{root.pk}/'
+
+
+@pytest.mark.django_db
+def test_rebuild_command_repairs_paths(taxonomy):
+    root, child, grandchild, _ = taxonomy
+    Category.objects.update(path='')
+
+    call_command('rebuild_category_paths', stdout=StringIO())
+
+    assert _path(grandchild) == f'{root.pk}/{child.pk}/{grandchild.pk}/'
+
+
+@pytest.mark.django_db
+def test_category_tree_filter_includes_descendants(api_client, taxonomy):
+    root, child, grandchild, other = taxonomy
+    published = Course.Status.PUBLISHED
+    at_root = factories.CourseFactory(category=root, status=published)
+    nested = factories.CourseFactory(category=grandchild, status=published)
+    factories.CourseFactory(category=other, status=published)
+
+    response = api_client.get(URL, {'category_tree': root.slug})
+    assert {c['id'] for c in response.data['results']} == {at_root.pk, nested.pk}
+
+    response = api_client.get(URL, {'category_tree': child.slug})
+    assert {c['id'] for c in response.data['results']} == {nested.pk}
+
+    response = api_client.get(URL, {'category_tree': 'missing'})
+    assert response.data['results'] == []
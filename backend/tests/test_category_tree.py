@@ -0,0 +1,78 @@
+"""
+Tests for the cached category tree.
+"""
+import pytest
+from django.urls import reverse
+
+from courses.category_tree import get_category_tree
+from courses.models import Course
+from . import factories
+
+URL = reverse('courses:category_list')
+
+
+@pytest.fixture
+def tree():
+    root = factories.CategoryFactory(name='Root', order=0)
+    child = factories.CategoryFactory(name='Child', parent=root)
+    factories.CategoryFactory(name='Hidden', parent=root, is_active=False)
+    factories.CategoryFactory(name='Grandchild', parent=child)
+    factories.CourseFactory(category=child, status=Course.Status.PUBLISHED)
+    factories.CourseFactory(category=child, status=Course.Status.DRAFT)
+    return root, child
+
+
+def _names(nodes):
+    return [(n['name'], n['course_count'], _names(n['subcategories'])) for n in nodes]
+
+
+@pytest.mark.django_db
+def test_tree_is_built_from_two_queries(tree, django_assert_num_queries):
+    root, _ = tree
+    with django_assert_num_queries(2):
+        built = get_category_tree()
+
+    node = next(n for n in built.roots if n['id'] == root.id)
+    assert _names([node]) == [('Root', 0, [('Child', 1, [('Grandchild', 0, [])])])]
+    with django_assert_num_queries(0):
+        assert get_category_tree() == built
+
+
+@pytest.mark.django_db
+def test_listing_revalidates_with_etag(api_client, tree):
+    response = api_client.get(URL)
+    assert response.status_code == 200
+    etag = response['ETag']
+
+    assert api_client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+def test_saving_a_course_or_category_retires_the_tree(
+    api_client, tree, django_capture_on_commit_callbacks
+):
+    _, child = tree
+    etag = api_client.get(URL)['ETag']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.CourseFactory(category=child, status=Course.Status.PUBLISHED)
+    response = api_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+    with django_capture_on_commit_callbacks(execute=True):
+        child.is_active = False
+        child.save()
+    root = next(n for n in api_client.get(URL).data if n['name'] == 'Root')
+    assert root['subcategories'] == []
+
+
+@pytest.mark.django_db
+def test_deleting_a_listed_course_retires_the_tree(tree, django_capture_on_commit_callbacks):
+    _, child = tree
+    assert get_category_tree().nodes[child.id]['course_count'] == 1
+
+    published = Course.objects.get(category=child, status=Course.Status.PUBLISHED)
+    with django_capture_on_commit_callbacks(execute=True):
+        Course.objects.get(pk=published.pk).delete()
+    assert get_category_tree().nodes[child.id]['course_count'] == 0
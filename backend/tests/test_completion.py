@@ -0,0 +1,104 @@
+"""
+Tests for the incremental course-completion evaluator.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from courses.models import Enrollment, Video
+from progress.completion import record_quiz_passed, record_video_completed
+from progress.models import CourseProgress
+from quizzes.models import QuizAttempt
+from . import factories
+
+
+@pytest.fixture
+def course():
+    course = factories.CourseFactory()
+    module = factories.ModuleFactory(course=course)
+    factories.VideoFactory.create_batch(3, module=module)
+    course.refresh_from_db()
+    return course
+
+
+def _complete_video(user, video):
+    factories.VideoProgressFactory(user=user, video=video)
+    return record_video_completed(user.id, video.module.course_id)
+
+
+@pytest.mark.django_db
+def test_first_completion_recounts_then_applies_deltas(course):
+    user = factories.UserFactory()
+    videos = list(Video.objects.filter(module__course=course))
+
+    progress = _complete_video(user, videos[0])
+    assert (progress.videos_completed, progress.total_videos) == (1, 3)
+    assert progress.structure_version == course.structure_version
+
+    factories.VideoProgressFactory(user=user, video=videos[1])
+    with CaptureQueriesContext(connection) as queries:
+        progress = record_video_completed(user.id, course.id)
+    assert progress.videos_completed == 2
+    assert len(queries) == 2
+
+
+@pytest.mark.django_db
+def test_course_and_enrollment_complete_with_last_requirement(course):
+    user = factories.UserFactory()
+    enrollment = factories.EnrollmentFactory(user=user, course=course)
+    quiz = factories.QuizFactory(course=course)
+    for video in course.modules.get().videos.all():
+        _complete_video(user, video)
+
+    progress = CourseProgress.objects.get(user=user, course=course)
+    assert progress.completed_at is None
+
+    attempt = factories.QuizAttemptFactory(user=user, quiz=quiz)
+    record_quiz_passed(attempt)
+
+    progress.refresh_from_db()
+    enrollment.refresh_from_db()
+    assert progress.quizzes_passed == 1
+    assert progress.is_completed
+    assert enrollment.status == Enrollment.Status.COMPLETED
+
+
+@pytest.mark.django_db
+def test_quiz_retakes_and_optional_quizzes_are_not_counted(course):
+    user = factories.UserFactory()
+    quiz = factories.QuizFactory(course=course)
+    record_quiz_passed(factories.QuizAttemptFactory(user=user, quiz=quiz))
+    record_quiz_passed(factories.QuizAttemptFactory(user=user, quiz=quiz))
+    optional = factories.QuizFactory(course=course, is_required=False)
+    record_quiz_passed(factories.QuizAttemptFactory(user=user, quiz=optional))
+    failed = factories.QuizAttemptFactory(
+        user=user, quiz=factories.QuizFactory(course=course), passed=False,
+        status=QuizAttempt.Status.COMPLETED
+    )
+    record_quiz_passed(failed)
+
+    progress = CourseProgress.objects.get(user=user, course=course)
+    assert progress.quizzes_passed == 1
+
+
+@pytest.mark.django_db
+def test_structure_change_forces_a_recount(course):
+    user = factories.UserFactory()
+    module = course.modules.get()
+    first, second, _ = module.videos.all()
+    _complete_video(user, first)
+
+    # Title edits leave the structure alone; new videos and required quizzes don't.
+    second.title = 'Renamed'
+    second.save()
+    course.refresh_from_db()
+    version = course.structure_version
+    factories.VideoFactory(module=module)
+    factories.QuizFactory(course=course)
+    course.refresh_from_db()
+    assert course.structure_version == version + 2
+
+    progress = _complete_video(user, second)
+    assert (progress.videos_completed, progress.total_videos) == (2, 4)
+    assert progress.total_quizzes == 1
+    assert progress.structure_version == course.structure_version
@@ -0,0 +1,104 @@
+"""
+Tests for ETag/Last-Modified validation of the catalog endpoints.
+"""
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+
+from courses.models import Course
+from . import factories
+
+
+@pytest.fixture
+def course():
+    course = factories.CourseFactory(status=Course.Status.PUBLISHED)
+    factories.VideoFactory(module=factories.ModuleFactory(course=course))
+    return course
+
+
+def _revalidate(api_client, url, **headers):
+    response = api_client.get(url)
+    assert response.status_code == 200
+    return response, api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', [
+    lambda course: reverse('courses:course_list'),
+    lambda course: reverse('courses:course_list') + '?search=Course&page=1',
+    lambda course: reverse('courses:course_detail', kwargs={'slug': course.slug}),
+    lambda course: reverse('courses:module_list', kwargs={'course_slug': course.slug}),
+])
+def test_unchanged_catalog_pages_are_not_modified(api_client, course, url, django_assert_num_queries):
+    response = api_client.get(url(course))
+    assert response.status_code == 200
+    assert response['Cache-Control'] == 'private, no-cache'
+
+    with django_assert_num_queries(0):
+        not_modified = api_client.get(url(course), HTTP_IF_NONE_MATCH=f'W/{response["ETag"]}')
+    assert not_modified.status_code == 304
+    assert not_modified['ETag'] == response['ETag']
+
+
+@pytest.mark.django_db
+def test_changes_produce_a_new_etag(api_client, course, django_capture_on_commit_callbacks):
+    urls = [
+        reverse('courses:course_list'),
+        reverse('courses:course_detail', kwargs={'slug': course.slug}),
+        reverse('courses:module_list', kwargs={'course_slug': course.slug}),
+    ]
+    etags = {url: api_client.get(url)['ETag'] for url in urls}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.VideoFactory(module=course.modules.get())
+    for url in urls:
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200
+        assert response['ETag'] != etags[url]
+
+
+@pytest.mark.django_db
+def test_course_detail_validators_depend_on_the_user(api_client, course):
+    url = reverse('courses:course_detail', kwargs={'slug': course.slug})
+    anonymous = api_client.get(url)
+    assert not anonymous.has_header('Last-Modified')
+
+    student = factories.UserFactory()
+    factories.EnrollmentFactory(user=student, course=course)
+    api_client.force_authenticate(student)
+    enrolled = api_client.get(url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+    assert enrolled.status_code == 200
+    assert enrolled.data['is_enrolled'] is True
+
+    # Only the ETag validates the page; a date alone can't prove it unchanged.
+    since = api_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(2 ** 32))
+    assert since.status_code == 200
+
+
+@pytest.mark.django_db
+def test_quiz_detail_revalidation(api_client, django_capture_on_commit_callbacks):
+    quiz = factories.QuizFactory()
+    question = factories.QuestionFactory(quiz=quiz)
+    student = factories.UserFactory()
+    api_client.force_authenticate(student)
+    url = reverse('quizzes:quiz_detail', kwargs={'pk': quiz.pk})
+
+    response, not_modified = _revalidate(api_client, url)
+    assert not_modified.status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.AnswerFactory(question=question)
+    changed = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert changed.status_code == 200
+
+    factories.QuizAttemptFactory(user=student, quiz=quiz)
+    attempted = api_client.get(url, HTTP_IF_NONE_MATCH=changed['ETag'])
+    assert attempted.data['user_attempts'] == 1
+
+
+@pytest.mark.django_db
+def test_category_listing_is_public(api_client):
+    factories.CategoryFactory()
+    response, not_modified = _revalidate(api_client, reverse('courses:category_list'))
+    assert response['Cache-Control'] == 'public, no-cache'
+    assert not_modified.status_code == 304
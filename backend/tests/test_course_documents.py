@@ -0,0 +1,145 @@
+"""
+Tests for the cached course detail document.
+"""
+import pytest
+from django.urls import reverse
+
+from courses.models import Course
+from . import factories
+
+
+def _url(course):
+    return reverse('courses:course_detail', kwargs={'slug': course.slug})
+
+
+@pytest.fixture
+def course():
+    course = factories.CourseFactory(status=Course.Status.PUBLISHED)
+    module = factories.ModuleFactory(course=course)
+    factories.VideoFactory(module=module)
+    factories.ResourceFactory(course=course)
+    return course
+
+
+@pytest.mark.django_db
+def test_repeat_reads_are_served_from_the_cache(api_client, course, django_assert_num_queries):
+    first = api_client.get(_url(course))
+    assert first.status_code == 200
+    assert first.data['is_enrolled'] is False
+
+    with django_assert_num_queries(0):
+        assert api_client.get(_url(course)).data == first.data
+
+
+@pytest.mark.django_db
+def test_is_enrolled_is_merged_per_user(api_client, course):
+    student = factories.UserFactory()
+    factories.EnrollmentFactory(user=student, course=course)
+    api_client.get(_url(course))
+
+    api_client.force_authenticate(student)
+    assert api_client.get(_url(course)).data['is_enrolled'] is True
+    api_client.force_authenticate(factories.UserFactory())
+    assert api_client.get(_url(course)).data['is_enrolled'] is False
+
+
+@pytest.mark.django_db
+def test_changes_to_the_page_retire_the_document(
+    api_client, course, django_capture_on_commit_callbacks
+):
+    module = course.modules.get()
+    assert api_client.get(_url(course)).data['total_videos'] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.VideoFactory(module=module)
+    assert api_client.get(_url(course)).data['total_videos'] == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.ResourceFactory(course=course, title='Slides')
+    titles = [r['title'] for r in api_client.get(_url(course)).data['resources']]
+    assert 'Slides' in titles
+
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.EnrollmentFactory(course=course)
+    assert api_client.get(_url(course)).data['enrolled_students_count'] == 1
+
+    category = factories.CategoryFactory(name='Data')
+    with django_capture_on_commit_callbacks(execute=True):
+        course.category = category
+        course.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        category.name = 'Data Science'
+        category.save()
+    assert api_client.get(_url(course)).data['category']['name'] == 'Data Science'
+
+
+@pytest.mark.django_db
+def test_renamed_and_unpublished_courses(api_client, course, django_capture_on_commit_callbacks):
+    old_url = _url(course)
+    api_client.get(old_url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        course.slug = 'renamed'
+        course.save()
+    assert api_client.get(old_url).status_code == 404
+    assert api_client.get(_url(course)).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        course.status = Course.Status.DRAFT
+        course.save()
+    assert api_client.get(_url(course)).status_code == 404
+    api_client.force_authenticate(factories.AdminFactory())
+    assert api_client.get(_url(course)).data['status'] == Course.Status.DRAFT
+
+
+@pytest.mark.django_db
+def test_only_changes_to_the_courses_categories_retire_it(
+    api_client, course, django_capture_on_commit_callbacks, django_assert_num_queries
+):
+    parent = factories.CategoryFactory(name='Programming')
+    category = factories.CategoryFactory(name='Python', parent=parent)
+    elsewhere = factories.CategoryFactory(name='Design')
+    with django_capture_on_commit_callbacks(execute=True):
+        course.category = parent
+        course.save()
+    api_client.get(_url(course))
+
+    # Other courses and categories leave the page alone.
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.CourseFactory(category=elsewhere, status=Course.Status.PUBLISHED)
+        elsewhere.name = 'Graphic Design'
+        elsewhere.save()
+    with django_assert_num_queries(0):
+        api_client.get(_url(course))
+
+    # A subcategory gaining a published course shows in its count.
+    with django_capture_on_commit_callbacks(execute=True):
+        factories.CourseFactory(category=category, status=Course.Status.PUBLISHED)
+    [subcategory] = api_client.get(_url(course)).data['category']['subcategories']
+    assert subcategory['course_count'] == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        parent.delete()
+    assert api_client.get(_url(course)).data['category'] is None
+
+
+@pytest.mark.django_db
+def test_moving_a_resource_retires_both_courses(
+    api_client, course, django_capture_on_commit_callbacks
+):
+    other = factories.CourseFactory(status=Course.Status.PUBLISHED)
+    resource = course.resources.get()
+    api_client.get(_url(course))
+    api_client.get(_url(other))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resource.course = other
+        resource.save()
+    assert api_client.get(_url(course)).data['resources'] == []
+    assert [r['id'] for r in api_client.get(_url(other)).data['resources']] == [resource.id]
+
+    # Detached from both course and module, it just leaves the page.
+    with django_capture_on_commit_callbacks(execute=True):
+        resource.course = None
+        resource.save()
+    assert api_client.get(_url(other)).data['resources'] == []
@@ -0,0 +1,77 @@
+"""
+Tests for the denormalized course on VideoProgress and QuizAttempt.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from progress.models import VideoProgress
+from quizzes.models import QuizAttempt
+from . import factories
+
+
+@pytest.fixture
+def content():
+    video = factories.VideoFactory()
+    video_quiz = factories.QuizFactory(course=None, video=video)
+    progress = factories.VideoProgressFactory(video=video)
+    attempt = factories.QuizAttemptFactory(quiz=video_quiz, user=progress.user)
+    return video, video_quiz, progress, attempt
+
+
+def _course_ids(*rows):
+    return [type(row).objects.values_list('course_id', flat=True).get(pk=row.pk) for row in rows]
+
+
+@pytest.mark.django_db
+def test_new_rows_carry_their_course(content):
+    video, _, progress, attempt = content
+
+    assert _course_ids(progress, attempt) == [video.module.course_id] * 2
+
+
+@pytest.mark.django_db
+def test_moving_a_video_moves_its_rows(content):
+    video, _, progress, attempt = content
+    target = factories.ModuleFactory()
+
+    video.module = target
+    video.save()
+
+    assert _course_ids(progress, attempt) == [target.course_id] * 2
+
+
+@pytest.mark.django_db
+def test_moving_a_module_moves_its_rows(content):
+    video, _, progress, attempt = content
+    target = factories.CourseFactory()
+
+    module = video.module
+    module.course = target
+    module.save()
+
+    assert _course_ids(progress, attempt) == [target.pk] * 2
+
+
+@pytest.mark.django_db
+def test_moving_a_quiz_moves_its_attempts(content):
+    _, quiz, _, attempt = content
+    target = factories.CourseFactory()
+
+    quiz.video = None
+    quiz.course = target
+    quiz.save()
+
+    assert _course_ids(attempt) == [target.pk]
+
+
+@pytest.mark.django_db
+def test_backfill_command_fills_missing_courses(content):
+    video, _, progress, attempt = content
+    VideoProgress.objects.filter(pk=progress.pk).update(course=None)
+    QuizAttempt.objects.filter(pk=attempt.pk).update(course=None)
+
+    call_command('backfill_course_refs', stdout=StringIO())
+
+    assert _course_ids(progress, attempt) == [video.module.course_id] * 2
@@ -0,0 +1,106 @@
+"""
+Tests for course search and autocomplete.
+
+The default test database is SQLite, which exercises the icontains
+fallback; the full-text tests only run against PostgreSQL.
+"""
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from courses import signals
+from courses.models import Course
+from courses.search import SEARCH_INDEX, full_text_enabled, prefix_query, refresh_search_vectors
+from . import factories
+
+AUTOCOMPLETE_URL = reverse('courses:course_autocomplete')
+
+
+@pytest.fixture
+def catalog():
+    published = Course.Status.PUBLISHED
+    return [
+        factories.CourseFactory(title='Python Basics', status=published),
+        factories.CourseFactory(title='Advanced Python', status=published),
+        factories.CourseFactory(title='Python Drafts', status=Course.Status.DRAFT),
+        factories.CourseFactory(title='Cooking', status=published),
+    ]
+
+
+def test_prefix_query_strips_query_syntax():
+    assert prefix_query('pyth & !ba').get_source_expressions()[-1].value == 'pyth:* & ba:*'
+    assert prefix_query(' :* ') is None
+
+
+postgres_only = pytest.mark.skipif(not full_text_enabled(), reason='needs PostgreSQL')
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(full_text_enabled(), reason='SQLite fallback')
+def test_search_vectors_are_left_alone_without_postgres(catalog):
+    assert refresh_search_vectors() == 0
+
+
+@pytest.mark.django_db
+def test_the_gin_index_exists_only_on_postgres():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Course._meta.db_table)
+    assert (SEARCH_INDEX in constraints) == full_text_enabled()
+
+
+@pytest.mark.django_db
+def test_only_searchable_text_changes_reindex_a_course(catalog, monkeypatch):
+    reindexed = []
+    monkeypatch.setattr(signals, 'refresh_search_vectors', reindexed.extend)
+    course = catalog[0]
+
+    course.is_featured = True
+    course.save()
+    assert reindexed == []
+
+    course.short_description = 'Learn Python from scratch'
+    course.save()
+    assert reindexed == [course.pk]
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_full_text_search_ranks_title_matches_first(api_client, catalog):
+    described = factories.CourseFactory(
+        title='Scripting', description='Automation with python', status=Course.Status.PUBLISHED
+    )
+    module = factories.ModuleFactory(course=catalog[3])
+    factories.VideoFactory(module=module, title='Knife skills')
+
+    response = api_client.get(reverse('courses:course_list'), {'search': 'python'})
+
+    titles = [c['title'] for c in response.data['results']]
+    assert set(titles[:2]) == {'Python Basics', 'Advanced Python'}
+    assert titles[2:] == [described.title]
+
+    response = api_client.get(AUTOCOMPLETE_URL, {'q': 'knif'})
+    assert [c['title'] for c in response.data] == ['Cooking']
+
+
+@pytest.mark.django_db
+def test_autocomplete_matches_published_titles(api_client, catalog):
+    response = api_client.get(AUTOCOMPLETE_URL, {'q': 'pyth ba'})
+
+    assert response.status_code == 200
+    assert [c['title'] for c in response.data] == ['Python Basics']
+
+    response = api_client.get(AUTOCOMPLETE_URL, {'q': 'python'})
+    assert [c['title'] for c in response.data] == ['Advanced Python', 'Python Basics']
+
+
+@pytest.mark.django_db
+def test_autocomplete_ignores_blank_input(api_client, catalog):
+    assert api_client.get(AUTOCOMPLETE_URL, {'q': '  '}).data == []
+    assert api_client.get(AUTOCOMPLETE_URL, {'q': '&&'}).data == []
+
+
+@pytest.mark.django_db
+def test_course_search_falls_back_to_icontains(api_client, catalog):
+    response = api_client.get(reverse('courses:course_list'), {'search': 'python'})
+
+    assert {c['title'] for c in response.data['results']} == {'Python Basics', 'Advanced Python'}
@@ -0,0 +1,83 @@
+"""
+Tests for the async Drive views: calls overlap, and are limited and timed out.
+"""
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from google_drive.services import GoogleDriveService
+from . import factories
+
+
+@pytest.fixture
+def admin():
+    return factories.AdminFactory(google_access_token='admin-token')
+
+
+def _auth(user):
+    # AsyncClient only sends headers given per request.
+    return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+
+@pytest.fixture
+def get(admin):
+    client, headers = AsyncClient(), _auth(admin)
+    return lambda url: client.get(url, headers=headers)
+
+
+def _list_files_waiting_on(monkeypatch, wait):
+    def list_files(self, **kwargs):
+        wait()
+        return {'files': [], 'next_page_token': None}
+    monkeypatch.setattr(GoogleDriveService, 'list_files', list_files)
+
+
+@pytest.mark.django_db
+def test_drive_calls_overlap(get, monkeypatch, settings):
+    settings.GOOGLE_DRIVE_REQUEST_TIMEOUT = 5
+    # Each call returns only once both are in flight.
+    both = threading.Barrier(2)
+    _list_files_waiting_on(monkeypatch, lambda: both.wait(timeout=5))
+    url = reverse('google_drive:list_files')
+
+    async def scenario():
+        return await asyncio.gather(get(url), get(url))
+
+    assert [response.status_code for response in async_to_sync(scenario)()] == [200, 200]
+
+
+@pytest.mark.django_db
+def test_drive_calls_are_limited_and_timed_out(get, monkeypatch, settings):
+    settings.GOOGLE_DRIVE_CONCURRENCY = 1
+    settings.GOOGLE_DRIVE_REQUEST_TIMEOUT = 0.2
+    drive_answers = threading.Event()
+    _list_files_waiting_on(monkeypatch, lambda: drive_answers.wait(timeout=5))
+    url = reverse('google_drive:list_files')
+
+    async def scenario():
+        # One call runs out of time; the other never gets to start.
+        slow, queued = await asyncio.gather(get(url), get(url))
+        drive_answers.set()
+        # The slot is free again once the timed-out call finishes.
+        await asyncio.sleep(0.1)
+        return slow, queued, await get(url)
+
+    slow, queued, later = async_to_sync(scenario)()
+    assert slow.status_code == 504
+    assert queued.status_code == 503
+    assert later.status_code == 200
+
+
+@pytest.mark.django_db
+def test_drive_views_check_permissions():
+    client = AsyncClient()
+    url = reverse('google_drive:list_files')
+
+    student = _auth(factories.UserFactory())
+    assert async_to_sync(client.get)(url, headers=student).status_code == 403
+    assert async_to_sync(client.get)(url).status_code == 401
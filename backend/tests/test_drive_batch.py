@@ -0,0 +1,70 @@
+"""
+Tests for batched Drive file lookups and checking a course's files.
+"""
+import pytest
+from django.urls import reverse
+
+from google_drive.services import GoogleDriveService
+from . import factories
+
+
+@pytest.fixture
+def admin():
+    return factories.AdminFactory(google_access_token='admin-token')
+
+
+def _batches(fake_drive):
+    return [request for request in fake_drive.requests if request[1] == 'batch/drive/v3']
+
+
+@pytest.mark.django_db
+def test_get_files_batches_and_caches(admin, fake_drive, settings):
+    settings.GOOGLE_DRIVE_BATCH_WORKERS = 2
+    ids = [fake_drive.add_file(f'Lecture {n}.mp4')['id'] for n in range(250)]
+
+    files = GoogleDriveService(admin).get_files(ids + ['gone', ids[0]])
+
+    assert list(files) == ids + ['gone']
+    assert files[ids[249]]['name'] == 'Lecture 249.mp4'
+    assert 'error' in files['gone']
+    assert len(fake_drive.requests) == len(_batches(fake_drive)) == 3
+
+    # Found files are cached; the missing one is asked for again.
+    new = fake_drive.add_file('Lecture 250.mp4')['id']
+    files = GoogleDriveService(admin).get_files(ids + ['gone', new])
+    assert files[new]['name'] == 'Lecture 250.mp4'
+    assert len(fake_drive.requests) == 4
+
+
+@pytest.mark.django_db
+def test_course_files_endpoint_reports_problems(api_client, admin, fake_drive):
+    course = factories.CourseFactory()
+    module = factories.ModuleFactory(course=course)
+    fine = factories.VideoFactory(module=module, order=1,
+                                  google_drive_file_id=fake_drive.add_file('Fine.mp4')['id'])
+    trashed = factories.VideoFactory(
+        module=module, order=2,
+        google_drive_file_id=fake_drive.add_file('Old.mp4', trashed=True)['id']
+    )
+    pdf = factories.VideoFactory(
+        module=module, order=3,
+        google_drive_file_id=fake_drive.add_file('Slides.pdf', 'application/pdf')['id']
+    )
+    gone = factories.ResourceFactory(course=course, google_drive_file_id='gone')
+    url = reverse('google_drive:validate_course_files', args=[course.slug])
+
+    api_client.force_authenticate(admin)
+    response = api_client.get(url)
+
+    assert response.status_code == 200
+    assert (response.data['checked'], response.data['ok']) == (4, 1)
+    assert [(p['type'], p['id'], p['problem']) for p in response.data['problems']] == [
+        ('video', trashed.pk, 'trashed'),
+        ('video', pdf.pk, 'not_a_video'),
+        ('resource', gone.pk, 'unavailable'),
+    ]
+    assert fine.pk not in [p['id'] for p in response.data['problems']]
+    assert len(fake_drive.requests) == 1
+
+    api_client.force_authenticate(factories.AdminFactory())
+    assert api_client.get(url).status_code == 400
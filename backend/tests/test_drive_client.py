@@ -0,0 +1,44 @@
+"""
+Tests for the shared Google Drive client.
+"""
+import threading
+
+import pytest
+
+from google_drive import client
+from google_drive.services import GoogleDriveService
+from . import factories
+
+
+@pytest.mark.django_db
+def test_services_share_the_resource_and_connections(fake_drive):
+    first = GoogleDriveService(factories.UserFactory(google_access_token='first-token'))
+    second = GoogleDriveService(factories.UserFactory(google_access_token='second-token'))
+
+    assert first.files is second.files is client.files_resource()
+    assert first.http.http is second.http.http is fake_drive
+    assert client.discovery_document() is client.discovery_document()
+
+
+@pytest.mark.django_db
+def test_requests_carry_the_users_credentials(fake_drive):
+    folder = fake_drive.add_folder('Lectures')
+    fake_drive.add_file('Intro.mp4', parents=[folder['id']])
+    service = GoogleDriveService(factories.UserFactory(google_access_token='user-token'))
+
+    result = service.list_files(folder_id=folder['id'])
+
+    assert [f['name'] for f in result['files']] == ['Intro.mp4']
+    method, path, params, headers = fake_drive.requests[0]
+    assert (method, path) == ('GET', 'files')
+    assert headers['authorization'] == 'Bearer user-token'
+
+
+def test_each_thread_has_its_own_connection():
+    connections = []
+    thread = threading.Thread(target=lambda: connections.append(client.pooled_http()))
+    thread.start()
+    thread.join()
+
+    assert client.pooled_http() is client.pooled_http()
+    assert connections[0] is not client.pooled_http()
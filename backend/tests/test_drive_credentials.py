@@ -0,0 +1,85 @@
+"""
+Tests for refreshing Drive OAuth tokens once per user, ahead of expiry.
+"""
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from accounts.models import User
+from google_drive.credentials import get_credentials
+from google_drive.services import GoogleDriveService
+from . import factories
+
+
+def _admin(expires_in):
+    return factories.AdminFactory(
+        google_access_token='old-token', google_refresh_token='refresh-token',
+        google_token_expiry=timezone.now() + expires_in
+    )
+
+
+def _refreshes(fake_drive):
+    return [request for request in fake_drive.requests if request[1] == 'token']
+
+
+@pytest.mark.django_db
+def test_valid_tokens_are_used_as_they_are(fake_drive):
+    admin = _admin(timedelta(minutes=30))
+
+    assert get_credentials(admin).token == 'old-token'
+    assert not _refreshes(fake_drive)
+
+
+@pytest.mark.django_db
+def test_tokens_are_refreshed_before_they_expire(fake_drive):
+    admin = _admin(timedelta(minutes=2))
+    updated_at = admin.updated_at
+
+    assert get_credentials(admin).token == 'refreshed-token-1'
+    admin.refresh_from_db()
+    assert admin.google_access_token == 'refreshed-token-1'
+    assert admin.google_token_expiry > timezone.now() + timedelta(minutes=55)
+    # Only the token fields were written.
+    assert admin.updated_at == updated_at
+
+    # Other copies of the user pick the new token up from the cache.
+    stale_copy = User.objects.get(pk=admin.pk)
+    stale_copy.google_access_token = 'old-token'
+    assert get_credentials(stale_copy).token == 'refreshed-token-1'
+    assert len(_refreshes(fake_drive)) == 1
+
+
+@pytest.mark.django_db
+def test_a_token_due_for_refresh_is_used_while_another_caller_refreshes_it(fake_drive):
+    admin = _admin(timedelta(minutes=4, seconds=30))
+    cache.add(f'drive:credentials:{admin.pk}:refreshing', True)
+
+    assert get_credentials(admin).token == 'old-token'
+    assert not _refreshes(fake_drive)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_refreshes_collapse_into_one(fake_drive):
+    admin = _admin(-timedelta(minutes=1))
+    fake_drive.token_delay = 0.2
+    tokens = []
+
+    def browse():
+        try:
+            service = GoogleDriveService(User.objects.get(pk=admin.pk))
+            tokens.append(service.credentials.token)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=browse) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ['refreshed-token-1'] * 5
+    assert len(_refreshes(fake_drive)) == 1
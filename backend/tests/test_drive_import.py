@@ -0,0 +1,136 @@
+"""
+Tests for crawling a Drive folder tree and importing it into a course.
+"""
+import pytest
+from django.urls import reverse
+
+from courses.models import Course, Resource
+from google_drive import crawler
+from google_drive.crawler import DriveCrawlError, crawl_folder
+from google_drive.importer import import_folder
+from lms_project.jobs import get_job
+from . import factories
+
+MINUTES = 60 * 1000
+
+
+@pytest.fixture
+def admin():
+    return factories.AdminFactory(google_access_token='admin-token')
+
+
+@pytest.fixture
+def course_folder(fake_drive, monkeypatch):
+    # Small pages, so every listing has to follow next_page_token.
+    monkeypatch.setattr(crawler, 'PAGE_SIZE', 2)
+    root = fake_drive.add_folder('Python Course')
+    fake_drive.add_file('Welcome.mp4', parents=[root['id']],
+                        videoMediaMetadata={'durationMillis': str(3 * MINUTES)})
+    fake_drive.add_file('Syllabus.pdf', 'application/pdf', parents=[root['id']], size='2048')
+
+    basics = fake_drive.add_folder('01 Basics', parents=[root['id']])
+    for name in ('10 - Loops.mp4', '2 - Variables.mp4', '1 - Setup.mp4'):
+        fake_drive.add_file(name, parents=[basics['id']],
+                            videoMediaMetadata={'durationMillis': str(10 * MINUTES)})
+    fake_drive.add_file('Slides', 'application/vnd.google-apps.presentation', parents=[basics['id']])
+    extras = fake_drive.add_folder('Extras', parents=[basics['id']])
+    fake_drive.add_file('Bonus.mp4', parents=[extras['id']])
+
+    advanced = fake_drive.add_folder('02 Advanced', parents=[root['id']])
+    fake_drive.add_file('Decorators.mp4', parents=[advanced['id']])
+    return root
+
+
+@pytest.mark.django_db
+def test_crawl_reads_the_whole_tree(admin, fake_drive, course_folder):
+    tree = crawl_folder(admin, course_folder['id'], max_workers=3)
+
+    assert [f['name'] for f in tree.files] == ['Syllabus.pdf', 'Welcome.mp4']
+    basics, advanced = tree.subfolders
+    assert [f['name'] for f in basics.files] == [
+        '1 - Setup.mp4', '2 - Variables.mp4', '10 - Loops.mp4', 'Slides'
+    ]
+    assert [f['name'] for f in basics.subfolders[0].files] == ['Bonus.mp4']
+    assert [f['name'] for f in advanced.files] == ['Decorators.mp4']
+    assert any(params.get('pageToken') for _, _, params, _ in fake_drive.requests)
+
+
+@pytest.mark.django_db
+def test_crawl_needs_a_folder(admin, fake_drive):
+    video = fake_drive.add_file('Loose.mp4')
+    with pytest.raises(DriveCrawlError):
+        crawl_folder(admin, video['id'])
+    with pytest.raises(DriveCrawlError):
+        crawl_folder(admin, 'missing')
+
+
+@pytest.mark.django_db
+def test_dry_run_plans_without_writing(admin, course_folder):
+    course = factories.CourseFactory()
+
+    plan = import_folder(admin, course, course_folder['id'], dry_run=True)
+
+    assert plan['dry_run'] is True
+    assert plan['counts'] == {'modules': 3, 'videos': 6, 'resources': 2, 'skipped': 0}
+    assert [m['title'] for m in plan['modules']] == ['Python Course', '01 Basics', '02 Advanced']
+    assert not course.modules.exists()
+
+
+@pytest.mark.django_db
+def test_import_creates_modules_videos_and_resources(admin, fake_drive, course_folder):
+    course = factories.CourseFactory()
+    factories.ModuleFactory(course=course, title='02 Advanced', order=1)
+
+    result = import_folder(admin, course, course_folder['id'])
+
+    assert result['counts'] == {'modules': 2, 'videos': 6, 'resources': 2, 'skipped': 0}
+    modules = {m.title: m for m in course.modules.all()}
+    assert [m.title for m in course.modules.all()] == ['02 Advanced', 'Python Course', '01 Basics']
+    basics = modules['01 Basics']
+    assert [(v.title, v.order, v.duration_minutes) for v in basics.videos.all()] == [
+        ('1 - Setup', 1, 10), ('2 - Variables', 2, 10), ('10 - Loops', 3, 10), ('Bonus', 4, 0)
+    ]
+    assert basics.resources.get().resource_type == Resource.ResourceType.PRESENTATION
+    assert course.resources.get().file_size_bytes == 2048
+
+    course.refresh_from_db()
+    assert course.total_videos == 6
+    assert course.total_duration_minutes == 33
+    assert basics.total_duration_minutes == 30
+
+    # Re-running only adds what's new.
+    advanced = next(f for f in fake_drive.files.values() if f['name'] == '02 Advanced')
+    fake_drive.add_file('Generators.mp4', parents=[advanced['id']])
+    again = import_folder(admin, course, course_folder['id'])
+    assert again['counts'] == {'modules': 0, 'videos': 1, 'resources': 0, 'skipped': 8}
+    assert [v.order for v in modules['02 Advanced'].videos.all()] == [1, 2]
+
+
+@pytest.mark.django_db
+def test_import_endpoint_runs_a_job(api_client, admin, course_folder, django_capture_on_commit_callbacks):
+    course = factories.CourseFactory(status=Course.Status.PUBLISHED)
+    api_client.force_authenticate(admin)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(reverse('google_drive:import_folder'), {
+            'course_id': course.id, 'folder_id': course_folder['id'],
+        }, format='json')
+
+    assert response.status_code == 202
+    job = get_job(response.data['id'])
+    assert job['status'] == 'succeeded'
+    assert job['result']['counts']['videos'] == 6
+    assert course.modules.count() == 3
+
+    # The same import again is the same job; a dry run of it is another.
+    payload = {'course_id': course.id, 'folder_id': course_folder['id']}
+    url = reverse('google_drive:import_folder')
+    assert api_client.post(url, payload, format='json').data['id'] == job['id']
+    dry_run = api_client.post(url, {**payload, 'dry_run': True}, format='json')
+    assert dry_run.data['id'] != job['id']
+
+    api_client.force_authenticate(factories.AdminFactory())
+    response = api_client.post(reverse('google_drive:import_folder'), {
+        'course_id': course.id, 'folder_id': course_folder['id'],
+    }, format='json')
+    assert response.status_code == 400
@@ -0,0 +1,77 @@
+"""
+Tests for the per-user Drive metadata cache, against the in-memory FakeDrive.
+"""
+import pytest
+from django.urls import reverse
+
+from google_drive.services import GoogleDriveService
+from . import factories
+
+
+@pytest.fixture
+def admin():
+    return factories.AdminFactory(google_access_token='admin-token')
+
+
+@pytest.fixture
+def lectures(fake_drive):
+    folder = fake_drive.add_folder('Lectures')
+    fake_drive.add_file('Intro.mp4', parents=[folder['id']])
+    fake_drive.add_file('Notes.pdf', 'application/pdf', parents=[folder['id']])
+    return folder
+
+
+def _names(result):
+    return [f['name'] for f in result['files']]
+
+
+@pytest.mark.django_db
+def test_repeat_lookups_are_served_from_the_cache(admin, fake_drive, lectures):
+    service = GoogleDriveService(admin)
+    assert _names(service.list_files(folder_id=lectures['id'])) == ['Intro.mp4']
+    assert service.get_file(lectures['id'])['name'] == 'Lectures'
+    served = len(fake_drive.requests)
+
+    assert _names(GoogleDriveService(admin).list_files(folder_id=lectures['id'])) == ['Intro.mp4']
+    assert GoogleDriveService(admin).get_file(lectures['id'])['name'] == 'Lectures'
+    assert len(fake_drive.requests) == served
+
+    # Another type, page or user is another entry.
+    assert _names(service.list_files(folder_id=lectures['id'], file_type='document')) == ['Notes.pdf']
+    other = GoogleDriveService(factories.AdminFactory(google_access_token='other-token'))
+    other.list_files(folder_id=lectures['id'])
+    assert len(fake_drive.requests) == served + 2
+
+
+@pytest.mark.django_db
+def test_stale_entries_are_served_while_they_refresh(admin, fake_drive, lectures, settings):
+    settings.GOOGLE_DRIVE_CACHE_TTL = 0
+    service = GoogleDriveService(admin)
+    service.list_files(folder_id=lectures['id'])
+    fake_drive.add_file('Outro.mp4', parents=[lectures['id']])
+
+    # The stale listing comes back at once; the refresh (run eagerly here)
+    # replaces it for the next read.
+    assert _names(service.list_files(folder_id=lectures['id'])) == ['Intro.mp4']
+    assert _names(service.list_files(folder_id=lectures['id'])) == ['Intro.mp4', 'Outro.mp4']
+
+
+@pytest.mark.django_db
+def test_errors_are_not_cached(admin, fake_drive):
+    service = GoogleDriveService(admin)
+    assert 'error' in service.get_file('later')
+
+    fake_drive.add_file('Later.mp4', id='later')
+    assert service.get_file('later')['name'] == 'Later.mp4'
+
+
+@pytest.mark.django_db
+def test_folder_browsing_endpoint(api_client, admin, fake_drive, lectures):
+    api_client.force_authenticate(admin)
+    url = reverse('google_drive:list_files') + f'?folder_id={lectures["id"]}'
+
+    first = api_client.get(url)
+    assert first.status_code == 200
+    assert _names(first.data) == ['Intro.mp4']
+    assert api_client.get(url).data == first.data
+    assert len(fake_drive.requests) == 1
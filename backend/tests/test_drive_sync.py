@@ -0,0 +1,112 @@
+"""
+Tests for syncing Video and Resource metadata from the Drive change feed.
+"""
+import pytest
+from django.core.management import call_command
+
+from google_drive import sync
+from google_drive.models import DriveChangeCursor
+from google_drive.sync import sync_all_changes, sync_changes
+from . import factories
+
+MINUTES = 60 * 1000
+
+
+@pytest.fixture
+def admin():
+    return factories.AdminFactory(google_access_token='admin-token')
+
+
+@pytest.fixture
+def library(fake_drive):
+    lecture = fake_drive.add_file('Lecture.mp4', videoMediaMetadata={'durationMillis': str(5 * MINUTES)})
+    notes = fake_drive.add_file('Notes.pdf', 'application/pdf', size='100')
+    video = factories.VideoFactory(google_drive_file_id=lecture['id'], duration_minutes=5)
+    resource = factories.ResourceFactory(google_drive_file_id=notes['id'], file_size_bytes=100)
+    return video, resource
+
+
+@pytest.mark.django_db
+def test_sync_applies_only_changes_since_the_last_one(admin, fake_drive, library, monkeypatch):
+    monkeypatch.setattr(sync, 'PAGE_SIZE', 2)
+    video, resource = library
+
+    # The first sync only records where the feed is.
+    assert sync_changes(admin)['started'] is True
+    assert DriveChangeCursor.objects.get(user=admin).page_token == str(len(fake_drive.changes))
+
+    fake_drive.update_file(video.google_drive_file_id, thumbnailLink='https://lh3.example.com/thumb',
+                           videoMediaMetadata={'durationMillis': str(12 * MINUTES)})
+    fake_drive.update_file(resource.google_drive_file_id, size='4096')
+    fake_drive.add_file('Unrelated.mp4')
+    result = sync_changes(admin)
+
+    assert result == {'changes': 3, 'videos': 1, 'resources': 1, 'missing': 0, 'started': False}
+    video.refresh_from_db()
+    assert (video.duration_minutes, video.thumbnail_url) == (12, 'https://lh3.example.com/thumb')
+    resource.refresh_from_db()
+    assert resource.file_size_bytes == 4096
+    video.module.refresh_from_db()
+    assert video.module.total_duration_minutes == 12
+    video.module.course.refresh_from_db()
+    assert video.module.course.total_duration_minutes == 12
+
+    # Nothing new, nothing read but the (empty) last page.
+    served = len(fake_drive.requests)
+    assert sync_changes(admin)['changes'] == 0
+    assert len(fake_drive.requests) == served + 1
+
+
+@pytest.mark.django_db
+def test_trashed_and_deleted_files_are_flagged(admin, fake_drive, library):
+    video, resource = library
+    sync_changes(admin)
+
+    fake_drive.trash_file(video.google_drive_file_id)
+    fake_drive.delete_file(resource.google_drive_file_id)
+    assert sync_changes(admin)['missing'] == 2
+    video.refresh_from_db()
+    resource.refresh_from_db()
+    assert video.drive_file_missing and resource.drive_file_missing
+    assert video.duration_minutes == 5
+
+    fake_drive.update_file(video.google_drive_file_id, trashed=False)
+    sync_changes(admin)
+    video.refresh_from_db()
+    assert not video.drive_file_missing
+
+
+@pytest.mark.django_db
+def test_a_file_unshared_from_one_admin_is_not_flagged(admin, fake_drive, library):
+    colleague = factories.AdminFactory(google_access_token='colleague-token')
+    video, resource = library
+    sync_changes(admin)
+    sync_changes(colleague)
+
+    # Still in the colleague's Drive, so it hasn't gone anywhere.
+    fake_drive.unshare_file(video.google_drive_file_id, 'admin-token')
+    assert sync_changes(admin)['missing'] == 0
+    video.refresh_from_db()
+    assert not video.drive_file_missing
+
+    # Unshared from everyone, or deleted, it's missing whoever syncs first.
+    fake_drive.unshare_file(video.google_drive_file_id, 'colleague-token')
+    fake_drive.delete_file(resource.google_drive_file_id)
+    assert sync_changes(colleague)['missing'] == 2
+    assert sync_changes(admin)['missing'] == 0
+    video.refresh_from_db()
+    resource.refresh_from_db()
+    assert video.drive_file_missing and resource.drive_file_missing
+
+
+@pytest.mark.django_db
+def test_sync_all_covers_connected_admins(admin, fake_drive, library):
+    factories.AdminFactory()
+    factories.UserFactory(google_access_token='student-token')
+    call_command('sync_drive_changes')
+    assert list(DriveChangeCursor.objects.values_list('user', flat=True)) == [admin.pk]
+
+    fake_drive.trash_file(library[0].google_drive_file_id)
+    assert sync_all_changes() == {
+        'users': 1, 'errors': 0, 'changes': 1, 'videos': 1, 'resources': 0, 'missing': 1
+    }
@@ -0,0 +1,42 @@
+"""
+Tests for serializing enrollments with progress annotated in one query.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import factories
+
+
+@pytest.mark.django_db
+def test_listing_shows_each_students_progress(api_client):
+    course = factories.CourseFactory()
+    with_progress, without_progress = factories.EnrollmentFactory.create_batch(2, course=course)
+    factories.CourseProgressFactory(
+        user=with_progress.user, course=course, videos_completed=1, total_videos=3
+    )
+    api_client.force_authenticate(factories.AdminFactory())
+
+    response = api_client.get(reverse('courses:enrollment_list'), {'course': course.id})
+
+    progress = {row['id']: row['progress'] for row in response.data['results']}
+    assert progress == {with_progress.id: 33.33, without_progress.id: 0}
+
+
+@pytest.mark.django_db
+def test_admin_listing_cost_does_not_grow_with_the_page(api_client):
+    api_client.force_authenticate(factories.AdminFactory())
+    course = factories.CourseFactory()
+    url = reverse('courses:enrollment_list')
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get(url, {'course': course.id}).status_code == 200
+        return len(queries)
+
+    factories.EnrollmentFactory(course=course)
+    one_row = count_queries()
+    for enrollment in factories.EnrollmentFactory.create_batch(15, course=course):
+        factories.CourseProgressFactory(user=enrollment.user, course=course)
+    assert count_queries() == one_row
@@ -0,0 +1,119 @@
+"""
+Tests for the batched quiz grading engine.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from quizzes.answer_keys import build_answer_key
+from quizzes.grading import grade_submission
+from quizzes.models import Question, QuizAttempt, QuizResponse
+from . import factories
+
+
+def _quiz_with_every_question_type():
+    quiz = factories.QuizFactory(passing_score=50)
+    mc = factories.QuestionFactory(quiz=quiz, points=2)
+    mc_right = factories.AnswerFactory(question=mc, is_correct=True, order=0)
+    mc_wrong = factories.AnswerFactory(question=mc, order=1)
+
+    ms = factories.QuestionFactory(quiz=quiz, question_type=Question.QuestionType.MULTIPLE_SELECT, points=3)
+    ms_a = factories.AnswerFactory(question=ms, is_correct=True, order=0)
+    ms_b = factories.AnswerFactory(question=ms, is_correct=True, order=1)
+    factories.AnswerFactory(question=ms, order=2)
+
+    sa = factories.QuestionFactory(quiz=quiz, question_type=Question.QuestionType.SHORT_ANSWER, points=5)
+    factories.AnswerFactory(question=sa, is_correct=True, answer_text='Paris')
+
+    return quiz, {
+        'mc': (mc, mc_right, mc_wrong),
+        'ms': (ms, ms_a, ms_b),
+        'sa': (sa,),
+    }
+
+
+def _start(quiz):
+    return QuizAttempt.objects.create(
+        user=factories.UserFactory(), quiz=quiz, status=QuizAttempt.Status.IN_PROGRESS
+    )
+
+
+@pytest.mark.django_db
+def test_grades_each_question_type():
+    quiz, q = _quiz_with_every_question_type()
+    mc, mc_right, _ = q['mc']
+    ms, ms_a, ms_b = q['ms']
+    (sa,) = q['sa']
+    attempt = _start(quiz)
+
+    grade_submission(attempt, [
+        {'question_id': mc.id, 'selected_answer_ids': [mc_right.id]},
+        {'question_id': ms.id, 'selected_answer_ids': [ms_a.id, ms_b.id]},
+        {'question_id': sa.id, 'text_response': '  paris '},
+    ])
+
+    attempt.refresh_from_db()
+    assert attempt.status == QuizAttempt.Status.COMPLETED
+    assert attempt.score == 100
+    assert attempt.passed
+    responses = {r.question_id: r for r in attempt.responses.all()}
+    assert all(r.is_correct for r in responses.values())
+    assert set(responses[ms.id].selected_answers.values_list('id', flat=True)) == {ms_a.id, ms_b.id}
+
+
+@pytest.mark.django_db
+def test_matches_per_response_check_answer():
+    quiz, q = _quiz_with_every_question_type()
+    mc, _, mc_wrong = q['mc']
+    ms, ms_a, _ = q['ms']
+    (sa,) = q['sa']
+    attempt = _start(quiz)
+
+    grade_submission(attempt, [
+        {'question_id': mc.id, 'selected_answer_ids': [mc_wrong.id]},
+        {'question_id': ms.id, 'selected_answer_ids': [ms_a.id]},
+        {'question_id': sa.id, 'text_response': 'Paris'},
+    ])
+
+    for response in QuizResponse.objects.filter(attempt=attempt):
+        graded = response.is_correct
+        assert response.check_answer() == graded
+
+    attempt.refresh_from_db()
+    assert attempt.score == pytest.approx(5 / 10 * 100)
+    assert attempt.passed
+
+
+@pytest.mark.django_db
+def test_ignores_foreign_questions_and_answers():
+    quiz, q = _quiz_with_every_question_type()
+    mc, mc_right, _ = q['mc']
+    other = factories.AnswerFactory(is_correct=True)
+    attempt = _start(quiz)
+
+    grade_submission(attempt, [
+        {'question_id': other.question_id, 'selected_answer_ids': [other.id]},
+        {'question_id': mc.id, 'selected_answer_ids': [other.id, mc_right.id]},
+    ])
+
+    responses = list(attempt.responses.all())
+    assert [r.question_id for r in responses] == [mc.id]
+    assert list(responses[0].selected_answers.values_list('id', flat=True)) == [mc_right.id]
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_question_count():
+    def queries_for(question_count):
+        quiz = factories.QuizFactory()
+        submitted = []
+        for _ in range(question_count):
+            question = factories.QuestionFactory(quiz=quiz)
+            answer = factories.AnswerFactory(question=question, is_correct=True)
+            submitted.append({'question_id': question.id, 'selected_answer_ids': [answer.id]})
+        attempt = _start(quiz)
+        answer_key = build_answer_key(quiz.id)
+        with CaptureQueriesContext(connection) as queries:
+            grade_submission(attempt, submitted, answer_key=answer_key)
+        return len(queries)
+
+    assert queries_for(3) == queries_for(30)
@@ -0,0 +1,157 @@
+"""
+Tests for the write-behind video heartbeat buffer.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from progress import heartbeats
+from progress.heartbeats import check_write_behind, flush_heartbeats
+from progress.models import CourseProgress, VideoProgress
+from . import factories
+
+URL = reverse('progress:update_video_progress')
+
+
+class MemoryHeartbeatBuffer:
+    """Stands in for the Redis hash; the tests run in one process."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, user_id, video_id):
+        return self.entries.get(f'{user_id}:{video_id}')
+
+    def put(self, user_id, video_id, entry):
+        self.entries[f'{user_id}:{video_id}'] = entry
+
+    def discard(self, user_id, video_id):
+        self.entries.pop(f'{user_id}:{video_id}', None)
+
+    def drain(self):
+        entries, self.entries = self.entries, {}
+        return entries
+
+
+@pytest.fixture
+def write_behind(settings, monkeypatch):
+    settings.VIDEO_PROGRESS_WRITE_BEHIND = True
+    buffer = MemoryHeartbeatBuffer()
+    monkeypatch.setattr(heartbeats, 'shared_buffer_available', lambda: True)
+    monkeypatch.setattr(heartbeats, 'get_buffer', lambda: buffer)
+    return buffer
+
+
+@pytest.fixture
+def viewer(api_client):
+    user = factories.UserFactory()
+    api_client.force_authenticate(user)
+    video = factories.VideoFactory(duration_minutes=10)
+    return api_client, user, video
+
+
+def _beat(client, video, watched, **extra):
+    return client.post(URL, {
+        'video_id': video.id, 'watched_seconds': watched,
+        'total_seconds': 600, 'last_position_seconds': watched, **extra,
+    }, format='json')
+
+
+@pytest.mark.django_db
+def test_heartbeats_are_buffered_until_flush(write_behind, viewer):
+    client, user, video = viewer
+
+    with CaptureQueriesContext(connection) as queries:
+        for watched in (30, 120, 60):
+            response = _beat(client, video, watched)
+            assert response.status_code == 202
+    assert all(query['sql'].startswith('SELECT') for query in queries)
+    assert (response.data['watched_seconds'], response.data['last_position_seconds']) == (120, 60)
+    assert not VideoProgress.objects.filter(user=user).exists()
+
+    assert flush_heartbeats() == 1
+    progress = VideoProgress.objects.get(user=user, video=video)
+    assert (progress.watched_seconds, progress.last_position_seconds) == (120, 60)
+    assert progress.watch_count == 1
+    assert progress.course_id == video.module.course_id
+    assert not progress.is_completed
+
+    _beat(client, video, 300)
+    assert flush_heartbeats() == 1
+    progress.refresh_from_db()
+    assert progress.watched_seconds == 300
+    assert flush_heartbeats() == 0
+
+
+@pytest.mark.django_db
+def test_completion_is_written_synchronously(write_behind, viewer):
+    client, user, video = viewer
+    _beat(client, video, 120)
+
+    response = _beat(client, video, 550)
+    assert response.status_code == 200
+    assert response.data['is_completed']
+    assert CourseProgress.objects.get(user=user, course=video.module.course).videos_completed == 1
+    # The completion dropped the stale buffered heartbeat.
+    assert write_behind.get(user.id, video.id) is None
+
+    # Once completed, further heartbeats go back to the buffer without undoing it.
+    assert _beat(client, video, 580).status_code == 202
+    flush_heartbeats()
+    progress = VideoProgress.objects.get(user=user, video=video)
+    assert progress.is_completed
+    assert progress.watched_seconds == 580
+
+
+@pytest.mark.django_db
+def test_flush_skips_deleted_videos(write_behind, viewer):
+    client, user, video = viewer
+    _beat(client, video, 30)
+    video.delete()
+
+    assert flush_heartbeats() == 0
+    assert not VideoProgress.objects.filter(user=user).exists()
+
+
+@pytest.mark.django_db
+def test_write_behind_off_writes_every_heartbeat(viewer):
+    client, user, video = viewer
+
+    assert _beat(client, video, 30).status_code == 200
+    assert VideoProgress.objects.get(user=user, video=video).watched_seconds == 30
+
+
+@pytest.mark.django_db
+def test_buffered_heartbeats_answer_like_written_ones(write_behind, viewer, settings):
+    client, user, video = viewer
+    buffered = _beat(client, video, 30)
+    flush_heartbeats()
+    settings.VIDEO_PROGRESS_WRITE_BEHIND = False
+    written = _beat(client, video, 60)
+
+    assert buffered.status_code == 202 and written.status_code == 200
+    assert buffered.data.keys() == written.data.keys()
+    assert buffered.data['video_title'] == video.title
+
+
+@pytest.mark.django_db
+def test_heartbeats_for_unknown_videos_are_refused(write_behind, viewer):
+    client, user, video = viewer
+    video_id = video.id
+    video.delete()
+
+    response = client.post(URL, {'video_id': video_id, 'watched_seconds': 30, 'total_seconds': 600})
+    assert response.status_code == 404
+    assert write_behind.entries == {}
+
+
+@pytest.mark.django_db
+def test_write_behind_needs_redis(settings, viewer):
+    client, user, video = viewer
+    settings.VIDEO_PROGRESS_WRITE_BEHIND = True
+
+    # The test cache is per-process, so there is nothing shared to buffer in.
+    assert [warning.id for warning in check_write_behind(None)] == ['progress.W001']
+    assert _beat(client, video, 30).status_code == 200
+    assert VideoProgress.objects.get(user=user, video=video).watched_seconds == 30
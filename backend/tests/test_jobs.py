@@ -0,0 +1,168 @@
+"""
+Tests for the background job layer, run with Celery in eager mode.
+"""
+import pytest
+from django.urls import reverse
+
+from courses.models import Enrollment
+from lms_project.jobs import JobStatus, enqueue, get_job
+from progress.models import Certificate
+from progress.tasks import generate_student_report, issue_certificate_task
+from quizzes.models import QuizAttempt
+from quizzes.tasks import regrade_quiz_task
+from . import factories
+
+
+def _poll(client, job):
+    return client.get(reverse('job_status', args=[job['id']])).data
+
+
+@pytest.mark.django_db
+def test_async_bulk_enroll_runs_on_commit_and_reports_status(
+    api_client, django_capture_on_commit_callbacks
+):
+    admin = factories.AdminFactory()
+    course = factories.CourseFactory()
+    students = factories.UserFactory.create_batch(3)
+    api_client.force_authenticate(admin)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            reverse('courses:bulk_enroll') + '?async=1',
+            {'course_id': course.id, 'user_ids': [s.id for s in students]},
+            format='json'
+        )
+
+    assert response.status_code == 202
+    assert response['Location'].endswith(reverse('job_status', args=[response.data['id']]))
+    job = _poll(api_client, response.data)
+    assert job['status'] == JobStatus.SUCCEEDED
+    assert job['result'] == {'course_id': course.id, 'created': 3, 'existing': 0, 'not_found': 0}
+    assert Enrollment.objects.filter(course=course).count() == 3
+
+
+@pytest.mark.django_db
+def test_same_work_is_not_enqueued_twice(api_client, django_capture_on_commit_callbacks):
+    admin = factories.AdminFactory()
+    course = factories.CourseFactory()
+    student = factories.UserFactory()
+    api_client.force_authenticate(admin)
+    url = reverse('courses:bulk_enroll') + '?async=1'
+    payload = {'course_id': course.id, 'user_ids': [student.id]}
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        first = api_client.post(url, payload, format='json').data
+        second = api_client.post(url, payload, format='json').data
+        other = api_client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='retry-1').data
+
+    assert first['id'] == second['id']
+    assert other['id'] != first['id']
+    assert len(callbacks) == 2
+
+
+@pytest.mark.django_db
+def test_failed_jobs_record_the_error_and_can_be_retried(django_capture_on_commit_callbacks):
+    student = factories.UserFactory()
+    course = factories.CourseFactory()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        job = enqueue(issue_certificate_task, student.id, course.id, key='cert', owner=student)
+    job = get_job(job['id'])
+    assert job['status'] == JobStatus.FAILED
+    assert job['error'] == 'No progress found for this course.'
+
+    factories.CourseProgressFactory(
+        user=student, course=course, completed_at='2024-01-01T00:00:00Z'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        retry = enqueue(issue_certificate_task, student.id, course.id, key='cert', owner=student)
+    assert retry['id'] != job['id']
+    assert get_job(retry['id'])['status'] == JobStatus.SUCCEEDED
+    assert Certificate.objects.filter(user=student, course=course).exists()
+
+
+@pytest.mark.django_db
+def test_jobs_are_only_visible_to_their_owner_and_admins(api_client):
+    owner, other = factories.UserFactory.create_batch(2)
+    job = enqueue(generate_student_report, owner=owner)
+
+    api_client.force_authenticate(other)
+    assert api_client.get(reverse('job_status', args=[job['id']])).status_code == 404
+    api_client.force_authenticate(factories.AdminFactory())
+    assert _poll(api_client, job)['status'] == JobStatus.PENDING
+
+
+@pytest.mark.django_db
+def test_student_report_job_writes_a_private_export(
+    api_client, settings, tmp_path, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    settings.JOB_FILES_ROOT = tmp_path / 'jobs'
+    admin = factories.AdminFactory()
+    factories.UserFactory(email='reported@example.com')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        job = enqueue(generate_student_report, 'csv', owner=admin)
+    result = get_job(job['id'])['result']
+
+    assert not (tmp_path / 'media').exists()
+    content = (tmp_path / 'jobs' / result['path']).read_text()
+    assert content.startswith('user_id,user_email')
+    assert 'reported@example.com' in content
+    assert result['url'] == reverse('job_file', args=[job['id']])
+
+    api_client.force_authenticate(factories.UserFactory())
+    assert api_client.get(result['url']).status_code == 404
+    api_client.force_authenticate(admin)
+    response = api_client.get(result['url'])
+    assert response.status_code == 200
+    assert 'no-store' in response['Cache-Control']
+    assert b''.join(response.streaming_content) == (tmp_path / 'jobs' / result['path']).read_bytes()
+
+
+@pytest.mark.django_db
+def test_regrade_applies_a_corrected_answer_key(django_capture_on_commit_callbacks):
+    quiz = factories.QuizFactory(passing_score=50)
+    question = factories.QuestionFactory(quiz=quiz)
+    wrong = factories.AnswerFactory(question=question, is_correct=True)
+    right = factories.AnswerFactory(question=question)
+    attempt = factories.QuizAttemptFactory(quiz=quiz, score=100, passed=True)
+    response = attempt.responses.create(question=question, is_correct=True, points_earned=1)
+    response.selected_answers.add(right)
+
+    wrong.is_correct, right.is_correct = False, True
+    wrong.save()
+    right.save()
+    # Mark the earlier attempt wrong first, so the regrade has something to fix.
+    attempt.responses.update(is_correct=False, points_earned=0)
+    QuizAttempt.objects.filter(pk=attempt.pk).update(score=0, passed=False)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        job = enqueue(regrade_quiz_task, quiz.id)
+
+    assert get_job(job['id'])['result'] == {'quiz_id': quiz.id, 'regraded': 1}
+    attempt.refresh_from_db()
+    assert (attempt.score, attempt.passed) == (100, True)
+    assert attempt.responses.get().is_correct
+
+
+@pytest.mark.django_db
+def test_regrade_requests_are_keyed_on_the_quiz_and_its_answer_key(
+    api_client, django_capture_on_commit_callbacks
+):
+    quiz, other = factories.QuizFactory.create_batch(2)
+    answer = factories.AnswerFactory(question=factories.QuestionFactory(quiz=quiz))
+    api_client.force_authenticate(factories.AdminFactory())
+
+    def regrade(quiz):
+        return api_client.post(reverse('quizzes:regrade_quiz', kwargs={'quiz_id': quiz.id})).data
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first = regrade(quiz)
+    assert regrade(quiz)['id'] == first['id']
+    assert regrade(other)['id'] != first['id']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        answer.is_correct = True
+        answer.save()
+    assert regrade(quiz)['id'] != first['id']
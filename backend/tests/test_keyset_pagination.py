@@ -0,0 +1,93 @@
+"""
+Tests for opt-in keyset (cursor) pagination.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from courses.models import Enrollment
+from . import factories
+
+URL = reverse('courses:enrollment_list')
+
+
+@pytest.fixture
+def enrollments(api_client):
+    api_client.force_authenticate(factories.AdminFactory())
+    course = factories.CourseFactory()
+    created = factories.EnrollmentFactory.create_batch(7, course=course)
+    # Three rows share a timestamp, so pages have to break ties on id.
+    tied = created[2].enrolled_at
+    Enrollment.objects.filter(pk__in=[e.pk for e in created[3:6]]).update(enrolled_at=tied)
+    return course, list(
+        Enrollment.objects.filter(course=course)
+        .order_by('-enrolled_at', '-pk').values_list('pk', flat=True)
+    )
+
+
+def _walk(api_client, params):
+    seen, pages = [], 0
+    response = api_client.get(URL, params)
+    while True:
+        assert response.status_code == 200
+        assert 'count' not in response.data
+        seen += [row['id'] for row in response.data['results']]
+        pages += 1
+        if not response.data['next']:
+            return seen, pages
+        response = api_client.get(response.data['next'])
+
+
+@pytest.mark.django_db
+def test_cursor_pages_cover_every_row_once_in_order(api_client, enrollments):
+    course, expected = enrollments
+    seen, pages = _walk(api_client, {'course': course.pk, 'pagination': 'cursor', 'page_size': 2})
+
+    assert seen == expected
+    assert pages == 4
+
+
+@pytest.mark.django_db
+def test_page_cost_is_constant(api_client, enrollments, django_assert_num_queries):
+    first = api_client.get(URL, {'pagination': 'cursor', 'page_size': 2})
+    with django_assert_num_queries(1):
+        api_client.get(first.data['next'])
+
+
+def _page_queries(api_client, url, page_size):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, {'pagination': 'cursor', 'page_size': page_size})
+    assert len(response.data['results']) == page_size
+    return len(queries)
+
+
+@pytest.mark.django_db
+def test_student_and_attempt_pages_cost_the_same_at_any_size(api_client):
+    api_client.force_authenticate(factories.AdminFactory())
+    for _ in range(6):
+        student = factories.UserFactory()
+        factories.EnrollmentFactory(user=student)
+        factories.CourseProgressFactory(user=student)
+        attempt = factories.QuizAttemptFactory(user=student)
+        question = factories.QuestionFactory(quiz=attempt.quiz)
+        response = attempt.responses.create(question=question)
+        response.selected_answers.add(factories.AnswerFactory(question=question))
+
+    for url in (reverse('accounts:student_list'), reverse('quizzes:all_attempts')):
+        assert _page_queries(api_client, url, 2) == _page_queries(api_client, url, 6)
+
+
+@pytest.mark.django_db
+def test_page_numbers_remain_the_default(api_client, enrollments):
+    course, expected = enrollments
+    response = api_client.get(URL, {'course': course.pk})
+
+    assert response.data['count'] == len(expected)
+
+
+@pytest.mark.django_db
+def test_bad_cursor_is_rejected(api_client, enrollments):
+    response = api_client.get(URL, {'cursor': 'not-a-cursor'})
+
+    assert response.status_code == 404
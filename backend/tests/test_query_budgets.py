@@ -0,0 +1,53 @@
+"""
+Query-count budgets for every routed endpoint.
+
+Each endpoint is exercised against the shared "ci" dataset and must stay
+within the number of queries recorded for it in ``query_budgets.json``. A
+per-row query added to a list view pushes the count over budget and fails
+here. After an intentional change, re-record the budgets with::
+
+    pytest tests/test_query_budgets.py --record-query-budgets
+"""
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import BUDGETS_PATH
+from .endpoints import ENDPOINTS, prepare, perform
+
+BUDGETS = json.loads(BUDGETS_PATH.read_text()) if BUDGETS_PATH.exists() else {}
+
+
+@pytest.fixture(autouse=True)
+def fake_google_id_token(monkeypatch):
+    monkeypatch.setattr(
+        'accounts.views.id_token.verify_oauth2_token',
+        lambda token, request, audience: {
+            'email': 'google-user@example.com', 'given_name': 'Google', 'family_name': 'User',
+        }
+    )
+
+
+@pytest.mark.parametrize('case', ENDPOINTS, ids=str)
+def test_query_budget(case, dataset, api_client, request):
+    if dataset.scale != 'ci':
+        pytest.skip('query budgets are recorded at the "ci" dataset scale')
+
+    url, data = prepare(case, api_client, dataset)
+    with CaptureQueriesContext(connection) as queries:
+        response = perform(case, api_client, url, data)
+
+    assert response.status_code in case.expected, response.content[:500]
+
+    measured = len(queries)
+    if request.config.getoption('--record-query-budgets'):
+        request.config.measured_query_counts[case.name] = measured
+        return
+
+    assert case.name in BUDGETS, f'no recorded query budget for {case.name}'
+    assert measured <= BUDGETS[case.name], (
+        f'{case.name} ran {measured} queries, budget is {BUDGETS[case.name]}:\n'
+        + '\n'.join(q['sql'] for q in queries.captured_queries)
+    )
@@ -0,0 +1,108 @@
+"""
+Query plans and timings for the hot query shapes, with and without their index.
+
+Skipped unless ``--benchmark`` is given. Each shape is explained and timed as
+the schema defines it, then again inside a rolled-back transaction with its
+index dropped, e.g.::
+
+    pytest tests/test_query_plans.py --benchmark --dataset-scale=large \
+        --benchmark-report=plans.json
+"""
+import statistics
+import time
+
+import pytest
+from django.db import connection, transaction
+
+from courses.models import Course, Enrollment
+from progress.models import CourseProgress, VideoProgress
+from quizzes.models import QuizAttempt
+
+# name -> (index, queryset factory)
+SHAPES = {
+    'catalog_courses': (
+        'course_catalog_idx',
+        lambda ds: Course.objects.filter(
+            status=Course.Status.PUBLISHED
+        ).order_by('-created_at').values('pk')[:20],
+    ),
+    'featured_courses': (
+        'course_featured_idx',
+        lambda ds: Course.objects.filter(
+            status=Course.Status.PUBLISHED, is_featured=True
+        ).order_by('-created_at').values('pk')[:6],
+    ),
+    'quiz_attempt_limit': (
+        'quizattempt_user_quiz_idx',
+        lambda ds: QuizAttempt.objects.filter(
+            user=ds.student, quiz=ds.quiz, status=QuizAttempt.Status.COMPLETED
+        ).values('pk'),
+    ),
+    'video_completions': (
+        'videoprogress_user_done_idx',
+        lambda ds: VideoProgress.objects.filter(
+            user=ds.student, course=ds.course, is_completed=True
+        ).values('pk'),
+    ),
+    'course_enrollments_by_status': (
+        'enrollment_course_status_idx',
+        lambda ds: Enrollment.objects.filter(
+            course=ds.course, status=Enrollment.Status.ACTIVE
+        ).values('pk'),
+    ),
+    'course_completions': (
+        'courseprogress_completed_idx',
+        lambda ds: CourseProgress.objects.filter(
+            course=ds.course, completed_at__isnull=False
+        ).values('pk'),
+    ),
+    'enrollment_keyset_page': (
+        'enrollment_keyset_idx',
+        lambda ds: Enrollment.objects.order_by('-enrolled_at', '-pk').values('pk')[:20],
+    ),
+    'quiz_attempt_keyset_page': (
+        'quizattempt_keyset_idx',
+        lambda ds: QuizAttempt.objects.order_by('-started_at', '-pk').values('pk')[:20],
+    ),
+}
+
+
+def _measure(queryset, iterations, label):
+    sql, params = queryset.query.sql_with_params()
+    # The comment keeps SQLite from reusing a statement prepared against the
+    # other schema; its EXPLAIN output is fixed when the statement is prepared.
+    sql = f'{sql} /* {label} */'
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        plan = '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+    return {'plan': plan, 'p50_ms': statistics.median(timings)}
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('name', sorted(SHAPES))
+def test_query_plan(name, dataset, request):
+    index, build = SHAPES[name]
+    queryset = build(dataset)
+    iterations = request.config.getoption('--benchmark-iterations')
+
+    after = _measure(queryset, iterations, 'with index')
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX %s' % connection.ops.quote_name(index))
+        before = _measure(queryset, iterations, 'without index')
+        transaction.set_rollback(True)
+
+    assert index not in before['plan']
+    request.config.query_plans[name] = {
+        'index': index,
+        'uses_index': index in after['plan'],
+        'before': before,
+        'after': after,
+        'dataset': dataset.counts,
+    }